@@ -0,0 +1,40 @@
+"""Global leaderboard indexes
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Cross-game rows (game_id IS NULL) are not covered by uq_leaderboard_entry
+    op.create_index(
+        'uq_leaderboard_global_entry',
+        'leaderboard',
+        ['user_id', 'period_type', 'period_date'],
+        unique=True,
+        postgresql_where=sa.text('game_id IS NULL'),
+    )
+    # Cross-game boards, walked by (total_score, user_id) keyset pages
+    op.create_index(
+        'idx_leaderboard_global_keyset',
+        'leaderboard',
+        ['period_type', 'period_date', sa.text('total_score DESC'), sa.text('user_id DESC')],
+        postgresql_where=sa.text('game_id IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_leaderboard_global_keyset', table_name='leaderboard')
+    op.drop_index('uq_leaderboard_global_entry', table_name='leaderboard')
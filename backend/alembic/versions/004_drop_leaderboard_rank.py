@@ -0,0 +1,28 @@
+"""Drop the unused leaderboard rank snapshot
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Ranks come from the rank index and keyset position, nothing writes this
+    op.drop_index('idx_leaderboard_period_rank', table_name='leaderboard')
+    op.drop_column('leaderboard', 'rank')
+
+
+def downgrade() -> None:
+    op.add_column('leaderboard', sa.Column('rank', sa.Integer(), nullable=True))
+    op.create_index('idx_leaderboard_period_rank', 'leaderboard', ['period_type', 'period_date', 'rank'])
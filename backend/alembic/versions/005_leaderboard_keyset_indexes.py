@@ -0,0 +1,31 @@
+"""Leaderboard keyset pagination indexes
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Cross-game boards got their keyset index with the global rows (003)
+    op.create_index(
+        'idx_leaderboard_game_keyset',
+        'leaderboard',
+        ['game_id', 'period_type', 'period_date', sa.text('total_score DESC'), sa.text('user_id DESC')],
+        postgresql_where=sa.text('game_id IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_leaderboard_game_keyset', table_name='leaderboard')
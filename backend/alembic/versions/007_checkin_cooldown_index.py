@@ -0,0 +1,29 @@
+"""Check-in rolling cooldown index
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_checkins_user_location_recent',
+        'checkins',
+        ['user_id', 'location_id', sa.text('created_at DESC')],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_checkins_user_location_recent', table_name='checkins')
@@ -0,0 +1,35 @@
+"""Notification outbox attempts and pending index
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'notifications',
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.create_index(
+        'idx_notifications_outbox',
+        'notifications',
+        ['created_at'],
+        postgresql_where=sa.text('sent_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_notifications_outbox', table_name='notifications')
+    op.drop_column('notifications', 'attempts')
@@ -0,0 +1,27 @@
+"""Notification outbox leases and retry backoff
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('notifications', sa.Column('leased_until', sa.DateTime(), nullable=True))
+    op.add_column('notifications', sa.Column('next_attempt_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('notifications', 'next_attempt_at')
+    op.drop_column('notifications', 'leased_until')
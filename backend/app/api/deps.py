@@ -8,60 +8,104 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
 from app.core.security import decode_access_token
 from app.models.user import User
+from app.services.user_cache import get_user, get_user_cache
 from app.services.user_service import UserService
 
 security = HTTPBearer()
 
 
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def get_current_user_id(
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)]
+) -> int:
+    """
+    Get current user's ID from JWT token without loading the user.
+    """
+    token_data = decode_access_token(credentials.credentials)
+
+    if not token_data:
+        raise _unauthorized("Invalid or expired token")
+
+    return token_data.user_id
+
+
+async def get_current_user_id_optional(
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(HTTPBearer(auto_error=False))]
+) -> int | None:
+    """
+    Get current user's ID if authenticated, None otherwise.
+    """
+    if not credentials:
+        return None
+
+    token_data = decode_access_token(credentials.credentials)
+    return token_data.user_id if token_data else None
+
+
 async def get_current_user(
-    credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
+    user_id: Annotated[int, Depends(get_current_user_id)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> User:
     """
     Get current authenticated user from JWT token.
-    """
-    token = credentials.credentials
-    token_data = decode_access_token(token)
 
-    if not token_data:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    Always loads the user from the database, for endpoints that change it.
+    """
+    # Read before loading, so a commit landing in between hides this copy
+    user_cache = get_user_cache()
+    generation = await user_cache.generation(user_id)
 
     user_service = UserService(db)
-    user = await user_service.get_by_id(token_data.user_id)
+    user = await user_service.get_by_id(user_id)
 
     if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _unauthorized("User not found")
+
+    await user_cache.set(user, generation)
+    return user
+
+
+async def get_cached_user(
+    user_id: Annotated[int, Depends(get_current_user_id)],
+    db: Annotated[AsyncSession, Depends(get_db)]
+) -> User:
+    """
+    Get current authenticated user from the identity cache.
+
+    Returns a detached read-only snapshot, for endpoints that only read it.
+    """
+    user = await get_user(db, user_id)
+
+    if not user:
+        raise _unauthorized("User not found")
 
     return user
 
 
 async def get_current_user_optional(
-    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(HTTPBearer(auto_error=False))],
+    user_id: Annotated[int | None, Depends(get_current_user_id_optional)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> User | None:
     """
     Get current user if authenticated, None otherwise.
     """
-    if not credentials:
+    if user_id is None:
         return None
 
-    token_data = decode_access_token(credentials.credentials)
-    if not token_data:
-        return None
-
-    user_service = UserService(db)
-    return await user_service.get_by_id(token_data.user_id)
+    return await get_user(db, user_id)
 
 
 # Type aliases for cleaner dependency injection
 CurrentUser = Annotated[User, Depends(get_current_user)]
+CachedUser = Annotated[User, Depends(get_cached_user)]
 OptionalUser = Annotated[User | None, Depends(get_current_user_optional)]
+CurrentUserId = Annotated[int, Depends(get_current_user_id)]
+OptionalUserId = Annotated[int | None, Depends(get_current_user_id_optional)]
 DbSession = Annotated[AsyncSession, Depends(get_db)]
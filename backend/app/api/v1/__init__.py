@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, users, locations, checkins, games, events, leaderboard
+from app.api.v1.endpoints import auth, users, locations, checkins, games, events, leaderboard, webhooks
 
 api_router = APIRouter()
 
@@ -13,3 +13,4 @@ api_router.include_router(checkins.router, prefix="/checkins", tags=["checkins"]
 api_router.include_router(games.router, prefix="/games", tags=["games"])
 api_router.include_router(events.router, prefix="/events", tags=["events"])
 api_router.include_router(leaderboard.router, prefix="/leaderboard", tags=["leaderboard"])
+api_router.include_router(webhooks.router, prefix="/webhooks", tags=["webhooks"])
@@ -1,14 +1,16 @@
 """Checkin endpoints"""
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
 
-from app.api.deps import DbSession, CurrentUser
+from app.api.deps import DbSession, CurrentUser, CurrentUserId
 from app.schemas.checkin import (
     CheckinCreate,
     CheckinResponse,
     CheckinSuccessResponse,
     CheckinHistoryResponse,
     CheckinError,
+    CanCheckinBatchRequest,
+    CanCheckinBatchResponse,
 )
 from app.services.checkin_service import CheckinService, CheckinError as ServiceError
 
@@ -30,7 +32,7 @@ async def create_checkin(
     checkin_service = CheckinService(db)
 
     try:
-        checkin, user_update = await checkin_service.create_checkin(
+        checkin, location, user_update = await checkin_service.create_checkin(
             current_user, checkin_data
         )
     except ServiceError as e:
@@ -43,15 +45,12 @@ async def create_checkin(
             }
         )
 
-    # Get location name for response
-    location = await checkin_service.get_location_by_id(checkin.location_id)
-
     return CheckinSuccessResponse(
         success=True,
         checkin=CheckinResponse(
             id=checkin.id,
             location_id=checkin.location_id,
-            location_name=location.name if location else "Unknown",
+            location_name=location.name,
             user_latitude=float(checkin.user_latitude) if checkin.user_latitude else None,
             user_longitude=float(checkin.user_longitude) if checkin.user_longitude else None,
             distance_meters=checkin.distance_meters,
@@ -66,27 +65,33 @@ async def create_checkin(
 
 @router.get("/history", response_model=CheckinHistoryResponse)
 async def get_checkin_history(
-    current_user: CurrentUser,
+    user_id: CurrentUserId,
     db: DbSession,
-    page: int = 1,
-    per_page: int = 20
+    per_page: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = None
 ):
     """
-    Get user's check-in history with pagination.
+    Get user's check-in history.
+
+    Pass `next_cursor` from the previous response as `cursor` to get the
+    next page.
     """
     checkin_service = CheckinService(db)
-    checkins, total = await checkin_service.get_user_checkins(
-        current_user.id, page, per_page
-    )
+    try:
+        rows, next_cursor = await checkin_service.get_user_checkins(
+            user_id, per_page, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
-    # Get location names
-    responses = []
-    for checkin in checkins:
-        location = await checkin_service.get_location_by_id(checkin.location_id)
-        responses.append(CheckinResponse(
+    responses = [
+        CheckinResponse(
             id=checkin.id,
             location_id=checkin.location_id,
-            location_name=location.name if location else "Unknown",
+            location_name=location_name,
             user_latitude=float(checkin.user_latitude) if checkin.user_latitude else None,
             user_longitude=float(checkin.user_longitude) if checkin.user_longitude else None,
             distance_meters=checkin.distance_meters,
@@ -94,31 +99,57 @@ async def get_checkin_history(
             experience_earned=checkin.experience_earned,
             checkin_date=checkin.checkin_date,
             created_at=checkin.created_at,
-        ))
+        )
+        for checkin, location_name in rows
+    ]
 
     return CheckinHistoryResponse(
         checkins=responses,
-        total=total,
-        page=page,
-        per_page=per_page
+        # Running counter kept on the user instead of a COUNT over checkins,
+        # read from the row since a cached user can predate the last check-in
+        total=await checkin_service.get_total_checkins(user_id),
+        per_page=per_page,
+        next_cursor=next_cursor
     )
 
 
 @router.get("/can-checkin/{location_id}")
 async def can_checkin(
     location_id: int,
-    current_user: CurrentUser,
+    user_id: CurrentUserId,
     db: DbSession
 ):
     """
     Check if user can check in at a specific location.
     """
     checkin_service = CheckinService(db)
-    can_checkin, reason = await checkin_service.can_checkin(
-        current_user.id, location_id
-    )
+    remaining = await checkin_service.get_cooldown_remaining(user_id, location_id)
 
     return {
-        "can_checkin": can_checkin,
-        "reason": reason
+        "can_checkin": remaining == 0,
+        "reason": "cooldown_active" if remaining else None,
+        "cooldown_remaining_seconds": remaining
     }
+
+
+@router.post("/can-checkin:batch", response_model=CanCheckinBatchResponse)
+async def can_checkin_batch(
+    request_data: CanCheckinBatchRequest,
+    user_id: CurrentUserId,
+    db: DbSession
+):
+    """
+    Check if user can check in at many locations at once.
+
+    Omit `location_ids` to check all active locations. With the user's
+    coordinates, distance and radius are checked too.
+    """
+    checkin_service = CheckinService(db)
+    statuses = await checkin_service.can_checkin_many(
+        user_id,
+        request_data.location_ids,
+        request_data.latitude,
+        request_data.longitude
+    )
+
+    return CanCheckinBatchResponse(locations=statuses)
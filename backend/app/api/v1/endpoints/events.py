@@ -1,9 +1,12 @@
 """Event endpoints"""
 
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, HTTPException, Request, status, Query
 from typing import Literal
 
-from app.api.deps import DbSession, CurrentUser, OptionalUser
+from app.api.deps import DbSession, CurrentUser, CurrentUserId, OptionalUser
+from app.core.cache import get_response_cache
+from app.core.config import settings
+from app.core.etag import conditional_json
 from app.schemas.event import (
     EventResponse,
     EventListResponse,
@@ -11,13 +14,17 @@ from app.schemas.event import (
     JoinEventResponse,
     EventProgressResponse,
 )
+from app.services.counter_buffer import get_counter_buffer
 from app.services.event_service import EventService, EventError
 
 router = APIRouter()
 
+CATALOG_CACHE_CONTROL = f"public, max-age={settings.CATALOG_CACHE_TTL_SECONDS}"
+
 
 @router.get("", response_model=EventListResponse)
 async def get_events(
+    request: Request,
     db: DbSession,
     status: Literal["active", "upcoming", "past"] | None = None,
     event_type: Literal["promo", "tournament", "offline", "challenge"] | None = None,
@@ -26,17 +33,35 @@ async def get_events(
     """
     Get events with optional filters.
     """
-    event_service = EventService(db)
-    events = await event_service.get_events(
-        status=status,
-        event_type=event_type,
-        featured_only=featured
-    )
+    async def load() -> bytes:
+        event_service = EventService(db)
+        events = await event_service.get_events(
+            status=status,
+            event_type=event_type,
+            featured_only=featured
+        )
 
-    return EventListResponse(
-        events=[EventResponse.model_validate(e) for e in events],
-        total=len(events)
+        responses = [EventResponse.model_validate(e) for e in events]
+
+        return EventListResponse(
+            events=responses,
+            total=len(responses)
+        ).model_dump_json().encode()
+
+    # Cached with counts flushed by the counter version in the key;
+    # pending joins are added on every read
+    async def get_list(version: int) -> bytes:
+        return await get_response_cache().get_or_set(
+            "events",
+            f"list:{version}:{status}:{event_type}:{featured}",
+            settings.CATALOG_CACHE_TTL_SECONDS,
+            load
+        )
+
+    body = await get_counter_buffer().overlay_json(
+        "event_participants", get_list, EventListResponse, "events", "current_participants"
     )
+    return conditional_json(request, body, CATALOG_CACHE_CONTROL)
 
 
 @router.get("/{slug}", response_model=EventResponse)
@@ -53,7 +78,9 @@ async def get_event(slug: str, db: DbSession):
             detail="Event not found"
         )
 
-    return EventResponse.model_validate(event)
+    response = EventResponse.model_validate(event)
+    await get_counter_buffer().overlay("event_participants", [response], "current_participants")
+    return response
 
 
 @router.post("/{slug}/join", response_model=JoinEventResponse)
@@ -91,7 +118,7 @@ async def join_event(
 @router.get("/{slug}/my-progress", response_model=EventProgressResponse)
 async def get_event_progress(
     slug: str,
-    current_user: CurrentUser,
+    user_id: CurrentUserId,
     db: DbSession
 ):
     """
@@ -106,7 +133,7 @@ async def get_event_progress(
             detail="Event not found"
         )
 
-    participation = await event_service.get_participation(event.id, current_user.id)
+    participation = await event_service.get_participation(event.id, user_id)
 
     if not participation:
         raise HTTPException(
@@ -114,16 +141,19 @@ async def get_event_progress(
             detail="You are not participating in this event"
         )
 
+    event_response = EventResponse.model_validate(event)
+    await get_counter_buffer().overlay("event_participants", [event_response], "current_participants")
+
     return EventProgressResponse(
         participation=EventParticipantResponse.model_validate(participation),
-        event=EventResponse.model_validate(event)
+        event=event_response
     )
 
 
 @router.post("/{slug}/claim-rewards")
 async def claim_event_rewards(
     slug: str,
-    current_user: CurrentUser,
+    user_id: CurrentUserId,
     db: DbSession
 ):
     """
@@ -138,7 +168,7 @@ async def claim_event_rewards(
             detail="Event not found"
         )
 
-    participation = await event_service.get_participation(event.id, current_user.id)
+    participation = await event_service.get_participation(event.id, user_id)
 
     if not participation:
         raise HTTPException(
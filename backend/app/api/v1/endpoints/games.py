@@ -1,9 +1,12 @@
 """Game endpoints"""
 
 from uuid import UUID
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
 
-from app.api.deps import DbSession, CurrentUser
+from app.api.deps import DbSession, CachedUser, CurrentUser
+from app.core.cache import get_response_cache
+from app.core.config import settings
+from app.core.etag import conditional_json
 from app.schemas.game import (
     GameResponse,
     GameListResponse,
@@ -17,18 +20,26 @@ from app.services.game_service import GameService, GameError
 
 router = APIRouter()
 
+CATALOG_CACHE_CONTROL = f"public, max-age={settings.CATALOG_CACHE_TTL_SECONDS}"
+
 
 @router.get("", response_model=GameListResponse)
-async def get_games(db: DbSession):
+async def get_games(request: Request, db: DbSession):
     """
     Get all available games.
     """
-    game_service = GameService(db)
-    games = await game_service.get_all_games()
+    async def load() -> bytes:
+        game_service = GameService(db)
+        games = await game_service.get_all_games()
 
-    return GameListResponse(
-        games=[GameResponse.model_validate(g) for g in games]
+        return GameListResponse(
+            games=[GameResponse.model_validate(g) for g in games]
+        ).model_dump_json().encode()
+
+    body = await get_response_cache().get_or_set(
+        "games", "list", settings.CATALOG_CACHE_TTL_SECONDS, load
     )
+    return conditional_json(request, body, CATALOG_CACHE_CONTROL)
 
 
 @router.get("/{slug}", response_model=GameResponse)
@@ -52,7 +63,7 @@ async def get_game(slug: str, db: DbSession):
 async def start_game_session(
     slug: str,
     session_data: GameSessionCreate,
-    current_user: CurrentUser,
+    current_user: CachedUser,
     db: DbSession
 ):
     """
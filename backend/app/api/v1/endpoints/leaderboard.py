@@ -1,35 +1,79 @@
 """Leaderboard endpoints"""
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
 from typing import Literal
 
-from app.api.deps import DbSession, OptionalUser
+from app.api.deps import DbSession, OptionalUserId
+from app.core.cache import get_response_cache
+from app.core.etag import compute_etag, etag_matches, not_modified
 from app.schemas.leaderboard import LeaderboardResponse
-from app.services.leaderboard_service import LeaderboardService
+from app.services.leaderboard_service import (
+    LEADERBOARD_PROFILES_VERSION, LeaderboardService, get_period_date, leaderboard_version
+)
 
 router = APIRouter()
 
+LEADERBOARD_CACHE_CONTROL = "private, no-cache"
+
 
 @router.get("", response_model=LeaderboardResponse)
 async def get_leaderboard(
+    request: Request,
+    response: Response,
     db: DbSession,
-    current_user: OptionalUser,
+    user_id: OptionalUserId,
     period: Literal["daily", "weekly", "monthly", "all_time"] = "weekly",
     game_id: int | None = None,
-    limit: int = Query(default=100, le=100)
+    limit: int = Query(default=100, ge=1, le=100),
+    cursor: str | None = None,
+    around: Literal["me"] | None = None,
+    radius: int = Query(default=10, ge=1, le=50)
 ):
     """
     Get leaderboard with optional filters.
 
+    Pass `next_cursor` from the previous response as `cursor` to get the
+    next page. With `around=me`, returns `radius` entries above and below
+    the current user.
+
     If authenticated, includes user's position in the leaderboard.
     """
-    leaderboard_service = LeaderboardService(db)
+    if around and not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required for around=me"
+        )
 
-    user_id = current_user.id if current_user else None
-
-    return await leaderboard_service.get_leaderboard(
-        period_type=period,
-        game_id=game_id,
-        limit=limit,
-        user_id=user_id
+    # The board version is bumped on every game end and the profiles
+    # version on every name or photo change, so a matching ETag is
+    # answered without running the leaderboard queries
+    version, profiles_version = await get_response_cache().get_versions(
+        leaderboard_version(game_id), LEADERBOARD_PROFILES_VERSION
+    )
+    etag = compute_etag(
+        "leaderboard", version, profiles_version, period, get_period_date(period), game_id,
+        limit, cursor, around, radius, user_id
     )
+    if etag_matches(request, etag):
+        return not_modified(etag, LEADERBOARD_CACHE_CONTROL)
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = LEADERBOARD_CACHE_CONTROL
+
+    leaderboard_service = LeaderboardService(db)
+
+    try:
+        return await leaderboard_service.get_leaderboard(
+            period_type=period,
+            game_id=game_id,
+            limit=limit,
+            user_id=user_id,
+            cursor=cursor,
+            around_me=around == "me",
+            radius=radius
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
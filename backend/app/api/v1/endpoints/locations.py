@@ -1,30 +1,63 @@
 """Location endpoints"""
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, Request, status
 from sqlalchemy import select
 
 from app.api.deps import DbSession
+from app.core.config import settings
+from app.core.etag import conditional_json
 from app.models.location import Location
-from app.schemas.location import LocationResponse, LocationListResponse
+from app.schemas.location import (
+    LocationResponse,
+    LocationListResponse,
+    NearbyLocation,
+    NearbyLocationsResponse,
+)
+from app.services.counter_buffer import get_counter_buffer
+from app.services.location_service import LocationService
 
 router = APIRouter()
 
+CATALOG_CACHE_CONTROL = f"public, max-age={settings.CATALOG_CACHE_TTL_SECONDS}"
+
 
 @router.get("", response_model=LocationListResponse)
-async def get_locations(db: DbSession):
+async def get_locations(request: Request, db: DbSession):
     """
     Get all active locations.
     """
-    result = await db.execute(
-        select(Location)
-        .where(Location.is_active == True)
-        .order_by(Location.id)
-    )
-    locations = result.scalars().all()
+    body = await LocationService(db).get_catalog_with_counters()
+    return conditional_json(request, body, CATALOG_CACHE_CONTROL)
+
+
+@router.get("/nearby", response_model=NearbyLocationsResponse)
+async def get_nearby_locations(
+    db: DbSession,
+    lat: float = Query(ge=-90, le=90),
+    lon: float = Query(ge=-180, le=180),
+    radius: int = Query(default=1000, ge=1, le=50000),
+    limit: int = Query(default=20, ge=1, le=100)
+):
+    """
+    Get active locations within `radius` meters, closest first.
+    """
+    index = await LocationService(db).get_index()
+    nearby = index.nearby(lat, lon, radius, limit)
+
+    # Copies, since the index's locations are shared by every request
+    locations = [location.model_copy() for _, location in nearby]
+    await get_counter_buffer().overlay("location_checkins", locations, "total_checkins")
 
-    return LocationListResponse(
-        locations=[LocationResponse.model_validate(loc) for loc in locations],
-        total=len(locations)
+    return NearbyLocationsResponse(
+        locations=[
+            NearbyLocation(
+                location=location,
+                distance_meters=distance,
+                can_checkin=distance <= location.checkin_radius_meters
+            )
+            for (distance, _), location in zip(nearby, locations)
+        ],
+        total=len(nearby)
     )
 
 
@@ -44,4 +77,6 @@ async def get_location(slug: str, db: DbSession):
             detail="Location not found"
         )
 
-    return LocationResponse.model_validate(location)
+    response = LocationResponse.model_validate(location)
+    await get_counter_buffer().overlay("location_checkins", [response], "total_checkins")
+    return response
@@ -1,21 +1,33 @@
 """User endpoints"""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
 
-from app.api.deps import DbSession, CurrentUser
+from app.api.deps import DbSession, CachedUser, CurrentUser
+from app.core.etag import compute_etag, etag_matches, not_modified
 from app.schemas.user import UserResponse, UserProfileResponse, UserUpdate
 from app.services.user_service import UserService
 
 router = APIRouter()
 
+PROFILE_CACHE_CONTROL = "private, no-cache"
+
 
 @router.get("/me", response_model=UserProfileResponse)
 async def get_current_user_profile(
-    current_user: CurrentUser
+    request: Request,
+    response: Response,
+    current_user: CachedUser
 ):
     """
     Get current user's profile with extended information.
     """
+    # Every change to the user row bumps updated_at
+    etag = compute_etag("user", current_user.id, current_user.updated_at.isoformat())
+    if etag_matches(request, etag):
+        return not_modified(etag, PROFILE_CACHE_CONTROL)
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = PROFILE_CACHE_CONTROL
     return UserProfileResponse.from_user(current_user)
 
 
@@ -35,7 +47,7 @@ async def update_current_user(
 
 @router.get("/me/stats")
 async def get_current_user_stats(
-    current_user: CurrentUser,
+    current_user: CachedUser,
     db: DbSession
 ):
     """
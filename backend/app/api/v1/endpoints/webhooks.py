@@ -0,0 +1,44 @@
+"""Webhook endpoints"""
+
+import hmac
+
+from fastapi import APIRouter, Header, HTTPException, Request, status
+
+from app.bot.webhook import BOT_UPDATES, feed_update, get_webhook_application, webhook_secret
+
+router = APIRouter()
+
+
+@router.post("/telegram", include_in_schema=False)
+async def telegram_webhook(
+    request: Request,
+    x_telegram_bot_api_secret_token: str = Header(default="")
+):
+    """
+    Receive a Telegram update.
+
+    The update is queued and handled in the background, so Telegram gets
+    its answer without waiting for the handler.
+    """
+    application = get_webhook_application()
+    if application is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error_code": "webhook_disabled", "message": "Bot webhook is not enabled"}
+        )
+
+    if not hmac.compare_digest(x_telegram_bot_api_secret_token, webhook_secret()):
+        BOT_UPDATES.inc(("unauthorized",))
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={"error_code": "invalid_secret", "message": "Invalid webhook secret"}
+        )
+
+    # Telegram redelivers updates answered with an error
+    if not feed_update(application, await request.json()):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"error_code": "bot_overloaded", "message": "Too many pending updates"}
+        )
+
+    return {"ok": True}
@@ -0,0 +1,295 @@
+"""Bulk notification dispatcher - rate-limited concurrent Telegram delivery"""
+
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterable, NamedTuple
+
+from redis.asyncio import Redis
+from telegram import InlineKeyboardMarkup
+from telegram.error import BadRequest, ChatMigrated, Forbidden, NetworkError, RetryAfter
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class OutgoingMessage(NamedTuple):
+    """Message queued for delivery"""
+    chat_id: int
+    text: str
+    reply_markup: InlineKeyboardMarkup | None = None
+    parse_mode: str | None = None
+    notification_id: uuid.UUID | None = None
+
+
+class DispatchStats:
+    """Outcome of one dispatch run"""
+
+    __slots__ = ("sent", "failed", "retried", "delivered", "started_at", "finished_at")
+
+    def __init__(self):
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        # (notification_id, sent_at) of delivered messages that have one
+        self.delivered: list[tuple[uuid.UUID, datetime]] = []
+        self.started_at = time.monotonic()
+        self.finished_at: float | None = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def __repr__(self) -> str:
+        return (
+            f"<DispatchStats sent={self.sent} failed={self.failed} "
+            f"retried={self.retried} elapsed={self.elapsed:.1f}s>"
+        )
+
+
+class TokenBucket:
+    """Token bucket shared by all senders; can be paused after a flood error"""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for a while"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it"""
+        while True:
+            now = time.monotonic()
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+# Refill the shared bucket by Redis' clock, record a pause and take a
+# token; returns the seconds to wait before trying again, 0 once taken
+ACQUIRE_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local rate, capacity, pause = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local paused_until = tonumber(redis.call('HGET', KEYS[1], 'paused_until') or 0)
+if pause > 0 and now + pause > paused_until then
+    paused_until = now + pause
+    redis.call('HSET', KEYS[1], 'paused_until', tostring(paused_until))
+end
+redis.call('EXPIRE', KEYS[1], math.ceil(math.max(paused_until - now, 0) + capacity / rate + 1))
+if now < paused_until then
+    return tostring(paused_until - now)
+end
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens') or capacity)
+local updated_at = tonumber(redis.call('HGET', KEYS[1], 'updated_at') or now)
+tokens = math.min(capacity, tokens + (now - updated_at) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+return tostring(wait)
+"""
+
+
+class RedisTokenBucket(TokenBucket):
+    """
+    Token bucket kept in Redis, shared by every notification worker.
+
+    Each acquire is one script call. A pause is published with this
+    process's next acquire, which follows right away as the flooded
+    message is retried.
+    """
+
+    def __init__(self, redis: Redis, rate: float, capacity: float | None = None, key: str = "telegram:send_bucket"):
+        super().__init__(rate, capacity)
+        self.key = key
+        self.script = redis.register_script(ACQUIRE_SCRIPT)
+        self.pending_pause = 0.0
+
+    def pause(self, seconds: float) -> None:
+        self.pending_pause = max(self.pending_pause, seconds)
+
+    async def acquire(self) -> None:
+        while True:
+            pause, self.pending_pause = self.pending_pause, 0.0
+            wait = float(await self.script(keys=[self.key], args=[self.rate, self.capacity, pause]))
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+
+def create_token_bucket(rate: float) -> TokenBucket:
+    """Create bucket shared through Redis, or in-process bucket when Redis is not configured"""
+    redis = get_redis()
+    if redis is None:
+        return TokenBucket(rate)
+    return RedisTokenBucket(redis, rate)
+
+
+class PerChatLimiter:
+    """Minimum interval between messages to one chat"""
+
+    # Past slots are dropped whenever the table doubles from this size
+    PRUNE_SIZE = 10_000
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate
+        self.next_allowed: dict[int, float] = {}
+        self._prune_at = self.PRUNE_SIZE
+
+    async def acquire(self, chat_id: int) -> None:
+        """Reserve the chat's next slot and wait for it"""
+        now = time.monotonic()
+        if len(self.next_allowed) > self._prune_at:
+            self.next_allowed = {k: t for k, t in self.next_allowed.items() if t > now}
+            self._prune_at = max(self.PRUNE_SIZE, 2 * len(self.next_allowed))
+
+        slot = max(now, self.next_allowed.get(chat_id, 0.0))
+        self.next_allowed[chat_id] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class FakeBot:
+    """
+    Offline stand-in for telegram.Bot.
+
+    Records sent messages and can simulate latency and flood errors:
+    every flood_every-th call raises RetryAfter(retry_after).
+    """
+
+    def __init__(self, latency: float = 0.0, flood_every: int = 0, retry_after: int = 1):
+        self.latency = latency
+        self.flood_every = flood_every
+        self.retry_after = retry_after
+        self.calls = 0
+        self.sent: list[dict[str, Any]] = []
+
+    async def send_message(self, chat_id: int, text: str, **kwargs) -> None:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.flood_every and self.calls % self.flood_every == 0:
+            raise RetryAfter(self.retry_after)
+        self.sent.append({"chat_id": chat_id, "text": text, **kwargs})
+
+
+class NotificationDispatcher:
+    """
+    Sends many messages through a bounded pool of senders.
+
+    Every send waits for the global token bucket and the chat's slot.
+    A 429 pauses the global bucket for retry_after before the message is
+    retried. Limits carry over between dispatch calls, so one dispatcher
+    should be reused for the lifetime of a worker. The global bucket is
+    shared by all workers through Redis, and per process without it;
+    per-chat slots are per process, and a 429 they miss pauses every
+    worker.
+    """
+
+    def __init__(
+        self,
+        bot,
+        concurrency: int | None = None,
+        global_rate: float | None = None,
+        per_chat_rate: float | None = None,
+        max_retries: int = 3
+    ):
+        self.bot = bot
+        self.concurrency = concurrency or settings.TELEGRAM_SEND_CONCURRENCY
+        self.global_bucket = create_token_bucket(global_rate or settings.TELEGRAM_GLOBAL_RATE)
+        self.chat_limiter = PerChatLimiter(per_chat_rate or settings.TELEGRAM_PER_CHAT_RATE)
+        self.max_retries = max_retries
+
+    async def dispatch(self, messages: AsyncIterable[OutgoingMessage]) -> DispatchStats:
+        """Deliver all messages and wait for the pool to drain"""
+        stats = DispatchStats()
+        queue: asyncio.Queue[OutgoingMessage] = asyncio.Queue(
+            maxsize=self.concurrency * 4
+        )
+        workers = [
+            asyncio.create_task(self._worker(queue, stats))
+            for _ in range(self.concurrency)
+        ]
+
+        try:
+            async for message in messages:
+                await queue.put(message)
+            await queue.join()
+        finally:
+            # Workers are idle once the queue is joined
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        stats.finished_at = time.monotonic()
+        logger.debug("Dispatch finished: %r", stats)
+        return stats
+
+    async def _worker(self, queue: asyncio.Queue, stats: DispatchStats):
+        """Send queued messages until cancelled"""
+        while True:
+            message = await queue.get()
+            try:
+                if await self._send(message, stats):
+                    stats.sent += 1
+                    if message.notification_id is not None:
+                        stats.delivered.append((message.notification_id, datetime.utcnow()))
+                else:
+                    stats.failed += 1
+            except Exception:
+                stats.failed += 1
+                logger.exception("Notification to %s failed", message.chat_id)
+            finally:
+                queue.task_done()
+
+    async def _send(self, message: OutgoingMessage, stats: DispatchStats) -> bool:
+        """Send one message, retrying flood and network errors"""
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                stats.retried += 1
+            await self.chat_limiter.acquire(message.chat_id)
+            await self.global_bucket.acquire()
+            try:
+                await self.bot.send_message(
+                    chat_id=message.chat_id,
+                    text=message.text,
+                    reply_markup=message.reply_markup,
+                    parse_mode=message.parse_mode
+                )
+                return True
+            except RetryAfter as e:
+                # Flood limits are per bot, so every sender backs off
+                self.global_bucket.pause(e.retry_after)
+                reason = f"flood control, retry after {e.retry_after}s"
+            except (Forbidden, BadRequest, ChatMigrated) as e:
+                # Blocked bot, deleted chat or bad payload: retrying won't help
+                logger.info("Notification to %s not delivered: %s", message.chat_id, e)
+                return False
+            except NetworkError as e:
+                reason = str(e)
+
+        logger.warning(
+            "Notification to %s dropped after %d retries: %s",
+            message.chat_id, self.max_retries, reason
+        )
+        return False
@@ -10,7 +10,10 @@ from telegram.ext import (
     filters,
 )
 
+from app.bot.summaries import LEADERBOARD_SIZE, get_bot_user, get_leaderboard_head
+from app.bot.templates import RenderedMessage, get_template_registry
 from app.core.config import settings
+from app.core.levels import get_level_table
 
 
 # Web App URL
@@ -44,6 +47,15 @@ def get_main_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(keyboard)
 
 
+async def reply_rendered(update: Update, message: RenderedMessage) -> None:
+    """Reply with a message from the template registry"""
+    await update.message.reply_text(
+        message.text,
+        parse_mode=message.parse_mode,
+        reply_markup=message.reply_markup
+    )
+
+
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /start command"""
     user = update.effective_user
@@ -138,19 +150,24 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
 
 async def balance_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /balance command"""
-    # This would need to fetch from database
-    # For now, show a button to open the app
-    keyboard = InlineKeyboardMarkup([[
-        InlineKeyboardButton(
-            "👤 Переглянути профіль",
-            web_app=WebAppInfo(url=f"{TMA_URL}/profile")
+    templates = get_template_registry()
+    user = await get_bot_user(update.effective_user.id)
+
+    if user is None:
+        message = templates.render("balance_unregistered", update.effective_user.language_code)
+    else:
+        levels = get_level_table()
+        message = templates.render(
+            "balance",
+            user.language_code or update.effective_user.language_code,
+            points=user.points,
+            level=user.level,
+            level_name=levels.get(user.level).name,
+            experience=user.experience,
+            next_level_xp=levels.next_level_xp(user.level)
         )
-    ]])
 
-    await update.message.reply_text(
-        "💰 Перевір свій баланс та статистику в додатку:",
-        reply_markup=keyboard
-    )
+    await reply_rendered(update, message)
 
 
 async def checkin_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -200,17 +217,21 @@ async def events_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
 async def leaderboard_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /leaderboard command"""
-    keyboard = InlineKeyboardMarkup([[
-        InlineKeyboardButton(
-            "🏆 Leaderboard",
-            web_app=WebAppInfo(url=f"{TMA_URL}/leaderboard")
+    templates = get_template_registry()
+    board = await get_leaderboard_head()
+    language_code = update.effective_user.language_code
+
+    if not board.entries:
+        message = templates.render("leaderboard_empty", language_code)
+    else:
+        lines = "\n".join(
+            f"{entry.rank}. {entry.first_name or entry.username or '—'} — {entry.total_score}"
+            for entry in board.entries
         )
-    ]])
+        # Same lines for everyone until the board changes, so rendering is cached
+        message = templates.render("leaderboard_top", language_code, size=LEADERBOARD_SIZE, lines=lines)
 
-    await update.message.reply_text(
-        "🏆 Переглянь таблицю лідерів та свою позицію!",
-        reply_markup=keyboard
-    )
+    await reply_rendered(update, message)
 
 
 async def settings_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -235,14 +256,8 @@ async def unknown_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     )
 
 
-def create_bot_application() -> Application:
-    """Create and configure bot application"""
-    if not settings.TELEGRAM_BOT_TOKEN:
-        raise ValueError("TELEGRAM_BOT_TOKEN is not configured")
-
-    application = Application.builder().token(settings.TELEGRAM_BOT_TOKEN).build()
-
-    # Add command handlers
+def register_handlers(application: Application) -> None:
+    """Add command handlers to a bot application"""
     application.add_handler(CommandHandler("start", start_command))
     application.add_handler(CommandHandler("help", help_command))
     application.add_handler(CommandHandler("balance", balance_command))
@@ -255,4 +270,18 @@ def create_bot_application() -> Application:
     # Handle unknown commands
     application.add_handler(MessageHandler(filters.COMMAND, unknown_command))
 
+
+def create_bot_application() -> Application:
+    """Create and configure bot application (polling mode, see app.bot.webhook for webhooks)"""
+    if not settings.TELEGRAM_BOT_TOKEN:
+        raise ValueError("TELEGRAM_BOT_TOKEN is not configured")
+
+    application = (
+        Application.builder()
+        .token(settings.TELEGRAM_BOT_TOKEN)
+        .base_url(settings.TELEGRAM_API_BASE_URL)
+        .build()
+    )
+    register_handlers(application)
+
     return application
@@ -1,188 +1,162 @@
 """Telegram notification service"""
 
-from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup, WebAppInfo
+import logging
+
+from telegram import Bot, InlineKeyboardMarkup
+from app.bot.dispatcher import OutgoingMessage
+from app.bot.templates import RenderedMessage, get_template_registry
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 
 class NotificationService:
     """Service for sending Telegram notifications"""
 
     def __init__(self):
-        if not settings.TELEGRAM_BOT_TOKEN:
-            raise ValueError("TELEGRAM_BOT_TOKEN is not configured")
-        self.bot = Bot(token=settings.TELEGRAM_BOT_TOKEN)
-        self.tma_url = settings.TELEGRAM_WEBAPP_URL
-
-    async def send_checkin_reminder(self, telegram_id: int) -> bool:
+        self.templates = get_template_registry()
+        self._bot: Bot | None = None
+
+    @property
+    def bot(self) -> Bot:
+        """Telegram bot, created on first use so messages can be built without a token"""
+        if self._bot is None:
+            if not settings.TELEGRAM_BOT_TOKEN:
+                raise ValueError("TELEGRAM_BOT_TOKEN is not configured")
+            self._bot = Bot(token=settings.TELEGRAM_BOT_TOKEN, base_url=settings.TELEGRAM_API_BASE_URL)
+        return self._bot
+
+    async def send_checkin_reminder(self, telegram_id: int, language_code: str | None = None) -> bool:
         """Send check-in reminder notification"""
-        text = "☕ Давно не бачились! Зайди до нашої кав'ярні та отримай +1 бал!"
-
-        keyboard = InlineKeyboardMarkup([[
-            InlineKeyboardButton(
-                "☕ Check-in",
-                web_app=WebAppInfo(url=f"{self.tma_url}/checkin")
-            )
-        ]])
-
-        return await self._send_message(telegram_id, text, keyboard)
+        return await self._send(telegram_id, self.templates.render("checkin_reminder", language_code))
 
     async def send_tournament_start(
         self,
         telegram_id: int,
         tournament_name: str,
-        prize_description: str
+        prize_description: str,
+        language_code: str | None = None
     ) -> bool:
         """Send tournament start notification"""
-        text = f"""
-🏆 *Новий турнір почався!*
-
-*{tournament_name}*
-
-🎁 Призи: {prize_description}
-
-Візьми участь та вигравай круті нагороди!
-"""
-        keyboard = InlineKeyboardMarkup([[
-            InlineKeyboardButton(
-                "🎮 Взяти участь",
-                web_app=WebAppInfo(url=f"{self.tma_url}/games")
-            )
-        ]])
-
-        return await self._send_message(telegram_id, text, keyboard, parse_mode="Markdown")
+        return await self._send(telegram_id, self.templates.render(
+            "tournament_start",
+            language_code,
+            tournament_name=tournament_name,
+            prize_description=prize_description
+        ))
 
     async def send_tournament_end(
         self,
         telegram_id: int,
         tournament_name: str,
         position: int,
-        points_won: int
+        points_won: int,
+        language_code: str | None = None
     ) -> bool:
         """Send tournament end notification"""
+        english = self.templates.language(language_code) == "en"
         if position <= 3:
-            emoji = ["🥇", "🥈", "🥉"][position - 1]
-            congrats = f"Вітаємо! Ти зайняв {emoji} {position} місце"
-        else:
-            emoji = "🎊"
-            congrats = f"Ти зайняв {position} місце"
-
-        text = f"""
-{emoji} *Турнір завершено!*
-
-*{tournament_name}*
-
-{congrats} та отримав *{points_won} балів*!
-
-Дякуємо за участь!
-"""
-        keyboard = InlineKeyboardMarkup([[
-            InlineKeyboardButton(
-                "🏆 Результати",
-                web_app=WebAppInfo(url=f"{self.tma_url}/leaderboard")
+            medal = ["🥇", "🥈", "🥉"][position - 1]
+            congrats = (
+                f"Congratulations! You took {medal} place {position}" if english
+                else f"Вітаємо! Ти зайняв {medal} {position} місце"
             )
-        ]])
-
-        return await self._send_message(telegram_id, text, keyboard, parse_mode="Markdown")
+        else:
+            medal = "🎊"
+            congrats = f"You took place {position}" if english else f"Ти зайняв {position} місце"
+
+        return await self._send(telegram_id, self.templates.render(
+            "tournament_end",
+            language_code,
+            medal=medal,
+            tournament_name=tournament_name,
+            congrats=congrats,
+            points_won=points_won
+        ))
 
     async def send_new_event(
         self,
         telegram_id: int,
         event_title: str,
         event_description: str,
-        event_slug: str
+        event_slug: str,
+        language_code: str | None = None
     ) -> bool:
         """Send new event notification"""
-        text = f"""
-🎉 *Новий івент!*
+        message = self.new_event_message(telegram_id, event_title, event_description, event_slug, language_code)
+        return await self._send_message(telegram_id, message.text, message.reply_markup, message.parse_mode)
 
-*{event_title}*
-
-{event_description}
-
-Не пропусти!
-"""
-        keyboard = InlineKeyboardMarkup([[
-            InlineKeyboardButton(
-                "🎉 Детальніше",
-                web_app=WebAppInfo(url=f"{self.tma_url}/events/{event_slug}")
-            )
-        ]])
-
-        return await self._send_message(telegram_id, text, keyboard, parse_mode="Markdown")
+    def new_event_message(
+        self,
+        telegram_id: int,
+        event_title: str,
+        event_description: str,
+        event_slug: str,
+        language_code: str | None = None
+    ) -> OutgoingMessage:
+        """Build new event notification"""
+        return self.templates.render(
+            "new_event",
+            language_code,
+            event_title=event_title,
+            event_description=event_description,
+            event_slug=event_slug
+        ).to(telegram_id)
 
     async def send_reward_available(
         self,
         telegram_id: int,
-        reward_description: str
+        reward_description: str,
+        language_code: str | None = None
     ) -> bool:
         """Send reward available notification"""
-        text = f"""
-🎁 *У тебе є нагорода!*
-
-{reward_description}
-
-Забери її в додатку!
-"""
-        keyboard = InlineKeyboardMarkup([[
-            InlineKeyboardButton(
-                "🎁 Забрати нагороду",
-                web_app=WebAppInfo(url=f"{self.tma_url}/profile")
-            )
-        ]])
-
-        return await self._send_message(telegram_id, text, keyboard, parse_mode="Markdown")
+        return await self._send(telegram_id, self.templates.render(
+            "reward_available", language_code, reward_description=reward_description
+        ))
 
     async def send_level_up(
         self,
         telegram_id: int,
         new_level: int,
-        level_name: str
+        level_name: str,
+        language_code: str | None = None
     ) -> bool:
         """Send level up notification"""
-        text = f"""
-⭐ *Вітаємо з новим рівнем!*
+        message = self.level_up_message(telegram_id, new_level, level_name, language_code)
+        return await self._send_message(telegram_id, message.text, message.reply_markup, message.parse_mode)
 
-Тепер ти *Level {new_level} — {level_name}*!
-
-Продовжуй в тому ж дусі!
-"""
-        keyboard = InlineKeyboardMarkup([[
-            InlineKeyboardButton(
-                "👤 Мій профіль",
-                web_app=WebAppInfo(url=f"{self.tma_url}/profile")
-            )
-        ]])
-
-        return await self._send_message(telegram_id, text, keyboard, parse_mode="Markdown")
+    def level_up_message(
+        self,
+        telegram_id: int,
+        new_level: int,
+        level_name: str,
+        language_code: str | None = None
+    ) -> OutgoingMessage:
+        """Build level up notification"""
+        return self.templates.render(
+            "level_up", language_code, new_level=new_level, level_name=level_name
+        ).to(telegram_id)
 
     async def send_checkin_success(
         self,
         telegram_id: int,
         location_name: str,
         points_earned: int,
-        total_points: int
+        total_points: int,
+        language_code: str | None = None
     ) -> bool:
         """Send check-in success notification"""
-        text = f"""
-✅ *Check-in успішний!*
-
-📍 {location_name}
-💰 +{points_earned} балів
-
-Твій баланс: *{total_points} балів*
-"""
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton(
-                "🎮 Зіграти в гру",
-                web_app=WebAppInfo(url=f"{self.tma_url}/games")
-            )],
-            [InlineKeyboardButton(
-                "📊 Мій профіль",
-                web_app=WebAppInfo(url=f"{self.tma_url}/profile")
-            )]
-        ])
-
-        return await self._send_message(telegram_id, text, keyboard, parse_mode="Markdown")
+        return await self._send(telegram_id, self.templates.render(
+            "checkin_success",
+            language_code,
+            location_name=location_name,
+            points_earned=points_earned,
+            total_points=total_points
+        ))
+
+    async def _send(self, telegram_id: int, message: RenderedMessage) -> bool:
+        """Send rendered notification to user"""
+        return await self._send_message(telegram_id, message.text, message.reply_markup, message.parse_mode)
 
     async def _send_message(
         self,
@@ -201,5 +175,5 @@ class NotificationService:
             )
             return True
         except Exception as e:
-            print(f"Failed to send notification to {telegram_id}: {e}")
+            logger.warning("Failed to send notification to %s: %s", telegram_id, e)
             return False
@@ -0,0 +1,79 @@
+"""Bot summaries - cached user and leaderboard data for command replies"""
+
+import asyncio
+
+from app.core.cache import get_response_cache
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.user import User
+from app.schemas.leaderboard import LeaderboardResponse
+from app.services.leaderboard_service import (
+    LEADERBOARD_PROFILES_VERSION, LeaderboardService, get_period_date, leaderboard_version
+)
+from app.services.user_cache import get_user_cache
+from app.services.user_service import UserService
+
+LEADERBOARD_PERIOD = "weekly"
+LEADERBOARD_SIZE = 10
+
+# One loader per process refills the leaderboard head; concurrent misses wait for it
+_leaderboard_lock = asyncio.Lock()
+
+
+async def get_bot_user(telegram_id: int) -> User | None:
+    """
+    Get the user behind a Telegram account, None if it never opened the app.
+
+    The account's user_id and the user itself come from the identity
+    cache, which is invalidated whenever the user changes. A database
+    session is only opened on a miss.
+    """
+    user_cache = get_user_cache()
+    user_id = await user_cache.get_user_id(telegram_id)
+    if user_id == 0:
+        return None
+    generation = None
+    if user_id is not None:
+        user, generation = await user_cache.get(user_id)
+        if user is not None:
+            return user
+
+    async with AsyncSessionLocal() as db:
+        user = await UserService(db).get_by_telegram_id(telegram_id)
+
+    await user_cache.set_user_id(telegram_id, user.id if user else None)
+    # Without a generation read before loading, the user is not cached
+    # until the next command
+    if user is not None and generation is not None:
+        await user_cache.set(user, generation)
+    return user
+
+
+async def get_leaderboard_head() -> LeaderboardResponse:
+    """
+    Get the top of this week's cross-game board.
+
+    Cached under the board and profiles versions, so a finished game or a
+    new name is shown on the next command while a burst of commands between games is answered
+    without touching the database.
+    """
+    cache = get_response_cache()
+    version, profiles_version = await cache.get_versions(
+        leaderboard_version(None), LEADERBOARD_PROFILES_VERSION
+    )
+    key = f"leaderboard:{version}:{profiles_version}:{get_period_date(LEADERBOARD_PERIOD)}"
+
+    body = await cache.get("bot", key)
+    if body is None:
+        async with _leaderboard_lock:
+            body = await cache.get("bot", key)
+            if body is None:
+                async with AsyncSessionLocal() as db:
+                    board = await LeaderboardService(db).get_leaderboard(
+                        period_type=LEADERBOARD_PERIOD,
+                        limit=LEADERBOARD_SIZE
+                    )
+                body = board.model_dump_json().encode()
+                await cache.set("bot", key, body, settings.BOT_LEADERBOARD_CACHE_TTL_SECONDS)
+
+    return LeaderboardResponse.model_validate_json(body)
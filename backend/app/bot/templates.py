@@ -0,0 +1,253 @@
+"""Notification templates - compiled once per type and language"""
+
+import json
+from functools import lru_cache
+from typing import Any, NamedTuple
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, WebAppInfo
+from telegram.helpers import escape_markdown
+
+from app.bot.dispatcher import OutgoingMessage
+from app.core.config import settings
+
+DEFAULT_LANGUAGE = "uk"
+
+
+class TemplateSpec(NamedTuple):
+    """Source of one notification in one language"""
+    text: str
+    # One web app button per row, as (label, path); paths may use params
+    buttons: tuple[tuple[str, str], ...] = ()
+    parse_mode: str | None = "Markdown"
+
+
+TEMPLATES: dict[str, dict[str, TemplateSpec]] = {
+    "checkin_reminder": {
+        "uk": TemplateSpec(
+            "☕ Давно не бачились! Зайди до нашої кав'ярні та отримай +1 бал!",
+            (("☕ Check-in", "/checkin"),),
+            parse_mode=None,
+        ),
+        "en": TemplateSpec(
+            "☕ Long time no see! Drop by our coffee shop and get +1 point!",
+            (("☕ Check-in", "/checkin"),),
+            parse_mode=None,
+        ),
+    },
+    "tournament_start": {
+        "uk": TemplateSpec(
+            "\n🏆 *Новий турнір почався!*\n\n*{tournament_name}*\n\n"
+            "🎁 Призи: {prize_description}\n\nВізьми участь та вигравай круті нагороди!\n",
+            (("🎮 Взяти участь", "/games"),),
+        ),
+        "en": TemplateSpec(
+            "\n🏆 *A new tournament has started!*\n\n*{tournament_name}*\n\n"
+            "🎁 Prizes: {prize_description}\n\nJoin in and win great rewards!\n",
+            (("🎮 Join", "/games"),),
+        ),
+    },
+    "tournament_end": {
+        "uk": TemplateSpec(
+            "\n{medal} *Турнір завершено!*\n\n*{tournament_name}*\n\n"
+            "{congrats} та отримав *{points_won} балів*!\n\nДякуємо за участь!\n",
+            (("🏆 Результати", "/leaderboard"),),
+        ),
+        "en": TemplateSpec(
+            "\n{medal} *Tournament finished!*\n\n*{tournament_name}*\n\n"
+            "{congrats} and earned *{points_won} points*!\n\nThanks for playing!\n",
+            (("🏆 Results", "/leaderboard"),),
+        ),
+    },
+    "new_event": {
+        "uk": TemplateSpec(
+            "\n🎉 *Новий івент!*\n\n*{event_title}*\n\n{event_description}\n\nНе пропусти!\n",
+            (("🎉 Детальніше", "/events/{event_slug}"),),
+        ),
+        "en": TemplateSpec(
+            "\n🎉 *New event!*\n\n*{event_title}*\n\n{event_description}\n\nDon't miss it!\n",
+            (("🎉 Details", "/events/{event_slug}"),),
+        ),
+    },
+    "reward_available": {
+        "uk": TemplateSpec(
+            "\n🎁 *У тебе є нагорода!*\n\n{reward_description}\n\nЗабери її в додатку!\n",
+            (("🎁 Забрати нагороду", "/profile"),),
+        ),
+        "en": TemplateSpec(
+            "\n🎁 *You have a reward!*\n\n{reward_description}\n\nClaim it in the app!\n",
+            (("🎁 Claim reward", "/profile"),),
+        ),
+    },
+    "level_up": {
+        "uk": TemplateSpec(
+            "\n⭐ *Вітаємо з новим рівнем!*\n\nТепер ти *Level {new_level} — {level_name}*!\n\n"
+            "Продовжуй в тому ж дусі!\n",
+            (("👤 Мій профіль", "/profile"),),
+        ),
+        "en": TemplateSpec(
+            "\n⭐ *Congratulations on your new level!*\n\nYou are now *Level {new_level} — {level_name}*!\n\n"
+            "Keep it up!\n",
+            (("👤 My profile", "/profile"),),
+        ),
+    },
+    "checkin_success": {
+        "uk": TemplateSpec(
+            "\n✅ *Check-in успішний!*\n\n📍 {location_name}\n💰 +{points_earned} балів\n\n"
+            "Твій баланс: *{total_points} балів*\n",
+            (("🎮 Зіграти в гру", "/games"), ("📊 Мій профіль", "/profile")),
+        ),
+        "en": TemplateSpec(
+            "\n✅ *Check-in successful!*\n\n📍 {location_name}\n💰 +{points_earned} points\n\n"
+            "Your balance: *{total_points} points*\n",
+            (("🎮 Play a game", "/games"), ("📊 My profile", "/profile")),
+        ),
+    },
+    # Bot command replies
+    "balance": {
+        "uk": TemplateSpec(
+            "\n💰 *Твій баланс: {points} балів*\n\n⭐ Level {level} — {level_name}\n"
+            "📈 {experience} / {next_level_xp} XP\n",
+            (("👤 Переглянути профіль", "/profile"),),
+        ),
+        "en": TemplateSpec(
+            "\n💰 *Your balance: {points} points*\n\n⭐ Level {level} — {level_name}\n"
+            "📈 {experience} / {next_level_xp} XP\n",
+            (("👤 View profile", "/profile"),),
+        ),
+    },
+    "balance_unregistered": {
+        "uk": TemplateSpec(
+            "👋 Відкрий додаток, щоб отримати свої перші бали!",
+            (("☕ Відкрити PerkUP", "/"),),
+            parse_mode=None,
+        ),
+        "en": TemplateSpec(
+            "👋 Open the app to earn your first points!",
+            (("☕ Open PerkUP", "/"),),
+            parse_mode=None,
+        ),
+    },
+    "leaderboard_top": {
+        "uk": TemplateSpec(
+            "\n🏆 *Топ-{size} тижня*\n\n{lines}\n",
+            (("🏆 Leaderboard", "/leaderboard"),),
+        ),
+        "en": TemplateSpec(
+            "\n🏆 *Top {size} this week*\n\n{lines}\n",
+            (("🏆 Leaderboard", "/leaderboard"),),
+        ),
+    },
+    "leaderboard_empty": {
+        "uk": TemplateSpec(
+            "🏆 Цього тижня ще ніхто не грав — стань першим!",
+            (("🎮 Зіграти в гру", "/games"),),
+            parse_mode=None,
+        ),
+        "en": TemplateSpec(
+            "🏆 Nobody has played this week yet — be the first!",
+            (("🎮 Play a game", "/games"),),
+            parse_mode=None,
+        ),
+    },
+}
+
+
+class RenderedMessage(NamedTuple):
+    """Message rendered for a set of params, shared by all recipients"""
+    text: str
+    reply_markup: InlineKeyboardMarkup | None
+    parse_mode: str | None
+
+    def to(self, chat_id: int) -> OutgoingMessage:
+        """Address the message to one chat"""
+        return OutgoingMessage(chat_id, self.text, self.reply_markup, self.parse_mode)
+
+
+# Serialized keyboards of registry markups by id(); the markup is kept
+# alongside so its id cannot be reused
+_keyboard_data: dict[int, tuple[InlineKeyboardMarkup, dict]] = {}
+
+
+def keyboard_data(markup: InlineKeyboardMarkup) -> dict:
+    """Get markup as a dict, without serializing registry keyboards again"""
+    cached = _keyboard_data.get(id(markup))
+    if cached is not None and cached[0] is markup:
+        return cached[1]
+    return markup.to_dict()
+
+
+@lru_cache(maxsize=1024)
+def _load_keyboard(data: str) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup.de_json(json.loads(data), None)
+
+
+def load_keyboard(data: dict) -> InlineKeyboardMarkup:
+    """Rebuild a markup stored with keyboard_data, sharing equal keyboards"""
+    return _load_keyboard(json.dumps(data, sort_keys=True, ensure_ascii=False))
+
+
+class TemplateRegistry:
+    """
+    Renders notifications from TEMPLATES.
+
+    Each (type, language, params) combination is rendered once: a mass
+    send of one notification only pays for addressing each recipient.
+    Keyboards are built once per (type, language, button paths) and their
+    serialized form is cached for the outbox.
+    """
+
+    def __init__(self, templates: dict[str, dict[str, TemplateSpec]], tma_url: str):
+        self.templates = templates
+        self.tma_url = tma_url
+        self._keyboards: dict[tuple, InlineKeyboardMarkup] = {}
+        self.render = lru_cache(maxsize=4096)(self._render)
+
+    def language(self, language_code: str | None) -> str:
+        """Map a Telegram language code (e.g. "en-US") to a template language"""
+        if language_code:
+            language = language_code[:2].lower()
+            if language in ("uk", "en"):
+                return language
+        return DEFAULT_LANGUAGE
+
+    def _render(self, notification_type: str, language_code: str | None, **params: Any) -> RenderedMessage:
+        """Render a notification; cached, so params must be hashable"""
+        language = self.language(language_code)
+        spec = self.templates[notification_type].get(language) or self.templates[notification_type][DEFAULT_LANGUAGE]
+
+        if spec.parse_mode == "Markdown":
+            text_params = {
+                key: escape_markdown(value) if isinstance(value, str) else value
+                for key, value in params.items()
+            }
+        else:
+            text_params = params
+
+        return RenderedMessage(
+            spec.text.format(**text_params),
+            self._keyboard(notification_type, language, spec, params),
+            spec.parse_mode,
+        )
+
+    def _keyboard(self, notification_type: str, language: str, spec: TemplateSpec, params: dict) -> InlineKeyboardMarkup | None:
+        """Get the cached keyboard of a template for its button paths"""
+        if not spec.buttons:
+            return None
+
+        paths = tuple(path.format(**params) for _, path in spec.buttons)
+        key = (notification_type, language, paths)
+        markup = self._keyboards.get(key)
+        if markup is None:
+            markup = InlineKeyboardMarkup([
+                [InlineKeyboardButton(label, web_app=WebAppInfo(url=f"{self.tma_url}{path}"))]
+                for (label, _), path in zip(spec.buttons, paths)
+            ])
+            self._keyboards[key] = markup
+            _keyboard_data[id(markup)] = (markup, markup.to_dict())
+        return markup
+
+
+@lru_cache()
+def get_template_registry() -> TemplateRegistry:
+    """Get shared template registry"""
+    return TemplateRegistry(TEMPLATES, settings.TELEGRAM_WEBAPP_URL)
@@ -0,0 +1,152 @@
+"""Webhook-mode bot - Telegram pushes updates into the API process"""
+
+import asyncio
+import hashlib
+import logging
+import time
+
+from telegram import Update
+from telegram.ext import Application
+from telegram.request import BaseRequest
+
+from app.bot.handlers import register_handlers
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+BOT_UPDATES = REGISTRY.counter(
+    "bot_updates_total",
+    "Telegram webhook updates by outcome",
+    ("status",),
+)
+BOT_UPDATE_SECONDS = REGISTRY.histogram(
+    "bot_update_duration_seconds",
+    "Telegram update processing time",
+)
+
+
+class WebhookApplication(Application):
+    """
+    Application fed by the webhook endpoint instead of an Updater.
+
+    Counts accepted updates until their handlers finish, so the backlog
+    (queued plus waiting for a concurrent slot) stays bounded.
+    """
+
+    pending = 0
+
+    async def process_update(self, update: object) -> None:
+        start = time.perf_counter()
+        try:
+            await super().process_update(update)
+        finally:
+            BOT_UPDATE_SECONDS.observe(time.perf_counter() - start)
+            WebhookApplication.pending -= 1
+
+
+REGISTRY.gauge(
+    "bot_updates_pending",
+    "Accepted Telegram updates not yet processed",
+    collect=lambda: WebhookApplication.pending,
+)
+
+_application: WebhookApplication | None = None
+
+
+def webhook_secret() -> str:
+    """Secret Telegram sends in X-Telegram-Bot-Api-Secret-Token"""
+    if settings.TELEGRAM_WEBHOOK_SECRET:
+        return settings.TELEGRAM_WEBHOOK_SECRET
+    return hashlib.sha256(f"webhook:{settings.TELEGRAM_BOT_TOKEN}".encode()).hexdigest()[:32]
+
+
+def create_webhook_application(request: BaseRequest | None = None) -> WebhookApplication:
+    """
+    Create bot application without an Updater, processing updates concurrently.
+
+    A request replaces the Bot API HTTP client, e.g. with a fake Bot API in
+    tests.
+    """
+    builder = (
+        Application.builder()
+        .application_class(WebhookApplication)
+        .token(settings.TELEGRAM_BOT_TOKEN)
+        .base_url(settings.TELEGRAM_API_BASE_URL)
+        .updater(None)
+        .update_queue(asyncio.Queue(maxsize=settings.TELEGRAM_UPDATE_QUEUE_SIZE))
+        .concurrent_updates(settings.TELEGRAM_CONCURRENT_UPDATES)
+    )
+    if request is None:
+        builder = builder.connection_pool_size(settings.TELEGRAM_CONCURRENT_UPDATES)
+    else:
+        builder = builder.request(request)
+    application = builder.build()
+    register_handlers(application)
+    return application
+
+
+def get_webhook_application() -> WebhookApplication | None:
+    """Get running webhook application, None when webhook mode is off"""
+    return _application
+
+
+async def start_webhook_bot() -> WebhookApplication | None:
+    """
+    Start the bot in webhook mode if TELEGRAM_WEBHOOK_URL is configured.
+
+    Handlers run in this process, so they share its database pool and
+    caches. A failure to reach Telegram leaves the API running without
+    the bot.
+    """
+    global _application
+    if not (settings.TELEGRAM_BOT_TOKEN and settings.TELEGRAM_WEBHOOK_URL):
+        return None
+
+    application = create_webhook_application()
+    try:
+        await application.initialize()
+        await application.start()
+        if settings.TELEGRAM_SET_WEBHOOK:
+            await application.bot.set_webhook(
+                settings.TELEGRAM_WEBHOOK_URL,
+                secret_token=webhook_secret(),
+                max_connections=min(100, settings.TELEGRAM_CONCURRENT_UPDATES),
+            )
+    except Exception:
+        logger.exception("Telegram bot failed to start in webhook mode")
+        if application.running:
+            await application.stop()
+        await application.shutdown()
+        return None
+
+    _application = application
+    return application
+
+
+async def stop_webhook_bot():
+    """Finish in-flight updates and stop the bot"""
+    global _application
+    if _application is None:
+        return
+    await _application.stop()
+    await _application.shutdown()
+    _application = None
+    WebhookApplication.pending = 0
+
+
+def feed_update(application: WebhookApplication, data: dict) -> bool:
+    """
+    Queue an update for processing.
+
+    Returns:
+        False when the backlog is full
+    """
+    if WebhookApplication.pending >= settings.TELEGRAM_UPDATE_QUEUE_SIZE:
+        BOT_UPDATES.inc(("rejected",))
+        return False
+
+    application.update_queue.put_nowait(Update.de_json(data, application.bot))
+    WebhookApplication.pending += 1
+    BOT_UPDATES.inc(("accepted",))
+    return True
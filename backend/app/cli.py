@@ -0,0 +1,122 @@
+"""Management commands
+
+Usage:
+    python -m app.cli rebuild-global-leaderboard
+    python -m app.cli rebuild-rank-index
+    python -m app.cli broadcast-event <slug>
+    python -m app.cli notification-worker
+"""
+
+import argparse
+import asyncio
+import logging
+
+from app.bot.notifications import NotificationService
+from app.core.redis import close_redis
+from app.db.session import AsyncSessionLocal, engine, run_on_commit
+from app.jobs import (
+    rebuild_rank_index as run_rank_index_rebuild,
+    run_notification_worker,
+)
+from app.services.event_service import EventService
+from app.services.leaderboard_service import LeaderboardService
+from app.services.notification_outbox import NotificationOutbox
+from app.services.rank_index import get_rank_index
+
+
+async def rebuild_global_leaderboard(args: argparse.Namespace):
+    """Rebuild cross-game leaderboard rows from game_sessions"""
+    async with AsyncSessionLocal() as db:
+        leaderboard_service = LeaderboardService(db)
+        written = await leaderboard_service.rebuild_global_leaderboard()
+        await db.commit()
+        # Replaces the rank index's global boards
+        await run_on_commit(db)
+    print(f"Global leaderboard rebuilt: {written} rows")
+    if not get_rank_index().shared:
+        print("Rank index is per process (no Redis); restart API workers to reload it")
+
+
+async def rebuild_rank_index(args: argparse.Namespace):
+    """Load the current periods' leaderboards into the rank index"""
+    if not get_rank_index().shared:
+        print("Rank index is per process (no Redis); API workers load it on startup")
+        return
+    boards = await run_rank_index_rebuild(force=True)
+    if boards is None:
+        print("Rank index rebuild is already running in another process")
+    else:
+        print(f"Rank index rebuilt: {boards} boards")
+
+
+async def broadcast_event(args: argparse.Namespace):
+    """Queue a new event notification for every user with notifications enabled"""
+    notifications = NotificationService()
+    async with AsyncSessionLocal() as db:
+        event = await EventService(db).get_event_by_slug(args.slug)
+        if event is None:
+            print(f"Event {args.slug} not found")
+            return
+
+        title, description, slug = event.title, event.short_description or "", event.slug
+        queued = await NotificationOutbox(db).enqueue_broadcast(
+            "new_event",
+            title,
+            lambda recipient: notifications.new_event_message(
+                recipient.telegram_id, title, description, slug, recipient.language_code
+            )
+        )
+    print(f"Broadcast queued: {queued} notifications")
+
+
+async def notification_worker(args: argparse.Namespace):
+    """Deliver outbox notifications until interrupted"""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    print("Notification worker started")
+    await run_notification_worker(NotificationService().bot)
+
+
+COMMANDS = {
+    "rebuild-global-leaderboard": rebuild_global_leaderboard,
+    "rebuild-rank-index": rebuild_rank_index,
+    "broadcast-event": broadcast_event,
+    "notification-worker": notification_worker,
+}
+
+
+async def run(args: argparse.Namespace):
+    """Run command and release database connections"""
+    try:
+        await COMMANDS[args.command](args)
+    finally:
+        await close_redis()
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser(
+        "rebuild-global-leaderboard",
+        help="Rebuild cross-game leaderboard rows from game_sessions",
+    )
+    subparsers.add_parser(
+        "rebuild-rank-index",
+        help="Load current leaderboards into the Redis rank index",
+    )
+    broadcast = subparsers.add_parser(
+        "broadcast-event",
+        help="Queue a new event notification for all users",
+    )
+    broadcast.add_argument("slug")
+    subparsers.add_parser(
+        "notification-worker",
+        help="Deliver queued notifications (run any number of these)",
+    )
+
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""Response cache - in-process LRU tier in front of a shared Redis tier"""
+
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Awaitable, Callable
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+
+class CacheBackend:
+    """Shared cache tier storing raw bytes with a TTL"""
+
+    async def get(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        raise NotImplementedError
+
+    async def add(self, key: str, value: bytes, ttl: int) -> bool:
+        """Set key only if it is absent, returns whether it was set"""
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        """Get several keys in one round trip"""
+        raise NotImplementedError
+
+    async def incr(self, key: str) -> int:
+        """Atomically increment a counter that never expires"""
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process backend, used as a test double and when Redis is not configured.
+
+    Bounded like Redis with an LRU eviction policy: past maxsize the least
+    recently used entry is dropped. Counters from incr are never evicted,
+    since a generation that went back to zero could match stale entries.
+    """
+
+    def __init__(self, maxsize: int = 10_000):
+        self.maxsize = maxsize
+        self.data: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+
+    async def get(self, key: str) -> bytes | None:
+        item = self.data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at < time.monotonic():
+            del self.data[key]
+            return None
+        self.data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._store(key, value, time.monotonic() + ttl)
+
+    async def add(self, key: str, value: bytes, ttl: int) -> bool:
+        if await self.get(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def delete(self, key: str) -> None:
+        self.data.pop(key, None)
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        return [await self.get(key) for key in keys]
+
+    async def incr(self, key: str) -> int:
+        value = int(await self.get(key) or 0) + 1
+        self._store(key, str(value).encode(), float("inf"))
+        return value
+
+    def _store(self, key: str, value: bytes, expires_at: float) -> None:
+        self.data[key] = (value, expires_at)
+        self.data.move_to_end(key)
+        if len(self.data) <= self.maxsize:
+            return
+        for oldest, (_, oldest_expires_at) in self.data.items():
+            if oldest_expires_at != float("inf"):
+                del self.data[oldest]
+                return
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis backend shared by all workers"""
+
+    def __init__(self, redis: Redis, prefix: str = "cache:"):
+        self.redis = redis
+        self.prefix = prefix
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.redis.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self.redis.set(self.prefix + key, value, ex=ttl)
+
+    async def add(self, key: str, value: bytes, ttl: int) -> bool:
+        return bool(await self.redis.set(self.prefix + key, value, ex=ttl, nx=True))
+
+    async def delete(self, key: str) -> None:
+        await self.redis.unlink(self.prefix + key)
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        return await self.redis.mget([self.prefix + key for key in keys])
+
+    async def incr(self, key: str) -> int:
+        return await self.redis.incr(self.prefix + key)
+
+
+class LRUCache:
+    """Bounded in-process LRU with per-entry expiry"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+
+    def get(self, key: str) -> bytes | None:
+        item = self.data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at < time.monotonic():
+            del self.data[key]
+            return None
+        self.data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self.data[key] = (value, time.monotonic() + ttl)
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self.data.pop(key, None)
+
+
+class ResponseCache:
+    """
+    Read-through cache for serialized responses.
+
+    Keys are stored as "<namespace>:<generation>:<key>". Invalidating a
+    namespace bumps its generation, one INCR instead of a keyspace scan;
+    entries of older generations are never read again and expire on their
+    TTL. Generations are kept in the local tier like entries, and the local
+    tier only lives for a few seconds, which bounds how long other workers
+    serve an entry invalidated elsewhere.
+    """
+
+    def __init__(self, backend: CacheBackend, local: LRUCache | None = None):
+        self.backend = backend
+        self.local = local
+        self.stats = {"local_hits": 0, "hits": 0, "misses": 0}
+
+    async def _full_key(self, namespace: str, key: str) -> str:
+        """Key of an entry in the namespace's current generation"""
+        generation_key = f"generation:{namespace}"
+        generation = self.local.get(generation_key) if self.local is not None else None
+        if generation is None:
+            generation = await self.backend.get(f"version:{generation_key}") or b"0"
+            if self.local is not None:
+                self.local.set(generation_key, generation)
+        return f"{namespace}:{generation.decode()}:{key}"
+
+    async def get(self, namespace: str, key: str) -> bytes | None:
+        """Get cached bytes from the fastest tier that has them"""
+        return await self._get(await self._full_key(namespace, key))
+
+    async def set(self, namespace: str, key: str, value: bytes, ttl: int) -> None:
+        """Store bytes in both tiers"""
+        await self._set(await self._full_key(namespace, key), value, ttl)
+
+    async def get_or_set(
+        self,
+        namespace: str,
+        key: str,
+        ttl: int,
+        loader: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        """
+        Get cached bytes, or load, store and return them on a miss.
+
+        The value is stored under the generation read before loading, so a
+        load racing with an invalidation never outlives it.
+        """
+        full_key = await self._full_key(namespace, key)
+        value = await self._get(full_key)
+        if value is None:
+            value = await loader()
+            await self._set(full_key, value, ttl)
+        return value
+
+    async def _get(self, full_key: str) -> bytes | None:
+        if self.local is not None:
+            value = self.local.get(full_key)
+            if value is not None:
+                self.stats["local_hits"] += 1
+                return value
+
+        value = await self.backend.get(full_key)
+        if value is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        if self.local is not None:
+            self.local.set(full_key, value)
+        return value
+
+    async def _set(self, full_key: str, value: bytes, ttl: int) -> None:
+        await self.backend.set(full_key, value, ttl)
+        if self.local is not None:
+            self.local.set(full_key, value, ttl)
+
+    async def get_version(self, name: str) -> int:
+        """
+        Get version marker of a resource.
+
+        Versions bypass the local tier, so every worker sees a bump at once.
+        """
+        value = await self.backend.get(f"version:{name}")
+        return int(value) if value else 0
+
+    async def get_versions(self, *names: str) -> list[int]:
+        """Get several version markers in one round trip"""
+        values = await self.backend.get_many([f"version:{name}" for name in names])
+        return [int(value) if value else 0 for value in values]
+
+    async def bump_version(self, name: str) -> int:
+        """Mark a resource as changed"""
+        return await self.backend.incr(f"version:{name}")
+
+    async def invalidate(self, namespace: str, key: str | None = None) -> None:
+        """Drop one key, or the whole namespace when key is omitted"""
+        if key is not None:
+            full_key = await self._full_key(namespace, key)
+            await self.backend.delete(full_key)
+            if self.local is not None:
+                self.local.delete(full_key)
+            return
+
+        generation = await self.bump_version(f"generation:{namespace}")
+        if self.local is not None:
+            self.local.set(f"generation:{namespace}", str(generation).encode())
+
+
+def create_cache_backend() -> CacheBackend:
+    """Create Redis backend, or in-process backend when Redis is not configured"""
+    redis = get_redis()
+    if redis is None:
+        return MemoryCacheBackend(settings.CACHE_MEMORY_MAXSIZE)
+    return RedisCacheBackend(redis)
+
+
+@lru_cache()
+def get_response_cache() -> ResponseCache:
+    """Get shared response cache instance"""
+    local = None
+    if settings.CACHE_LOCAL_MAXSIZE > 0:
+        local = LRUCache(settings.CACHE_LOCAL_MAXSIZE, settings.CACHE_LOCAL_TTL_SECONDS)
+    return ResponseCache(create_cache_backend(), local)
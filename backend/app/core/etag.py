@@ -0,0 +1,45 @@
+"""ETag and conditional GET helpers"""
+
+import hashlib
+
+from fastapi import Request, Response
+
+
+def compute_etag(*parts) -> str:
+    """Compute a strong ETag from version markers or response bytes"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check request's If-None-Match header against an ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """Build an empty 304 response"""
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
+
+
+def conditional_json(request: Request, body: bytes, cache_control: str) -> Response:
+    """Serve pre-serialized JSON, or 304 if the client already has it"""
+    etag = compute_etag(body)
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
@@ -0,0 +1,145 @@
+"""Request and database instrumentation exported through the metrics registry"""
+
+import time
+from contextvars import ContextVar
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import REGISTRY
+
+REQUESTS = REGISTRY.counter(
+    "http_requests_total",
+    "HTTP requests by route template and status",
+    ("method", "route", "status"),
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route"),
+)
+REQUESTS_IN_PROGRESS = REGISTRY.gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    ("method", "route"),
+)
+REQUEST_DB_QUERIES = REGISTRY.histogram(
+    "http_request_db_queries",
+    "Database queries executed per request",
+    ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+REQUEST_DB_SECONDS = REGISTRY.histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in database queries per request",
+    ("method", "route"),
+)
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    "db_query_duration_seconds",
+    "Database query latency",
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class QueryStats:
+    """Database usage of one request"""
+
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# Set by the middleware; SQLAlchemy's greenlets inherit the request's context
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def instrument_queries(engine: AsyncEngine):
+    """Record query count and time for an engine"""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        DB_QUERY_SECONDS.observe(elapsed)
+        stats = _query_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += elapsed
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _on_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start"):
+            connection.info["query_start"].pop()
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording per-route request metrics.
+
+    Routes are labelled by their path template, e.g. /api/v1/games/{slug},
+    so label cardinality stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp, routes: list[BaseRoute]):
+        self.app = app
+        self.routes = routes
+        self._matchers: list[tuple[Callable, set[str] | None, str]] | None = None
+
+    def _route_template(self, scope: Scope) -> str:
+        # Only the compiled path regexes are tried, without building path
+        # params like Route.matches does
+        if self._matchers is None:
+            self._matchers = [
+                (route.path_regex.match, getattr(route, "methods", None), route.path)
+                for route in self.routes
+                if hasattr(route, "path_regex")
+            ]
+
+        path = scope["path"]
+        method = scope["method"]
+        partial = None
+        for match, methods, template in self._matchers:
+            if match(path):
+                if methods is None or method in methods:
+                    return template
+                partial = partial or template
+        return partial or UNMATCHED_ROUTE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        labels = (scope["method"], self._route_template(scope))
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = QueryStats()
+        token = _query_stats.set(stats)
+        REQUESTS_IN_PROGRESS.inc(labels)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_SECONDS.observe(time.perf_counter() - start, labels)
+            REQUESTS_IN_PROGRESS.dec(labels)
+            REQUESTS.inc((*labels, str(status_code)))
+            REQUEST_DB_QUERIES.observe(stats.count, labels)
+            REQUEST_DB_SECONDS.observe(stats.seconds, labels)
+            _query_stats.reset(token)
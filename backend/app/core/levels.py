@@ -0,0 +1,86 @@
+"""Level progression table - experience thresholds, names and point bonuses"""
+
+import json
+from bisect import bisect_right
+from functools import lru_cache
+from typing import NamedTuple
+
+from app.core.config import settings
+
+
+class Level(NamedTuple):
+    """One level of the progression"""
+    number: int
+    min_experience: int
+    name: str
+    bonus: float
+
+
+DEFAULT_LEVELS = [
+    {"min_experience": 0, "name": "Новачок", "bonus": 0},
+    {"min_experience": 100, "name": "Кавоман", "bonus": 0.05},
+    {"min_experience": 300, "name": "Бариста-учень", "bonus": 0.10},
+    {"min_experience": 600, "name": "Бариста", "bonus": 0.15},
+    {"min_experience": 1000, "name": "Старший бариста", "bonus": 0.20},
+    {"min_experience": 1500, "name": "Майстер", "bonus": 0.25},
+    {"min_experience": 2100, "name": "Експерт", "bonus": 0.30},
+    {"min_experience": 2800, "name": "Гуру кави", "bonus": 0.35},
+    {"min_experience": 3600, "name": "Легенда", "bonus": 0.40},
+    {"min_experience": 4500, "name": "Coffee King", "bonus": 0.50},
+]
+
+
+class LevelTable:
+    """
+    Immutable progression table, levels numbered from 1.
+
+    Level lookup by experience is a bisect over the thresholds; everything
+    else is indexed by level number.
+    """
+
+    def __init__(self, levels: list[dict]):
+        if not levels:
+            raise ValueError("Level table is empty")
+
+        self.levels = tuple(
+            Level(number, int(level["min_experience"]), level["name"], float(level.get("bonus", 0)))
+            for number, level in enumerate(levels, start=1)
+        )
+        self.thresholds = tuple(level.min_experience for level in self.levels)
+        if list(self.thresholds) != sorted(set(self.thresholds)):
+            raise ValueError("Level thresholds must be strictly increasing")
+
+    @property
+    def max_level(self) -> int:
+        """Highest reachable level"""
+        return len(self.levels)
+
+    def level_for(self, experience: int) -> int:
+        """Get level reached with experience (0 below the first threshold)"""
+        return bisect_right(self.thresholds, experience)
+
+    def get(self, level: int) -> Level:
+        """Get a level, clamped to the table"""
+        return self.levels[min(max(level, 1), self.max_level) - 1]
+
+    def bonus(self, level: int) -> float:
+        """Get points bonus multiplier of a level"""
+        return self.levels[level - 1].bonus if 1 <= level <= self.max_level else 0
+
+    def next_level_xp(self, level: int) -> int:
+        """Get experience needed for the level after this one (the last threshold at max level)"""
+        return self.thresholds[min(max(level, 0), self.max_level - 1)]
+
+
+def load_level_table(path: str = "") -> LevelTable:
+    """Load table from a JSON list of {min_experience, name, bonus}, or the default one"""
+    if not path:
+        return LevelTable(DEFAULT_LEVELS)
+    with open(path, encoding="utf-8") as file:
+        return LevelTable(json.load(file))
+
+
+@lru_cache()
+def get_level_table() -> LevelTable:
+    """Get configured level table"""
+    return load_level_table(settings.LEVELS_FILE)
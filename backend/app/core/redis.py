@@ -0,0 +1,30 @@
+"""Redis client management"""
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+
+_redis: Redis | None = None
+
+
+def get_redis() -> Redis | None:
+    """
+    Get shared Redis client.
+
+    Returns None when REDIS_URL is not configured, so callers can fall
+    back to their in-process implementations.
+    """
+    global _redis
+    if not settings.REDIS_URL:
+        return None
+    if _redis is None:
+        _redis = Redis.from_url(settings.REDIS_URL)
+    return _redis
+
+
+async def close_redis():
+    """Close shared Redis client"""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
@@ -4,7 +4,9 @@ import hmac
 import hashlib
 import json
 import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 from urllib.parse import parse_qs
 
@@ -21,6 +23,20 @@ class TokenData(BaseModel):
     exp: datetime
 
 
+# Verified tokens by SHA-256 digest, most recently used last
+_verified_tokens: OrderedDict[bytes, TokenData] = OrderedDict()
+
+
+@lru_cache()
+def get_telegram_secret_key(bot_token: str) -> bytes:
+    """Derive the WebAppData secret key for a bot token"""
+    return hmac.new(
+        "WebAppData".encode(),
+        bot_token.encode(),
+        hashlib.sha256
+    ).digest()
+
+
 def validate_telegram_init_data(init_data: str) -> dict:
     """
     Validate initData from Telegram Web App
@@ -42,12 +58,7 @@ def validate_telegram_init_data(init_data: str) -> dict:
             check_items.append(f"{key}={value[0]}")
     data_check_string = '\n'.join(check_items)
 
-    # Create secret_key
-    secret_key = hmac.new(
-        "WebAppData".encode(),
-        settings.TELEGRAM_BOT_TOKEN.encode(),
-        hashlib.sha256
-    ).digest()
+    secret_key = get_telegram_secret_key(settings.TELEGRAM_BOT_TOKEN)
 
     # Verify hash
     calculated_hash = hmac.new(
@@ -56,7 +67,7 @@ def validate_telegram_init_data(init_data: str) -> dict:
         hashlib.sha256
     ).hexdigest()
 
-    if calculated_hash != hash_value:
+    if not hmac.compare_digest(calculated_hash, hash_value):
         raise ValueError("Invalid hash")
 
     # Check auth_date (not older than 24 hours)
@@ -81,21 +92,40 @@ def create_access_token(user_id: int, telegram_id: int) -> str:
 
 
 def decode_access_token(token: str) -> Optional[TokenData]:
-    """Decode and validate JWT access token"""
+    """
+    Decode and validate JWT access token.
+
+    Verified tokens are memoized by digest until they expire, so repeated
+    requests with the same token skip signature verification.
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    token_data = _verified_tokens.get(digest)
+    if token_data is not None:
+        if token_data.exp > datetime.utcnow():
+            _verified_tokens.move_to_end(digest)
+            return token_data
+        del _verified_tokens[digest]
+
     try:
         payload = jwt.decode(
             token,
             settings.JWT_SECRET_KEY,
             algorithms=[settings.JWT_ALGORITHM]
         )
-        return TokenData(
+        token_data = TokenData(
             user_id=payload.get("user_id"),
             telegram_id=payload.get("telegram_id"),
-            exp=datetime.fromtimestamp(payload.get("exp"))
+            exp=datetime.utcfromtimestamp(payload.get("exp"))
         )
     except JWTError:
         return None
 
+    if settings.JWT_CACHE_MAXSIZE > 0:
+        _verified_tokens[digest] = token_data
+        while len(_verified_tokens) > settings.JWT_CACHE_MAXSIZE:
+            _verified_tokens.popitem(last=False)
+    return token_data
+
 
 def validate_game_score(score: int, duration: int, game_slug: str) -> bool:
     """
@@ -0,0 +1,61 @@
+"""Connection pool instrumentation"""
+
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.metrics import REGISTRY
+
+POOL_WAIT_SECONDS = REGISTRY.histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting to check out a connection from the pool",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+POOL_HOLD_SECONDS = REGISTRY.histogram(
+    "db_pool_hold_seconds",
+    "Time a connection stays checked out, usually one request's transaction",
+)
+POOL_TIMEOUTS = REGISTRY.counter(
+    "db_pool_timeouts_total",
+    "Checkouts that gave up after pool_timeout",
+)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+
+
+def instrument_pool(engine: AsyncEngine):
+    """Export pool gauges and record connection hold time for an engine"""
+    pool = engine.sync_engine.pool
+
+    REGISTRY.gauge("db_pool_size", "Configured pool size", collect=pool.size)
+    REGISTRY.gauge("db_pool_checked_out", "Connections currently checked out", collect=pool.checkedout)
+    REGISTRY.gauge("db_pool_checked_in", "Idle connections in the pool", collect=pool.checkedin)
+    REGISTRY.gauge(
+        "db_pool_overflow",
+        "Connections open beyond pool_size",
+        collect=lambda: max(pool.overflow(), 0),
+    )
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            POOL_HOLD_SECONDS.observe(time.perf_counter() - checked_out_at)
@@ -1,16 +1,32 @@
 """Database session management"""
 
+import logging
+from typing import Awaitable, Callable
+
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 
 from app.core.config import settings
+from app.core.instrumentation import instrument_queries
+from app.db.pool import InstrumentedPool, instrument_pool
+
+logger = logging.getLogger(__name__)
 
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DB_ECHO,
     future=True,
+    poolclass=InstrumentedPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args={"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
 )
+instrument_pool(engine)
+instrument_queries(engine)
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -25,12 +41,32 @@ AsyncSessionLocal = async_sessionmaker(
 Base = declarative_base()
 
 
+def on_commit(session: AsyncSession, callback: Callable[[], Awaitable]):
+    """Run callback after the request's transaction commits"""
+    session.info.setdefault("on_commit", []).append(callback)
+
+
+async def run_on_commit(session: AsyncSession):
+    """
+    Run the callbacks queued with on_commit, once the session has committed.
+
+    The data is already persisted, so a failing callback (e.g. Redis being
+    unreachable for a cache invalidation) is logged and the rest still run.
+    """
+    for callback in session.info.pop("on_commit", []):
+        try:
+            await callback()
+        except Exception:
+            logger.exception("on_commit callback %r failed", callback)
+
+
 async def get_db():
     """Dependency for getting database session"""
     async with AsyncSessionLocal() as session:
         try:
             yield session
             await session.commit()
+            await run_on_commit(session)
         except Exception:
             await session.rollback()
             raise
@@ -0,0 +1,140 @@
+"""Background jobs run inside the API process"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+from sqlalchemy import select, func
+
+from app.bot.dispatcher import NotificationDispatcher
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.counter_buffer import CounterService
+from app.services.leaderboard_service import get_period_date
+from app.services.notification_outbox import NotificationOutbox
+from app.services.rank_index import get_rank_index, leaderboard_key
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock keys, so only one worker runs a job per tick
+RANK_INDEX_LOCK_KEY = 7_100_002
+
+_tasks: list[asyncio.Task] = []
+
+
+async def rebuild_rank_index(force: bool = False) -> int | None:
+    """
+    Load the current periods' boards into the rank index.
+
+    A shared (Redis) index is rebuilt by one worker at a time under an
+    advisory lock, and on startup only when it has no all-time global
+    board yet. A per-process index is always loaded.
+
+    Returns:
+        Number of boards rebuilt, or None if skipped
+    """
+    rank_index = get_rank_index()
+    async with AsyncSessionLocal() as db:
+        if rank_index.shared:
+            locked = await db.scalar(select(func.pg_try_advisory_xact_lock(RANK_INDEX_LOCK_KEY)))
+            if not locked:
+                return None
+            all_time = leaderboard_key(None, "all_time", get_period_date("all_time"))
+            if not force and await rank_index.size(all_time):
+                return None
+        boards = await rank_index.rebuild(db)
+        await db.commit()
+    logger.info("Rank index rebuilt (%d boards)", boards)
+    return boards
+
+
+async def flush_counters() -> int:
+    """
+    Move buffered counter deltas to the database.
+
+    Returns:
+        Number of updated rows
+    """
+    async with AsyncSessionLocal() as db:
+        return await CounterService(db).flush()
+
+
+async def deliver_notifications(dispatcher: NotificationDispatcher) -> int:
+    """
+    Send one batch of pending outbox notifications.
+
+    Returns:
+        Number of claimed notifications
+    """
+    async with AsyncSessionLocal() as db:
+        return await NotificationOutbox(db).deliver_batch(dispatcher, settings.NOTIFICATION_CLAIM_SIZE)
+
+
+async def run_notification_worker(bot):
+    """
+    Deliver outbox notifications until cancelled.
+
+    Any number of workers can run: each leases the rows it claims, and
+    TELEGRAM_GLOBAL_RATE is shared through Redis (per process without
+    it, so run a single worker then). Claims batches back to back while
+    there is a backlog and polls otherwise.
+    """
+    dispatcher = NotificationDispatcher(bot)
+    while True:
+        try:
+            claimed = await deliver_notifications(dispatcher)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Notification delivery failed")
+            claimed = 0
+        if not claimed:
+            await asyncio.sleep(settings.NOTIFICATION_POLL_INTERVAL_SECONDS)
+
+
+async def run_once(name: str, job: Callable[[], Awaitable]):
+    """Run job once, logging instead of raising on failure"""
+    try:
+        await job()
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        logger.exception("Background job %s failed", name)
+
+
+async def run_periodic(name: str, interval_seconds: float, job: Callable[[], Awaitable]):
+    """Run job every interval_seconds until cancelled"""
+    while True:
+        try:
+            await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Background job %s failed", name)
+        await asyncio.sleep(interval_seconds)
+
+
+def start_background_jobs():
+    """Start the startup and periodic jobs configured in settings"""
+    _tasks.append(asyncio.create_task(run_once("rank_index_rebuild", rebuild_rank_index)))
+    if settings.COUNTER_FLUSH_INTERVAL_SECONDS > 0:
+        _tasks.append(asyncio.create_task(run_periodic(
+            "counter_flush",
+            settings.COUNTER_FLUSH_INTERVAL_SECONDS,
+            flush_counters,
+        )))
+
+
+async def stop_background_jobs():
+    """Cancel running periodic jobs"""
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
+
+    # In-process deltas would be lost on exit
+    if settings.COUNTER_FLUSH_INTERVAL_SECONDS > 0:
+        try:
+            await flush_counters()
+        except Exception:
+            logger.exception("Final counter flush failed")
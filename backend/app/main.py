@@ -1,16 +1,24 @@
 """Main FastAPI application"""
 
+import hmac
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
 from app.core.config import settings
 from app.api.v1 import api_router
+from app.bot.webhook import start_webhook_bot, stop_webhook_bot
+from app.core.cache import get_response_cache
+from app.core.instrumentation import MetricsMiddleware
+from app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY
+from app.core.redis import close_redis
+from app.core.security import get_telegram_secret_key
 from app.db.session import engine, Base
+from app.jobs import start_background_jobs, stop_background_jobs
 
 
 # Rate limiter
@@ -28,10 +36,24 @@ async def lifespan(app: FastAPI):
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
 
+    # Derive Telegram initData secret once instead of on every login
+    if settings.TELEGRAM_BOT_TOKEN:
+        get_telegram_secret_key(settings.TELEGRAM_BOT_TOKEN)
+
+    # Also loads the rank index, in the background so startup never waits on it
+    start_background_jobs()
+
+    # Bot updates are served by the API workers when a webhook is configured
+    if await start_webhook_bot():
+        print("Telegram bot started in webhook mode")
+
     yield
 
     # Shutdown
     print(f"Shutting down {settings.APP_NAME}...")
+    await stop_webhook_bot()
+    await stop_background_jobs()
+    await close_redis()
     await engine.dispose()
 
 
@@ -58,12 +80,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost middleware, so latency covers the whole stack
+app.add_middleware(MetricsMiddleware, routes=app.router.routes)
+
 
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     """Health check endpoint for monitoring"""
-    return {"status": "healthy", "app": settings.APP_NAME}
+    return {
+        "status": "healthy",
+        "app": settings.APP_NAME,
+        "cache": get_response_cache().stats,
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus metrics endpoint, for scrapers sending METRICS_TOKEN as a bearer token"""
+    authorization = request.headers.get("authorization", "").encode()
+    expected = f"Bearer {settings.METRICS_TOKEN}".encode()
+    if not settings.METRICS_TOKEN or not hmac.compare_digest(authorization, expected):
+        # Same answer as for an unknown path, so the endpoint is not advertised
+        return JSONResponse(status_code=404, content={"detail": "Not Found"})
+    return PlainTextResponse(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
 
 
 # Include API router
@@ -1,7 +1,7 @@
 """Checkin model"""
 
 from datetime import datetime, date
-from sqlalchemy import BigInteger, Integer, DateTime, Date, Numeric, ForeignKey, UniqueConstraint
+from sqlalchemy import BigInteger, Integer, DateTime, Date, Numeric, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.session import Base
@@ -40,3 +40,20 @@ class Checkin(Base):
 
     def __repr__(self) -> str:
         return f"<Checkin {self.id} (User {self.user_id} at Location {self.location_id})>"
+
+
+# Keyset pagination index for check-in history over (created_at, id)
+Index(
+    "idx_checkins_user_keyset",
+    Checkin.user_id,
+    Checkin.created_at.desc(),
+    Checkin.id.desc(),
+)
+
+# Rolling cooldown lookups of the last check-in per (user, location)
+Index(
+    "idx_checkins_user_location_recent",
+    Checkin.user_id,
+    Checkin.location_id,
+    Checkin.created_at.desc(),
+)
@@ -1,7 +1,7 @@
 """Leaderboard model"""
 
 from datetime import datetime, date
-from sqlalchemy import Integer, String, DateTime, Date, ForeignKey, UniqueConstraint
+from sqlalchemy import Integer, String, DateTime, Date, ForeignKey, UniqueConstraint, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.session import Base
@@ -25,17 +25,21 @@ class Leaderboard(Base):
     best_score: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     games_played: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
 
-    # Rank (calculated)
-    rank: Mapped[int | None] = mapped_column(Integer, nullable=True)
-
     # Timestamps
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
 
-    # Unique constraint
+    # Unique constraints (game_id NULL rows are the cross-game board and
+    # need their own partial index, since NULLs never conflict)
     __table_args__ = (
         UniqueConstraint("user_id", "game_id", "period_type", "period_date", name="uq_leaderboard_entry"),
+        Index(
+            "uq_leaderboard_global_entry",
+            "user_id", "period_type", "period_date",
+            unique=True,
+            postgresql_where=text("game_id IS NULL"),
+        ),
     )
 
     # Relationships
@@ -43,4 +47,24 @@ class Leaderboard(Base):
     game = relationship("Game")
 
     def __repr__(self) -> str:
-        return f"<Leaderboard {self.id} (User {self.user_id}, {self.period_type}, Rank {self.rank})>"
+        return f"<Leaderboard {self.id} (User {self.user_id}, {self.period_type}, {self.total_score})>"
+
+
+# Keyset pagination indexes over (total_score, user_id), one per board kind
+Index(
+    "idx_leaderboard_game_keyset",
+    Leaderboard.game_id,
+    Leaderboard.period_type,
+    Leaderboard.period_date,
+    Leaderboard.total_score.desc(),
+    Leaderboard.user_id.desc(),
+    postgresql_where=Leaderboard.game_id.is_not(None),
+)
+Index(
+    "idx_leaderboard_global_keyset",
+    Leaderboard.period_type,
+    Leaderboard.period_date,
+    Leaderboard.total_score.desc(),
+    Leaderboard.user_id.desc(),
+    postgresql_where=Leaderboard.game_id.is_(None),
+)
@@ -2,7 +2,7 @@
 
 import uuid
 from datetime import datetime
-from sqlalchemy import String, DateTime, Text, Boolean, ForeignKey
+from sqlalchemy import Integer, String, DateTime, Text, Boolean, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -30,6 +30,9 @@ class Notification(Base):
     channel: Mapped[str] = mapped_column(String(20), default="telegram", nullable=False)
     sent_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     delivered: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    leased_until: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)  # claimed by a worker
+    next_attempt_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)  # retry backoff
 
     # Status
     is_read: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
@@ -43,3 +46,11 @@ class Notification(Base):
 
     def __repr__(self) -> str:
         return f"<Notification {self.id} ({self.type} for User {self.user_id})>"
+
+
+# Outbox: pending notifications in claim order
+Index(
+    "idx_notifications_outbox",
+    Notification.created_at,
+    postgresql_where=Notification.sent_at.is_(None),
+)
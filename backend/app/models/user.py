@@ -4,6 +4,7 @@ from datetime import datetime
 from sqlalchemy import BigInteger, Boolean, Integer, String, DateTime, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.core.levels import get_level_table
 from app.db.session import Base
 
 
@@ -57,18 +58,12 @@ class User(Base):
         """Get display name (first_name or username)"""
         return self.first_name or self.username or f"User {self.telegram_id}"
 
-    def calculate_level(self) -> int:
-        """Calculate user level based on experience"""
-        level_thresholds = [0, 100, 300, 600, 1000, 1500, 2100, 2800, 3600, 4500]
-        for i, threshold in enumerate(level_thresholds):
-            if self.experience < threshold:
-                return i
-        return 10
+    def calculate_level(self, experience: int | None = None) -> int:
+        """Calculate user level based on experience (current experience by default)"""
+        if experience is None:
+            experience = self.experience
+        return get_level_table().level_for(experience)
 
     def get_level_bonus(self) -> float:
         """Get points bonus multiplier based on level"""
-        bonuses = {
-            1: 0, 2: 0.05, 3: 0.10, 4: 0.15, 5: 0.20,
-            6: 0.25, 7: 0.30, 8: 0.35, 9: 0.40, 10: 0.50
-        }
-        return bonuses.get(self.level, 0)
+        return get_level_table().bonus(self.level)
@@ -1,14 +1,14 @@
 """Checkin schemas"""
 
 from datetime import datetime, date
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.schemas.location import LocationResponse
 
 
 class CheckinCreate(BaseModel):
-    """Schema for creating a checkin"""
-    location_id: int
+    """Schema for creating a checkin, location_id is resolved from coordinates when omitted"""
+    location_id: int | None = None
     latitude: float
     longitude: float
 
@@ -41,13 +41,34 @@ class CheckinHistoryResponse(BaseModel):
     """Checkin history response"""
     checkins: list[CheckinResponse]
     total: int
-    page: int
     per_page: int
+    next_cursor: str | None = None
+
+
+class CanCheckinBatchRequest(BaseModel):
+    """Batch eligibility request, all active locations when location_ids is omitted"""
+    location_ids: list[int] | None = Field(default=None, max_length=500)
+    latitude: float | None = None
+    longitude: float | None = None
+
+
+class CanCheckinStatus(BaseModel):
+    """Check-in eligibility at one location"""
+    location_id: int
+    can_checkin: bool
+    reason: str | None = None  # cooldown_active, too_far, location_not_found
+    cooldown_remaining_seconds: int = 0
+    distance_meters: int | None = None
+
+
+class CanCheckinBatchResponse(BaseModel):
+    """Batch eligibility response"""
+    locations: list[CanCheckinStatus]
 
 
 class CheckinError(BaseModel):
     """Checkin error response"""
     success: bool = False
-    error_code: str  # too_far, cooldown_active, location_inactive
+    error_code: str  # too_far, cooldown_active, location_inactive, no_location_nearby
     message: str
     details: dict | None = None
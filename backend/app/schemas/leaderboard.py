@@ -26,3 +26,4 @@ class LeaderboardResponse(BaseModel):
     total_entries: int
     my_position: int | None = None
     my_entry: LeaderboardEntry | None = None
+    next_cursor: str | None = None  # pass as ?cursor= to get the next page
@@ -45,3 +45,16 @@ class LocationListResponse(BaseModel):
     """List of locations response"""
     locations: list[LocationResponse]
     total: int
+
+
+class NearbyLocation(BaseModel):
+    """Location with distance from the requested point"""
+    location: LocationResponse
+    distance_meters: int
+    can_checkin: bool
+
+
+class NearbyLocationsResponse(BaseModel):
+    """Nearby locations response, closest first"""
+    locations: list[NearbyLocation]
+    total: int
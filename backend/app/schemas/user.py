@@ -3,6 +3,8 @@
 from datetime import datetime
 from pydantic import BaseModel
 
+from app.core.levels import get_level_table
+
 
 class UserBase(BaseModel):
     """Base user schema"""
@@ -53,21 +55,8 @@ class UserProfileResponse(UserResponse):
     @classmethod
     def from_user(cls, user) -> "UserProfileResponse":
         """Create profile response from user model"""
-        level_names = {
-            1: "Новачок",
-            2: "Кавоман",
-            3: "Бариста-учень",
-            4: "Бариста",
-            5: "Старший бариста",
-            6: "Майстер",
-            7: "Експерт",
-            8: "Гуру кави",
-            9: "Легенда",
-            10: "Coffee King",
-        }
-        level_thresholds = [0, 100, 300, 600, 1000, 1500, 2100, 2800, 3600, 4500]
-
-        next_level_xp = level_thresholds[min(user.level, 9)]
+        levels = get_level_table()
+        next_level_xp = levels.next_level_xp(user.level)
         xp_to_next = max(0, next_level_xp - user.experience)
 
         return cls(
@@ -85,8 +74,8 @@ class UserProfileResponse(UserResponse):
             best_game_score=user.best_game_score,
             referral_code=user.referral_code,
             created_at=user.created_at,
-            level_name=level_names.get(user.level, "Новачок"),
-            level_bonus=user.get_level_bonus(),
+            level_name=levels.get(user.level).name,
+            level_bonus=levels.bonus(user.level),
             next_level_xp=next_level_xp,
             xp_to_next_level=xp_to_next,
             notifications_enabled=user.notifications_enabled,
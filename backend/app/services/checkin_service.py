@@ -1,17 +1,111 @@
 """Checkin service - business logic for check-in operations"""
 
-from datetime import datetime, date, timedelta
-from sqlalchemy import select, func
+import math
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime, date, time, timedelta
+from functools import lru_cache
+from sqlalchemy import select, func, update, exists, literal, true, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import CacheBackend, create_cache_backend
+from app.db.session import on_commit
 from app.models.checkin import Checkin
 from app.models.location import Location
 from app.models.user import User
-from app.schemas.checkin import CheckinCreate, CheckinResponse
-from app.utils.geo import is_within_radius
+from app.schemas.checkin import CheckinCreate, CheckinResponse, CanCheckinStatus
+from app.schemas.location import LocationResponse
+from app.services.counter_buffer import CounterService
+from app.services.location_service import LocationService
+from app.services.user_service import UserService
+from app.utils.geo import haversine_distances, is_within_radius
 from app.core.config import settings
 
 
+def encode_cursor(created_at: datetime, checkin_id: int) -> str:
+    """Encode keyset position as an opaque cursor"""
+    return urlsafe_b64encode(f"{created_at.isoformat()}|{checkin_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decode cursor into (created_at, checkin_id).
+
+    Raises:
+        ValueError: If cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, checkin_id = urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), int(checkin_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def cooldown_until(last_checkin_at: datetime) -> datetime:
+    """
+    Get when the cooldown after a check-in ends.
+
+    That is CHECKIN_COOLDOWN_HOURS later, but never before the next UTC day,
+    since check-ins stay unique per user, location and day.
+    """
+    next_day = datetime.combine(last_checkin_at.date() + timedelta(days=1), time.min)
+    return max(last_checkin_at + timedelta(hours=settings.CHECKIN_COOLDOWN_HOURS), next_day)
+
+
+class CooldownCache:
+    """
+    Cooldown end per (user, location), so eligibility checks skip the table.
+
+    A miss is cached too (as no cooldown), and every check-in overwrites
+    the entry, so a present key is always authoritative for display. Fills
+    after a miss only set an absent key, so a fill read before a check-in
+    committed can't overwrite the entry the check-in wrote. The insert
+    itself still re-checks the window in the database.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    @staticmethod
+    def _key(user_id: int, location_id: int) -> str:
+        return f"checkin_cooldown:{user_id}:{location_id}"
+
+    @staticmethod
+    def _ttl() -> int:
+        return max(settings.CHECKIN_COOLDOWN_HOURS, 24) * 3600
+
+    @staticmethod
+    def _encode(until: datetime | None) -> bytes:
+        return until.isoformat().encode() if until else b""
+
+    async def get(self, user_id: int, location_id: int) -> tuple[bool, datetime | None]:
+        """
+        Get cached cooldown end.
+
+        Returns:
+            Tuple of (hit, cooldown_end), cooldown_end is None when there is none
+        """
+        raw = await self.backend.get(self._key(user_id, location_id))
+        if raw is None:
+            return False, None
+        return True, datetime.fromisoformat(raw.decode()) if raw else None
+
+    async def set(self, user_id: int, location_id: int, until: datetime | None) -> None:
+        """Store cooldown end, None for no cooldown"""
+        await self.backend.set(self._key(user_id, location_id), self._encode(until), self._ttl())
+
+    async def fill(self, user_id: int, location_id: int, until: datetime | None) -> None:
+        """Store cooldown end read after a miss, unless an entry was written since"""
+        await self.backend.add(self._key(user_id, location_id), self._encode(until), self._ttl())
+
+
+@lru_cache()
+def get_cooldown_cache() -> CooldownCache:
+    """Get shared cooldown cache instance"""
+    return CooldownCache(create_cache_backend())
+
+
 class CheckinError(Exception):
     """Custom exception for checkin errors"""
 
@@ -35,6 +129,36 @@ class CheckinService:
         )
         return result.scalar_one_or_none()
 
+    async def resolve_location(self, latitude: float, longitude: float) -> LocationResponse:
+        """
+        Find the closest location whose check-in radius covers the point.
+
+        Raises:
+            CheckinError: If no location is close enough
+        """
+        index = await LocationService(self.db).get_index()
+        found = index.find_checkin_location(latitude, longitude)
+        if not found:
+            raise CheckinError("no_location_nearby", "No location within check-in range")
+        return found[1]
+
+    async def get_active_location(self, location_id: int) -> LocationResponse:
+        """
+        Get active location from the cached catalog.
+
+        Raises:
+            CheckinError: If location does not exist or is not active
+        """
+        index = await LocationService(self.db).get_index()
+        location = index.by_id.get(location_id)
+        if location:
+            return location
+
+        # Only active locations are cataloged, tell the two errors apart
+        if await self.get_location_by_id(location_id):
+            raise CheckinError("location_inactive", "Location is not active")
+        raise CheckinError("location_not_found", "Location not found")
+
     async def get_last_checkin(self, user_id: int, location_id: int) -> Checkin | None:
         """Get user's last checkin at a location"""
         result = await self.db.execute(
@@ -48,24 +172,128 @@ class CheckinService:
         )
         return result.scalar_one_or_none()
 
-    async def can_checkin(self, user_id: int, location_id: int) -> tuple[bool, str | None]:
+    async def get_cooldown_remaining(self, user_id: int, location_id: int) -> int:
         """
-        Check if user can check in at location.
+        Get seconds until user can check in at location again.
 
-        Returns:
-            Tuple of (can_checkin, error_reason)
+        Served from the cooldown cache; the table is only read on a miss.
         """
-        # Check if already checked in today at this location
-        today = date.today()
+        cooldown_cache = get_cooldown_cache()
+        hit, until = await cooldown_cache.get(user_id, location_id)
+        if not hit:
+            until = await self._load_cooldown_until(user_id, location_id)
+
+        if until is None:
+            return 0
+        return max(0, math.ceil((until - datetime.utcnow()).total_seconds()))
+
+    async def _load_cooldown_until(self, user_id: int, location_id: int) -> datetime | None:
+        """Read cooldown end from the last check-in and cache it"""
         result = await self.db.execute(
-            select(Checkin)
+            select(Checkin.created_at)
             .where(
                 Checkin.user_id == user_id,
-                Checkin.location_id == location_id,
-                Checkin.checkin_date == today
+                Checkin.location_id == location_id
             )
+            .order_by(Checkin.created_at.desc())
+            .limit(1)
         )
-        if result.scalar_one_or_none():
+        last_checkin_at = result.scalar_one_or_none()
+        until = cooldown_until(last_checkin_at) if last_checkin_at else None
+        await get_cooldown_cache().fill(user_id, location_id, until)
+        return until
+
+    async def get_cooldowns(self, user_id: int, location_ids: list[int] | None = None) -> dict[int, int]:
+        """
+        Get seconds of cooldown left per location, in one grouped query.
+
+        Locations without an active cooldown are omitted.
+        """
+        now = datetime.utcnow()
+        # Older check-ins can't hold a cooldown past now
+        since = min(
+            now - timedelta(hours=settings.CHECKIN_COOLDOWN_HOURS),
+            datetime.combine(now.date(), time.min)
+        )
+        query = (
+            select(Checkin.location_id, func.max(Checkin.created_at))
+            .where(Checkin.user_id == user_id, Checkin.created_at > since)
+            .group_by(Checkin.location_id)
+        )
+        if location_ids is not None:
+            query = query.where(Checkin.location_id.in_(location_ids))
+        result = await self.db.execute(query)
+
+        cooldowns = {}
+        for location_id, last_checkin_at in result.all():
+            remaining = math.ceil((cooldown_until(last_checkin_at) - now).total_seconds())
+            if remaining > 0:
+                cooldowns[location_id] = remaining
+        return cooldowns
+
+    async def can_checkin_many(
+        self,
+        user_id: int,
+        location_ids: list[int] | None = None,
+        latitude: float | None = None,
+        longitude: float | None = None
+    ) -> list[CanCheckinStatus]:
+        """
+        Check eligibility at many locations, all active ones by default.
+
+        With coordinates, also checks each location's check-in radius.
+        """
+        index = await LocationService(self.db).get_index()
+        if location_ids is None:
+            location_ids = list(index.by_id)
+        locations = [index.by_id.get(location_id) for location_id in location_ids]
+        cooldowns = await self.get_cooldowns(user_id, location_ids)
+
+        known = [location for location in locations if location]
+        distances = {}
+        if known and latitude is not None and longitude is not None:
+            batch = haversine_distances(
+                latitude, longitude,
+                [location.latitude for location in known],
+                [location.longitude for location in known]
+            )
+            distances = {
+                location.id: int(distance)
+                for location, distance in zip(known, batch)
+            }
+
+        statuses = []
+        for location_id, location in zip(location_ids, locations):
+            if not location:
+                statuses.append(CanCheckinStatus(
+                    location_id=location_id, can_checkin=False, reason="location_not_found"
+                ))
+                continue
+
+            remaining = cooldowns.get(location_id, 0)
+            distance = distances.get(location_id)
+            reason = None
+            if remaining:
+                reason = "cooldown_active"
+            elif distance is not None and distance > location.checkin_radius_meters:
+                reason = "too_far"
+            statuses.append(CanCheckinStatus(
+                location_id=location_id,
+                can_checkin=reason is None,
+                reason=reason,
+                cooldown_remaining_seconds=remaining,
+                distance_meters=distance,
+            ))
+        return statuses
+
+    async def can_checkin(self, user_id: int, location_id: int) -> tuple[bool, str | None]:
+        """
+        Check if user can check in at location.
+
+        Returns:
+            Tuple of (can_checkin, error_reason)
+        """
+        if await self.get_cooldown_remaining(user_id, location_id):
             return False, "cooldown_active"
 
         return True, None
@@ -74,30 +302,35 @@ class CheckinService:
         self,
         user: User,
         checkin_data: CheckinCreate
-    ) -> tuple[Checkin, dict]:
+    ) -> tuple[Checkin, LocationResponse, dict]:
         """
         Create a new check-in.
 
+        The location comes from the cached catalog. The cooldown check,
+        insert, location counter and user rewards run as one statement, so
+        a check-in costs a single round trip after the user is loaded.
+        The cooldown is CHECKIN_COOLDOWN_HOURS since the last check-in at
+        the location, and at most one check-in per location and UTC day.
+
         Returns:
-            Tuple of (checkin, user_update_info)
+            Tuple of (checkin, location, user_update_info)
 
         Raises:
             CheckinError: If check-in is not possible
         """
-        # Get location
-        location = await self.get_location_by_id(checkin_data.location_id)
-        if not location:
-            raise CheckinError("location_not_found", "Location not found")
-
-        if not location.is_active:
-            raise CheckinError("location_inactive", "Location is not active")
+        if checkin_data.location_id is None:
+            location = await self.resolve_location(
+                checkin_data.latitude, checkin_data.longitude
+            )
+        else:
+            location = await self.get_active_location(checkin_data.location_id)
 
         # Check distance
         is_within, distance = is_within_radius(
             checkin_data.latitude,
             checkin_data.longitude,
-            float(location.latitude),
-            float(location.longitude),
+            location.latitude,
+            location.longitude,
             location.checkin_radius_meters
         )
 
@@ -108,19 +341,13 @@ class CheckinService:
                 {"distance": distance, "max_distance": location.checkin_radius_meters}
             )
 
-        # Check cooldown
-        can_checkin, error_reason = await self.can_checkin(user.id, location.id)
-        if not can_checkin:
-            raise CheckinError(
-                "cooldown_active",
-                "You have already checked in at this location today"
-            )
-
         # Calculate rewards
         points_earned = 1  # Base points
         experience_earned = 10  # Base XP
+        bonus = user.get_level_bonus()
+        actual_points = int(points_earned * (1 + bonus))
 
-        # Create checkin
+        now = datetime.utcnow()
         checkin = Checkin(
             user_id=user.id,
             location_id=location.id,
@@ -129,27 +356,79 @@ class CheckinService:
             distance_meters=distance,
             points_earned=points_earned,
             experience_earned=experience_earned,
-            checkin_date=date.today(),
+            checkin_date=now.date(),
+            created_at=now,
+        )
+
+        # Nothing is inserted inside the rolling cooldown window, and the
+        # unique constraint rejects a concurrent duplicate of the same day;
+        # either way the updates below are skipped
+        columns = [
+            "user_id", "location_id", "user_latitude", "user_longitude", "distance_meters",
+            "points_earned", "experience_earned", "checkin_date", "created_at",
+        ]
+        in_cooldown = exists().where(
+            Checkin.user_id == user.id,
+            Checkin.location_id == location.id,
+            Checkin.created_at > now - timedelta(hours=settings.CHECKIN_COOLDOWN_HOURS)
+        )
+        inserted = (
+            pg_insert(Checkin)
+            .from_select(
+                columns,
+                select(*[
+                    literal(getattr(checkin, column), Checkin.__table__.c[column].type)
+                    for column in columns
+                ]).where(~in_cooldown)
+            )
+            .on_conflict_do_nothing(constraint="uq_user_location_date")
+            .returning(Checkin.id)
+            .cte("inserted_checkin")
         )
-        self.db.add(checkin)
+        was_inserted = exists(select(inserted.c.id))
 
-        # Update location stats
-        location.total_checkins += 1
+        user_service = UserService(self.db)
+        user_stats = (
+            user_service.stats_update(
+                user.id, points=actual_points, experience=experience_earned, checkins=1
+            )
+            .where(was_inserted)
+            .cte("user_stats")
+        )
+        query = (
+            select(inserted.c.id, *user_stats.c)
+            .select_from(inserted)
+            .join(user_stats, true())
+        )
 
-        # Update user stats
-        user.total_checkins += 1
-        bonus = user.get_level_bonus()
-        actual_points = int(points_earned * (1 + bonus))
-        user.points += actual_points
-        user.experience += experience_earned
+        # The location counter is hot, so it is buffered when enabled
+        counters = CounterService(self.db)
+        if not counters.buffered:
+            location_update = (
+                update(Location)
+                .where(Location.id == location.id, was_inserted)
+                .values(total_checkins=Location.total_checkins + 1)
+                .returning(Location.id)
+                .cte("location_update")
+            )
+            query = query.add_cte(location_update)
 
-        # Check level up
-        new_level = user.calculate_level()
-        if new_level > user.level:
-            user.level = new_level
+        result = await self.db.execute(query)
+        row = result.one_or_none()
+        if row is None:
+            until = await self._load_cooldown_until(user.id, location.id)
+            remaining = max(0, math.ceil((until - now).total_seconds())) if until else 0
+            raise CheckinError(
+                "cooldown_active",
+                "You have already checked in at this location recently",
+                {"cooldown_remaining_seconds": remaining}
+            )
 
-        await self.db.flush()
-        await self.db.refresh(checkin)
+        checkin.id = row.id
+        user_service.sync_stats(user, row._mapping)
+        if counters.buffered:
+            await counters.increment("location_checkins", location.id)
+        on_commit(self.db, lambda: get_cooldown_cache().set(user.id, location.id, cooldown_until(now)))
 
         user_update = {
             "points": user.points,
@@ -160,30 +439,52 @@ class CheckinService:
             "experience_earned": experience_earned,
         }
 
-        return checkin, user_update
+        return checkin, location, user_update
+
+    async def get_total_checkins(self, user_id: int) -> int:
+        """Get user's running check-in counter, read fresh by primary key"""
+        total = await self.db.scalar(
+            select(User.total_checkins).where(User.id == user_id)
+        )
+        return total or 0
 
     async def get_user_checkins(
         self,
         user_id: int,
-        page: int = 1,
-        per_page: int = 20
-    ) -> tuple[list[Checkin], int]:
-        """Get user's checkin history with pagination"""
-        # Count total
-        count_result = await self.db.execute(
-            select(func.count(Checkin.id)).where(Checkin.user_id == user_id)
+        per_page: int = 20,
+        cursor: str | None = None
+    ) -> tuple[list[tuple[Checkin, str]], str | None]:
+        """
+        Get user's checkin history with location names, newest first.
+
+        Walks (created_at, id) with keyset pagination in a single query.
+
+        Returns:
+            Tuple of ((checkin, location_name) pairs, next_cursor)
+
+        Raises:
+            ValueError: If cursor is malformed
+        """
+        query = (
+            select(Checkin, Location.name)
+            .join(Location, Checkin.location_id == Location.id)
+            .where(Checkin.user_id == user_id)
         )
-        total = count_result.scalar()
+        if cursor:
+            query = query.where(
+                tuple_(Checkin.created_at, Checkin.id) < decode_cursor(cursor)
+            )
 
-        # Get paginated results
-        offset = (page - 1) * per_page
         result = await self.db.execute(
-            select(Checkin)
-            .where(Checkin.user_id == user_id)
-            .order_by(Checkin.created_at.desc())
-            .offset(offset)
-            .limit(per_page)
+            query.order_by(Checkin.created_at.desc(), Checkin.id.desc())
+            .limit(per_page + 1)
         )
-        checkins = result.scalars().all()
+        rows = result.all()
+
+        next_cursor = None
+        if len(rows) > per_page:
+            rows = rows[:per_page]
+            last = rows[-1][0]
+            next_cursor = encode_cursor(last.created_at, last.id)
 
-        return checkins, total
+        return rows, next_cursor
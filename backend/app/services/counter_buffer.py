@@ -0,0 +1,362 @@
+"""Counter buffer - write-behind aggregation of hot row counters"""
+
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Iterable
+
+from pydantic import BaseModel
+from redis.asyncio import Redis
+from sqlalchemy import Integer, column, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.db.session import on_commit
+from app.models.event import Event
+from app.models.location import Location
+
+# Counters that may be buffered, by name
+BUFFERED_COUNTERS: dict[str, InstrumentedAttribute[int]] = {
+    "location_checkins": Location.total_checkins,
+    "event_participants": Event.current_participants,
+}
+
+
+class CounterBuffer:
+    """
+    Base class for pending counter deltas.
+
+    Deltas are keyed by counter name and the row's primary key as a string.
+    They are added once the incrementing transaction has committed and
+    moved to the database in bulk by flush_counters.
+
+    A flush drains deltas into an in-flight set that readers still count,
+    and settles them once committed, which also bumps the counter's
+    version. Caches of flushed values are keyed by that version, so
+    every reader switches to fresh values the moment the in-flight deltas
+    stop being counted, without a window where a count goes backwards.
+    """
+
+    async def add(self, counter: str, key: str, delta: int = 1) -> None:
+        """Add a delta to a row's counter"""
+        raise NotImplementedError
+
+    async def pending(self, counter: str, keys: Iterable[str]) -> dict[str, int]:
+        """Get pending and in-flight deltas of several rows (missing keys have none)"""
+        raise NotImplementedError
+
+    async def pending_all(self, counter: str) -> dict[str, int]:
+        """Get every pending and in-flight delta of a counter"""
+        raise NotImplementedError
+
+    async def version(self, counter: str) -> int:
+        """Get number of settled flushes of a counter"""
+        raise NotImplementedError
+
+    async def snapshot(self, counter: str) -> tuple[int, dict[str, int]]:
+        """Atomically get version and every pending and in-flight delta of a counter"""
+        raise NotImplementedError
+
+    async def drain(self, counter: str) -> dict[str, int]:
+        """Atomically take all pending deltas of a counter and mark them in flight"""
+        raise NotImplementedError
+
+    async def settle(self, counter: str, deltas: dict[str, int]) -> None:
+        """Drop committed in-flight deltas and bump the counter's version"""
+        raise NotImplementedError
+
+    async def restore(self, counter: str, deltas: dict[str, int]) -> None:
+        """Put in-flight deltas back to pending after a failed flush"""
+        raise NotImplementedError
+
+    async def overlay(self, counter: str, items: list[Any], attr: str, key_attr: str = "id") -> None:
+        """
+        Add pending deltas to flushed values of response objects.
+
+        Only use on schemas, never on ORM instances: the change would be
+        flushed to the database.
+        """
+        if not items:
+            return
+        pending = await self.pending(counter, {str(getattr(item, key_attr)) for item in items})
+        self._apply_pending(pending, items, attr, key_attr)
+
+    async def overlay_json(
+        self,
+        counter: str,
+        get_body: Callable[[int], Awaitable[bytes]],
+        schema: type[BaseModel],
+        field: str,
+        attr: str,
+        key_attr: str = "id"
+    ) -> bytes:
+        """
+        Add pending deltas to a serialized list response, e.g. a cached catalog.
+
+        get_body is called with the counter's version, which must be part
+        of the cache key. Catalogs are cached with flushed values only and
+        overlaid on every read, so cached counts never freeze. All deltas of
+        the counter are read at once, and the body is returned untouched
+        when there are none.
+        """
+        version, pending = await self.snapshot(counter)
+        body = await get_body(version)
+        if not pending:
+            return body
+        response = schema.model_validate_json(body)
+        self._apply_pending(pending, getattr(response, field), attr, key_attr)
+        return response.model_dump_json().encode()
+
+    @staticmethod
+    def _apply_pending(pending: dict[str, int], items: list[Any], attr: str, key_attr: str) -> None:
+        for item in items:
+            delta = pending.get(str(getattr(item, key_attr)))
+            if delta:
+                setattr(item, attr, getattr(item, attr) + delta)
+
+
+def _merge(*deltas: dict[str, int]) -> dict[str, int]:
+    """Sum deltas per key, dropping zeros"""
+    merged: dict[str, int] = defaultdict(int)
+    for part in deltas:
+        for key, delta in part.items():
+            merged[key] += delta
+    return {key: delta for key, delta in merged.items() if delta}
+
+
+class MemoryCounterBuffer(CounterBuffer):
+    """In-process buffer; each worker flushes and sees only its own deltas"""
+
+    def __init__(self):
+        self.counters: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.inflight: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.versions: dict[str, int] = defaultdict(int)
+
+    async def add(self, counter: str, key: str, delta: int = 1) -> None:
+        self.counters[counter][key] += delta
+
+    async def pending(self, counter: str, keys: Iterable[str]) -> dict[str, int]:
+        deltas = await self.pending_all(counter)
+        return {key: deltas[key] for key in keys if key in deltas}
+
+    async def pending_all(self, counter: str) -> dict[str, int]:
+        return _merge(self.counters.get(counter, {}), self.inflight.get(counter, {}))
+
+    async def version(self, counter: str) -> int:
+        return self.versions.get(counter, 0)
+
+    async def snapshot(self, counter: str) -> tuple[int, dict[str, int]]:
+        return await self.version(counter), await self.pending_all(counter)
+
+    async def drain(self, counter: str) -> dict[str, int]:
+        deltas = _merge(self.counters.pop(counter, {}))
+        self._move(deltas, self.inflight[counter])
+        return deltas
+
+    async def settle(self, counter: str, deltas: dict[str, int]) -> None:
+        self._move(deltas, self.inflight[counter], sign=-1)
+        self.versions[counter] += 1
+
+    async def restore(self, counter: str, deltas: dict[str, int]) -> None:
+        self._move(deltas, self.inflight[counter], sign=-1)
+        self._move(deltas, self.counters[counter])
+
+    @staticmethod
+    def _move(deltas: dict[str, int], target: dict[str, int], sign: int = 1) -> None:
+        for key, delta in deltas.items():
+            target[key] += sign * delta
+            if not target[key]:
+                del target[key]
+
+
+# Move every pending delta into the in-flight hash, returning them
+DRAIN_SCRIPT = """
+local deltas = redis.call('HGETALL', KEYS[1])
+redis.call('DEL', KEYS[1])
+for i = 1, #deltas, 2 do
+    redis.call('HINCRBY', KEYS[2], deltas[i], deltas[i + 1])
+end
+return deltas
+"""
+
+# Take deltas out of the in-flight hash, then add them back to pending
+# (restore) or bump the version (settle), depending on ARGV[1]
+UNDRAIN_SCRIPT = """
+for i = 2, #ARGV, 2 do
+    if redis.call('HINCRBY', KEYS[1], ARGV[i], -ARGV[i + 1]) == 0 then
+        redis.call('HDEL', KEYS[1], ARGV[i])
+    end
+    if ARGV[1] == 'restore' then
+        redis.call('HINCRBY', KEYS[2], ARGV[i], ARGV[i + 1])
+    end
+end
+if ARGV[1] == 'settle' then
+    redis.call('INCR', KEYS[3])
+end
+"""
+
+
+class RedisCounterBuffer(CounterBuffer):
+    """
+    Buffer backed by Redis hashes, shared by all workers.
+
+    The in-flight hash is shared too: every worker's flush adds its drained
+    deltas to it and takes exactly those out again, so concurrent flushes
+    never clobber each other.
+    """
+
+    def __init__(self, redis: Redis, prefix: str = "counters"):
+        self.redis = redis
+        self.prefix = prefix
+        self.drain_script = redis.register_script(DRAIN_SCRIPT)
+        self.undrain_script = redis.register_script(UNDRAIN_SCRIPT)
+
+    def _key(self, counter: str) -> str:
+        return f"{self.prefix}:{counter}"
+
+    def _inflight_key(self, counter: str) -> str:
+        return f"{self.prefix}:{counter}:inflight"
+
+    def _version_key(self, counter: str) -> str:
+        return f"{self.prefix}:{counter}:version"
+
+    @staticmethod
+    def _decode(deltas: dict[bytes, bytes]) -> dict[str, int]:
+        return {key.decode(): int(delta) for key, delta in deltas.items()}
+
+    async def add(self, counter: str, key: str, delta: int = 1) -> None:
+        await self.redis.hincrby(self._key(counter), key, delta)
+
+    async def pending(self, counter: str, keys: Iterable[str]) -> dict[str, int]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hmget(self._key(counter), keys)
+            pipe.hmget(self._inflight_key(counter), keys)
+            pending, inflight = await pipe.execute()
+        return _merge(*(
+            {key: int(delta) for key, delta in zip(keys, deltas) if delta is not None}
+            for deltas in (pending, inflight)
+        ))
+
+    async def pending_all(self, counter: str) -> dict[str, int]:
+        return (await self.snapshot(counter))[1]
+
+    async def version(self, counter: str) -> int:
+        return int(await self.redis.get(self._version_key(counter)) or 0)
+
+    async def snapshot(self, counter: str) -> tuple[int, dict[str, int]]:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.get(self._version_key(counter))
+            pipe.hgetall(self._key(counter))
+            pipe.hgetall(self._inflight_key(counter))
+            version, pending, inflight = await pipe.execute()
+        return int(version or 0), _merge(self._decode(pending), self._decode(inflight))
+
+    async def drain(self, counter: str) -> dict[str, int]:
+        flat = await self.drain_script(keys=[self._key(counter), self._inflight_key(counter)])
+        return _merge({key.decode(): int(delta) for key, delta in zip(flat[::2], flat[1::2])})
+
+    async def settle(self, counter: str, deltas: dict[str, int]) -> None:
+        await self._undrain("settle", counter, deltas)
+
+    async def restore(self, counter: str, deltas: dict[str, int]) -> None:
+        await self._undrain("restore", counter, deltas)
+
+    async def _undrain(self, mode: str, counter: str, deltas: dict[str, int]) -> None:
+        args = [mode]
+        for key, delta in deltas.items():
+            args += [key, delta]
+        await self.undrain_script(
+            keys=[self._inflight_key(counter), self._key(counter), self._version_key(counter)],
+            args=args,
+        )
+
+
+@lru_cache()
+def get_counter_buffer() -> CounterBuffer:
+    """Get shared counter buffer instance"""
+    redis = get_redis()
+    if settings.COUNTER_BUFFER_BACKEND == "redis" and redis is not None:
+        return RedisCounterBuffer(redis)
+    return MemoryCounterBuffer()
+
+
+class CounterService:
+    """Service for incrementing buffered counters"""
+
+    def __init__(self, db: AsyncSession, buffer: CounterBuffer | None = None):
+        self.db = db
+        self.buffer = buffer or get_counter_buffer()
+
+    @property
+    def buffered(self) -> bool:
+        """Whether increments are deferred to the flush job"""
+        return settings.COUNTER_FLUSH_INTERVAL_SECONDS > 0
+
+    async def increment(self, counter: str, key: Any, delta: int = 1) -> None:
+        """
+        Increment a row's counter as part of the current transaction.
+
+        Buffered increments are only recorded once the transaction commits;
+        otherwise the row is updated right away.
+        """
+        target = BUFFERED_COUNTERS[counter]
+        if self.buffered:
+            on_commit(self.db, lambda: self.buffer.add(counter, str(key), delta))
+            return
+
+        primary_key = target.class_.__table__.primary_key.columns[0]
+        await self.db.execute(
+            update(target.class_)
+            .where(primary_key == key)
+            .values({target.key: target + delta})
+        )
+
+    async def flush(self) -> int:
+        """
+        Apply all pending deltas, one UPDATE ... FROM (VALUES ...) per counter.
+
+        Commits each counter separately; deltas of a failed counter are put
+        back into the buffer. Drained deltas are still counted by readers
+        until settled after the commit, which also moves cached catalogs to
+        the counter's next version.
+
+        Returns:
+            Number of updated rows
+        """
+        updated = 0
+        for counter, target in BUFFERED_COUNTERS.items():
+            deltas = await self.buffer.drain(counter)
+            if not deltas:
+                continue
+
+            try:
+                updated += await self._apply(target, deltas)
+                await self.db.commit()
+            except Exception:
+                await self.db.rollback()
+                await self.buffer.restore(counter, deltas)
+                raise
+            await self.buffer.settle(counter, deltas)
+        return updated
+
+    async def _apply(self, target: InstrumentedAttribute[int], deltas: dict[str, int]) -> int:
+        """Add deltas to target column of rows keyed by primary key"""
+        model = target.class_
+        primary_key = model.__table__.primary_key.columns[0]
+        parse_key = primary_key.type.python_type
+
+        pending = (
+            values(column("id", primary_key.type), column("delta", Integer), name="pending")
+            .data([(parse_key(key), delta) for key, delta in deltas.items()])
+        )
+        result = await self.db.execute(
+            update(model)
+            .where(primary_key == pending.c.id)
+            .values({target.key: target + pending.c.delta})
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
@@ -2,11 +2,15 @@
 
 from datetime import datetime
 from uuid import UUID
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, func, or_, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.cache import get_response_cache
+from app.db.session import on_commit
 from app.models.event import Event, EventParticipant
 from app.models.user import User
+from app.services.counter_buffer import CounterService
 
 
 class EventError(Exception):
@@ -108,6 +112,13 @@ class EventService:
                 "You don't meet the requirements to join this event"
             )
 
+        # Update event participant count
+        counters = CounterService(self.db)
+        if event.max_participants:
+            await self._take_capped_seat(event)
+        else:
+            await counters.increment("event_participants", event.id)
+
         # Create participation
         participant = EventParticipant(
             event_id=event.id,
@@ -115,14 +126,34 @@ class EventService:
         )
         self.db.add(participant)
 
-        # Update event participant count
-        event.current_participants += 1
-
         await self.db.flush()
         await self.db.refresh(participant)
 
+        # Cached event lists get buffered joins overlaid, but not a count
+        # updated in place
+        if event.max_participants or not counters.buffered:
+            on_commit(self.db, lambda: get_response_cache().invalidate("events"))
+
         return participant
 
+    async def _take_capped_seat(self, event: Event) -> None:
+        """
+        Increment participants of a capped event, failing when it is full.
+
+        Capped events are never buffered: the conditional UPDATE locks the
+        row, so concurrent joins cannot oversell the last seats.
+        """
+        count = await self.db.scalar(
+            update(Event)
+            .where(Event.id == event.id, Event.current_participants < Event.max_participants)
+            .values(current_participants=Event.current_participants + 1)
+            .returning(Event.current_participants)
+            .execution_options(synchronize_session=False)
+        )
+        if count is None:
+            raise EventError("event_full", "Event has reached maximum participants")
+        set_committed_value(event, "current_participants", count)
+
     async def _check_requirements(self, event: Event, user: User) -> bool:
         """Check if user meets event requirements"""
         requirements = event.requirements or {}
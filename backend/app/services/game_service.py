@@ -3,12 +3,21 @@
 from datetime import datetime, date
 from uuid import UUID
 from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.game import Game, GameSession
 from app.models.user import User
 from app.models.leaderboard import Leaderboard
+from app.core.cache import get_response_cache
 from app.core.security import validate_game_score
+from app.db.session import on_commit
+from app.services.leaderboard_service import (
+    GLOBAL_BOARD_LOCK_KEY, PERIOD_TYPES, LeaderboardService,
+    get_period_date, leaderboard_version, utc_today
+)
+from app.services.rank_index import RankIndex, RankKey, get_rank_index, leaderboard_key
+from app.services.user_service import UserService
 
 
 class GameError(Exception):
@@ -23,8 +32,9 @@ class GameError(Exception):
 class GameService:
     """Service for game operations"""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, rank_index: RankIndex | None = None):
         self.db = db
+        self.rank_index = rank_index or get_rank_index()
 
     async def get_all_games(self, active_only: bool = True) -> list[Game]:
         """Get all available games"""
@@ -101,104 +111,141 @@ class GameService:
         session.is_completed = True
         session.completed_at = datetime.utcnow()
 
-        # Update user stats
-        user.points += actual_points
-        user.experience += experience_earned
-        user.total_games_played += 1
-        if score > user.best_game_score:
-            user.best_game_score = score
-
-        # Check level up
-        new_level = user.calculate_level()
-        if new_level > user.level:
-            user.level = new_level
+        # Update user stats (and level) atomically in SQL
+        await UserService(self.db).apply_stats(
+            user,
+            points=actual_points,
+            experience=experience_earned,
+            games_played=1,
+            game_score=score
+        )
 
         # Update leaderboard
-        await self._update_leaderboard(user.id, game.id, score)
+        totals = await self._update_leaderboard(user.id, game.id, score)
 
         await self.db.flush()
 
-        # Get leaderboard positions
-        positions = await self._get_user_positions(user.id, game.id)
+        # The rank index only learns the new totals once they are committed,
+        # so a rolled back request never leaves a score behind in it
+        positions = await self._get_user_positions(user.id, game.id, score, totals)
+        on_commit(self.db, lambda: self._sync_rank_index(user.id, totals))
+        on_commit(self.db, lambda: self._bump_leaderboard_versions(game.id))
 
         return session, actual_points, positions
 
-    async def _update_leaderboard(self, user_id: int, game_id: int, score: int):
-        """Update leaderboard entries for user"""
-        today = date.today()
-
-        # Update/create entries for each period type
-        for period_type in ["daily", "weekly", "monthly", "all_time"]:
-            if period_type == "daily":
-                period_date = today
-            elif period_type == "weekly":
-                period_date = today - datetime.timedelta(days=today.weekday())
-            elif period_type == "monthly":
-                period_date = today.replace(day=1)
-            else:
-                period_date = date(2000, 1, 1)  # Fixed date for all_time
-
-            # Try to get existing entry
-            result = await self.db.execute(
-                select(Leaderboard).where(
-                    Leaderboard.user_id == user_id,
-                    Leaderboard.game_id == game_id,
-                    Leaderboard.period_type == period_type,
-                    Leaderboard.period_date == period_date
-                )
+    async def _update_leaderboard(self, user_id: int, game_id: int, score: int) -> dict[RankKey, int]:
+        """
+        Update per-game and cross-game leaderboard entries for user.
+
+        Both upserts run in the caller's transaction, so the global board
+        (game_id NULL) never drifts from the per-game rows. The global
+        upsert holds the global board lock shared, so it waits for a
+        running rebuild_global_leaderboard instead of racing it.
+
+        Returns:
+            Mapping of rank index key to the new total_score
+        """
+        today = utc_today()
+        totals = {}
+        for board_game_id in (game_id, None):
+            if board_game_id is None:
+                await self.db.execute(select(func.pg_advisory_xact_lock_shared(GLOBAL_BOARD_LOCK_KEY)))
+            rows = await self._upsert_leaderboard_rows(user_id, board_game_id, score, today)
+            for period_type, total_score in rows.items():
+                key = leaderboard_key(board_game_id, period_type, get_period_date(period_type, today))
+                totals[key] = total_score
+        return totals
+
+    async def _upsert_leaderboard_rows(
+        self,
+        user_id: int,
+        game_id: int | None,
+        score: int,
+        today: date
+    ) -> dict[str, int]:
+        """
+        Upsert leaderboard entries for every period in a single statement.
+
+        Uses INSERT ... ON CONFLICT, so concurrent session ends for the same
+        user are serialized by the row locks instead of racing on a
+        read-modify-write. Rows are always written in PERIOD_TYPES order,
+        which keeps lock acquisition deadlock-free.
+
+        Returns:
+            Mapping of period_type to the new total_score
+        """
+        now = datetime.utcnow()
+
+        rows = [
+            {
+                "user_id": user_id,
+                "game_id": game_id,
+                "period_type": period_type,
+                "period_date": get_period_date(period_type, today),
+                "total_score": score,
+                "best_score": score,
+                "games_played": 1,
+                "updated_at": now,
+            }
+            for period_type in PERIOD_TYPES
+        ]
+
+        stmt = insert(Leaderboard).values(rows)
+        set_ = {
+            "total_score": Leaderboard.total_score + stmt.excluded.total_score,
+            "best_score": func.greatest(Leaderboard.best_score, stmt.excluded.best_score),
+            "games_played": Leaderboard.games_played + stmt.excluded.games_played,
+            "updated_at": stmt.excluded.updated_at,
+        }
+        if game_id is None:
+            # Cross-game rows are covered by the partial unique index
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["user_id", "period_type", "period_date"],
+                index_where=Leaderboard.game_id.is_(None),
+                set_=set_,
             )
-            entry = result.scalar_one_or_none()
-
-            if entry:
-                entry.total_score += score
-                entry.games_played += 1
-                if score > entry.best_score:
-                    entry.best_score = score
-            else:
-                entry = Leaderboard(
-                    user_id=user_id,
-                    game_id=game_id,
-                    period_type=period_type,
-                    period_date=period_date,
-                    total_score=score,
-                    best_score=score,
-                    games_played=1,
-                )
-                self.db.add(entry)
+        else:
+            stmt = stmt.on_conflict_do_update(constraint="uq_leaderboard_entry", set_=set_)
+        stmt = stmt.returning(Leaderboard.period_type, Leaderboard.total_score)
+
+        result = await self.db.execute(stmt)
+        return {period_type: total_score for period_type, total_score in result.all()}
+
+    async def _bump_leaderboard_versions(self, game_id: int):
+        """Invalidate ETags of the game's board and the global board"""
+        cache = get_response_cache()
+        await cache.bump_version(leaderboard_version(game_id))
+        await cache.bump_version(leaderboard_version(None))
+
+    async def _sync_rank_index(self, user_id: int, totals: dict[RankKey, int]):
+        """Push new leaderboard totals into the rank index"""
+        for key, total_score in totals.items():
+            await self.rank_index.update(key, user_id, total_score)
 
-    async def _get_user_positions(self, user_id: int, game_id: int) -> dict:
-        """Get user's leaderboard positions"""
+    async def _get_user_positions(
+        self,
+        user_id: int,
+        game_id: int,
+        score: int,
+        totals: dict[RankKey, int]
+    ) -> dict:
+        """
+        Get user's positions on the game's boards for the new totals.
+
+        Scores only grow within a period, so the user's previous entry in
+        the index never counts as above the new total. A board missing the
+        previous entry, or an unreachable index, is counted in SQL instead,
+        so the rank index never keeps a score from being saved.
+        """
+        leaderboard_service = LeaderboardService(self.db, self.rank_index)
         positions = {}
-        today = date.today()
-
-        for period_type in ["daily", "weekly", "all_time"]:
-            if period_type == "daily":
-                period_date = today
-            elif period_type == "weekly":
-                period_date = today - datetime.timedelta(days=today.weekday())
-            else:
-                period_date = date(2000, 1, 1)
-
-            # Count users with higher score
-            result = await self.db.execute(
-                select(func.count(Leaderboard.id) + 1)
-                .where(
-                    Leaderboard.game_id == game_id,
-                    Leaderboard.period_type == period_type,
-                    Leaderboard.period_date == period_date,
-                    Leaderboard.total_score > (
-                        select(Leaderboard.total_score)
-                        .where(
-                            Leaderboard.user_id == user_id,
-                            Leaderboard.game_id == game_id,
-                            Leaderboard.period_type == period_type,
-                            Leaderboard.period_date == period_date
-                        )
-                        .scalar_subquery()
-                    )
+        for key, total_score in totals.items():
+            board_game_id, period_type, _ = key
+            if board_game_id == game_id and period_type in ("daily", "weekly", "all_time"):
+                previous = total_score - score
+                above = await leaderboard_service.count_above_many(
+                    key, {total_score}, expected={user_id: previous} if previous > 0 else None
                 )
-            )
-            position = result.scalar()
-            positions[period_type] = position or 1
+                positions[period_type] = above[total_score] + 1
 
         return positions
@@ -1,78 +1,165 @@
 """Leaderboard service - business logic for leaderboard operations"""
 
-from datetime import date, timedelta
-from sqlalchemy import select, func
+import logging
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, datetime, timedelta
+from redis.exceptions import RedisError
+from sqlalchemy import select, func, delete, insert, literal, null, cast, column, values, Date, Integer, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
 from app.models.leaderboard import Leaderboard
 from app.models.user import User
-from app.models.game import Game
+from app.models.game import Game, GameSession
 from app.schemas.leaderboard import LeaderboardEntry, LeaderboardResponse
+from app.core.cache import get_response_cache
+from app.db.session import on_commit
+from app.services.rank_index import RankIndex, RankKey, get_rank_index, leaderboard_key
+
+logger = logging.getLogger(__name__)
+
+PERIOD_TYPES = ("daily", "weekly", "monthly", "all_time")
+
+# Advisory lock on the cross-game board: game ends hold it shared while
+# upserting global rows, rebuild_global_leaderboard holds it exclusively
+GLOBAL_BOARD_LOCK_KEY = 7_100_003
+
+# Boards this process is reloading into the rank index
+_reloading: set[RankKey] = set()
+
+
+def utc_today() -> date:
+    """Current UTC date; periods follow UTC days, like check-ins and game session timestamps"""
+    return datetime.utcnow().date()
+
+
+def get_period_date(period_type: str, today: date | None = None) -> date:
+    """Get the period start date for a period type (of the current UTC day by default)"""
+    today = today or utc_today()
+    if period_type == "daily":
+        return today
+    elif period_type == "weekly":
+        return today - timedelta(days=today.weekday())
+    elif period_type == "monthly":
+        return today.replace(day=1)
+    else:  # all_time
+        return date(2000, 1, 1)
+
+
+def leaderboard_version(game_id: int | None) -> str:
+    """Version marker name of a board, bumped whenever its scores change"""
+    return f"leaderboard:{game_id or 'all'}"
+
+
+# Version marker shared by all boards, bumped when a name or photo shown
+# on them changes
+LEADERBOARD_PROFILES_VERSION = "leaderboard:profiles"
+
+
+def encode_cursor(total_score: int, user_id: int) -> str:
+    """Encode keyset position as an opaque cursor"""
+    return urlsafe_b64encode(f"{total_score}:{user_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[int, int]:
+    """
+    Decode cursor into (total_score, user_id).
+
+    Raises:
+        ValueError: If cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        total_score, user_id = urlsafe_b64decode(padded).decode().split(":")
+        return int(total_score), int(user_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
 
 
 class LeaderboardService:
     """Service for leaderboard operations"""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, rank_index: RankIndex | None = None):
         self.db = db
+        self.rank_index = rank_index or get_rank_index()
 
     def _get_period_date(self, period_type: str) -> date:
         """Get the period date based on period type"""
-        today = date.today()
-        if period_type == "daily":
-            return today
-        elif period_type == "weekly":
-            return today - timedelta(days=today.weekday())
-        elif period_type == "monthly":
-            return today.replace(day=1)
-        else:  # all_time
-            return date(2000, 1, 1)
+        return get_period_date(period_type)
 
     async def get_leaderboard(
         self,
         period_type: str = "weekly",
         game_id: int | None = None,
         limit: int = 100,
-        user_id: int | None = None
+        user_id: int | None = None,
+        cursor: str | None = None,
+        around_me: bool = False,
+        radius: int = 10
     ) -> LeaderboardResponse:
-        """Get leaderboard for a specific period and game"""
+        """
+        Get leaderboard for a specific period and game.
+
+        Entries are walked with keyset pagination over
+        (total_score, user_id), so any page costs the same index range scan.
+        With around_me, returns `radius` entries above and below the user.
+
+        Raises:
+            ValueError: If cursor is malformed
+        """
         period_date = self._get_period_date(period_type)
+        key = leaderboard_key(game_id or None, period_type, period_date)
+        board = self._board_query(period_type, period_date, game_id)
+        position = tuple_(Leaderboard.total_score, Leaderboard.user_id)
 
-        # Build query
-        query = (
-            select(Leaderboard, User)
-            .join(User, Leaderboard.user_id == User.id)
-            .where(
-                Leaderboard.period_type == period_type,
-                Leaderboard.period_date == period_date
-            )
-        )
+        my_row = None
+        if user_id:
+            my_row = await self._get_user_row(user_id, period_type, period_date, game_id)
 
-        if game_id:
-            query = query.where(Leaderboard.game_id == game_id)
+        next_cursor = None
+        if around_me and my_row:
+            pivot = (my_row[0].total_score, my_row[0].user_id)
+            above = await self.db.execute(
+                board.where(position > pivot)
+                .order_by(Leaderboard.total_score, Leaderboard.user_id)
+                .limit(radius)
+            )
+            below = await self.db.execute(
+                board.where(position < pivot)
+                .order_by(Leaderboard.total_score.desc(), Leaderboard.user_id.desc())
+                .limit(radius)
+            )
+            below_rows = below.all()
+            rows = list(reversed(above.all())) + [my_row] + below_rows
+            if len(below_rows) == radius:
+                next_cursor = encode_cursor(rows[-1][0].total_score, rows[-1][0].user_id)
         else:
-            query = query.where(Leaderboard.game_id.is_(None))
-
-        query = query.order_by(Leaderboard.total_score.desc()).limit(limit)
-
-        result = await self.db.execute(query)
-        rows = result.all()
-
-        # Build entries
-        entries = []
-        for rank, (leaderboard, user) in enumerate(rows, 1):
-            entry = LeaderboardEntry(
-                rank=rank,
-                user_id=user.id,
-                username=user.username,
-                first_name=user.first_name,
-                photo_url=user.photo_url,
-                total_score=leaderboard.total_score,
-                best_score=leaderboard.best_score,
-                games_played=leaderboard.games_played,
+            query = board
+            if cursor:
+                query = query.where(position < decode_cursor(cursor))
+            result = await self.db.execute(
+                query.order_by(Leaderboard.total_score.desc(), Leaderboard.user_id.desc())
+                .limit(limit + 1)
             )
-            entries.append(entry)
+            rows = result.all()
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor(rows[-1][0].total_score, rows[-1][0].user_id)
+
+        # Ranks for every distinct score on the page in one rank index call
+        listed = [leaderboard for leaderboard, _ in rows]
+        if my_row:
+            listed.append(my_row[0])
+        above_counts = await self.count_above_many(
+            key,
+            {leaderboard.total_score for leaderboard in listed},
+            expected={leaderboard.user_id: leaderboard.total_score for leaderboard in listed}
+        )
+
+        entries = [
+            self._build_entry(leaderboard, user, above_counts[leaderboard.total_score] + 1)
+            for leaderboard, user in rows
+        ]
 
         # Get game name if game_id provided
         game_name = None
@@ -82,13 +169,12 @@ class LeaderboardService:
             )
             game_name = game_result.scalar_one_or_none()
 
-        # Find user's position if provided
+        # User's own position
         my_position = None
         my_entry = None
-        if user_id:
-            my_position, my_entry = await self._get_user_position(
-                user_id, period_type, period_date, game_id
-            )
+        if my_row:
+            my_position = above_counts[my_row[0].total_score] + 1
+            my_entry = self._build_entry(my_row[0], my_row[1], my_position)
 
         return LeaderboardResponse(
             period_type=period_type,
@@ -99,87 +185,216 @@ class LeaderboardService:
             total_entries=len(entries),
             my_position=my_position,
             my_entry=my_entry,
+            next_cursor=next_cursor,
         )
 
-    async def _get_user_position(
+    async def count_above_many(
         self,
-        user_id: int,
-        period_type: str,
-        period_date: date,
-        game_id: int | None
-    ) -> tuple[int | None, LeaderboardEntry | None]:
-        """Get user's position in leaderboard"""
-        # Get user's entry
-        query = select(Leaderboard).where(
-            Leaderboard.user_id == user_id,
-            Leaderboard.period_type == period_type,
-            Leaderboard.period_date == period_date
-        )
-        if game_id:
-            query = query.where(Leaderboard.game_id == game_id)
-        else:
-            query = query.where(Leaderboard.game_id.is_(None))
+        key: RankKey,
+        scores: set[int],
+        expected: dict[int, int] | None = None
+    ) -> dict[int, int]:
+        """
+        Count entries above each score on a board.
 
-        result = await self.db.execute(query)
-        user_entry = result.scalar_one_or_none()
+        Served by the rank index while it holds the board: every user in
+        `expected` (user_id to the total read from the table) must be
+        indexed with at least that total. Otherwise, e.g. before the startup
+        rebuild or after the board's key was evicted, and whenever Redis
+        fails, counts come from the table and the board is reloaded into
+        the index after commit.
+        """
+        if not scores:
+            return {}
+        expected = expected or {}
+        try:
+            indexed = await self.rank_index.scores_many(key, list(expected))
+            if all(indexed.get(user_id, -1) >= total for user_id, total in expected.items()):
+                return await self.rank_index.count_above_many(key, scores)
+            on_commit(self.db, lambda: self._reload_board(key))
+        except RedisError:
+            logger.warning("Rank index unavailable, counting ranks in SQL", exc_info=True)
+        return await self._count_above_sql(key, scores)
 
-        if not user_entry:
-            return None, None
-
-        # Count users with higher score
-        count_query = select(func.count(Leaderboard.id)).where(
-            Leaderboard.period_type == period_type,
-            Leaderboard.period_date == period_date,
-            Leaderboard.total_score > user_entry.total_score
+    async def _count_above_sql(self, key: RankKey, scores: set[int]) -> dict[int, int]:
+        """Count entries above each score in one query"""
+        game_id, period_type, period_date = key
+        targets = values(column("score", Integer), name="targets").data([(score,) for score in scores])
+        above = (
+            select(func.count())
+            .select_from(Leaderboard)
+            .where(
+                Leaderboard.period_type == period_type,
+                Leaderboard.period_date == period_date,
+                Leaderboard.game_id.is_(None) if game_id is None else Leaderboard.game_id == game_id,
+                Leaderboard.total_score > targets.c.score,
+            )
+            .scalar_subquery()
         )
-        if game_id:
-            count_query = count_query.where(Leaderboard.game_id == game_id)
-        else:
-            count_query = count_query.where(Leaderboard.game_id.is_(None))
+        result = await self.db.execute(select(targets.c.score, above))
+        return dict(result.all())
 
-        count_result = await self.db.execute(count_query)
-        position = count_result.scalar() + 1
+    async def _reload_board(self, key: RankKey):
+        """Merge a board the rank index is missing, once per process at a time"""
+        if key in _reloading:
+            return
+        _reloading.add(key)
+        try:
+            entries = await self.rank_index.load(self.db, key)
+            await self.db.commit()
+            logger.info("Reloaded rank index board %s (%d entries)", key, entries)
+        finally:
+            _reloading.discard(key)
 
-        # Get user info
-        user_result = await self.db.execute(
-            select(User).where(User.id == user_id)
+    @staticmethod
+    def _board_query(period_type: str, period_date: date, game_id: int | None):
+        """Build base query for one board, joined with users"""
+        query = (
+            select(Leaderboard, User)
+            .join(User, Leaderboard.user_id == User.id)
+            .where(
+                Leaderboard.period_type == period_type,
+                Leaderboard.period_date == period_date
+            )
         )
-        user = user_result.scalar_one_or_none()
+        if game_id:
+            return query.where(Leaderboard.game_id == game_id)
+        return query.where(Leaderboard.game_id.is_(None))
 
-        entry = LeaderboardEntry(
-            rank=position,
+    @staticmethod
+    def _build_entry(leaderboard: Leaderboard, user: User, rank: int) -> LeaderboardEntry:
+        """Build leaderboard entry schema"""
+        return LeaderboardEntry(
+            rank=rank,
             user_id=user.id,
             username=user.username,
             first_name=user.first_name,
             photo_url=user.photo_url,
-            total_score=user_entry.total_score,
-            best_score=user_entry.best_score,
-            games_played=user_entry.games_played,
+            total_score=leaderboard.total_score,
+            best_score=leaderboard.best_score,
+            games_played=leaderboard.games_played,
         )
 
-        return position, entry
+    async def _get_user_row(
+        self,
+        user_id: int,
+        period_type: str,
+        period_date: date,
+        game_id: int | None
+    ) -> tuple[Leaderboard, User] | None:
+        """Get user's leaderboard row together with the user"""
+        result = await self.db.execute(
+            self._board_query(period_type, period_date, game_id)
+            .where(Leaderboard.user_id == user_id)
+        )
+        return result.one_or_none()
 
     async def get_user_stats(self, user_id: int) -> dict:
         """Get user's leaderboard statistics"""
-        stats = {}
-
-        for period_type in ["daily", "weekly", "monthly", "all_time"]:
-            period_date = self._get_period_date(period_type)
+        periods = {
+            period_type: self._get_period_date(period_type)
+            for period_type in PERIOD_TYPES
+        }
 
-            # Get user's total score across all games
-            result = await self.db.execute(
-                select(func.sum(Leaderboard.total_score))
-                .where(
-                    Leaderboard.user_id == user_id,
-                    Leaderboard.period_type == period_type,
-                    Leaderboard.period_date == period_date
-                )
+        # Cross-game rows already hold the user's total across all games
+        result = await self.db.execute(
+            select(Leaderboard.period_type, Leaderboard.total_score)
+            .where(
+                Leaderboard.user_id == user_id,
+                Leaderboard.game_id.is_(None),
+                tuple_(Leaderboard.period_type, Leaderboard.period_date).in_(list(periods.items()))
             )
-            total_score = result.scalar() or 0
+        )
+        totals = dict(result.all())
 
+        stats = {}
+        for period_type, period_date in periods.items():
             stats[period_type] = {
-                "total_score": total_score,
+                "total_score": totals.get(period_type, 0),
                 "period_date": period_date.isoformat()
             }
 
         return stats
+
+    async def rebuild_global_leaderboard(self) -> int:
+        """
+        Rebuild cross-game leaderboard rows (game_id NULL) from game_sessions.
+
+        Game ends wait on the global board lock until the caller's
+        transaction ends, so none can insert a row between the DELETE and
+        the INSERTs. Once committed, the rank index's global boards are
+        replaced with the rebuilt totals.
+
+        Returns:
+            Number of rows written
+        """
+        await self.db.execute(select(func.pg_advisory_xact_lock(GLOBAL_BOARD_LOCK_KEY)))
+
+        # Stored in UTC, so the dates match get_period_date's on live game ends
+        completed_at = func.coalesce(GameSession.completed_at, GameSession.created_at)
+        period_dates = {
+            "daily": cast(completed_at, Date),
+            "weekly": cast(func.date_trunc("week", completed_at), Date),
+            "monthly": cast(func.date_trunc("month", completed_at), Date),
+            "all_time": literal(get_period_date("all_time"), Date),
+        }
+
+        await self.db.execute(
+            delete(Leaderboard).where(Leaderboard.game_id.is_(None))
+        )
+
+        written = 0
+        for period_type in PERIOD_TYPES:
+            period_date = period_dates[period_type].label("period_date")
+            group_by = [GameSession.user_id]
+            if period_type != "all_time":
+                group_by.append(period_date)
+            source = (
+                select(
+                    GameSession.user_id,
+                    null(),
+                    literal(period_type),
+                    period_date,
+                    func.sum(GameSession.score),
+                    func.max(GameSession.score),
+                    func.count(GameSession.id),
+                    func.now(),
+                )
+                .where(GameSession.is_completed == True)
+                .group_by(*group_by)
+            )
+            result = await self.db.execute(
+                insert(Leaderboard).from_select(
+                    [
+                        "user_id", "game_id", "period_type", "period_date",
+                        "total_score", "best_score", "games_played", "updated_at",
+                    ],
+                    source,
+                )
+            )
+            written += result.rowcount
+
+        await self.db.flush()
+        on_commit(self.db, self.reindex_global_leaderboard)
+        return written
+
+    async def reindex_global_leaderboard(self) -> int:
+        """
+        Replace the rank index's cross-game boards with the committed rows.
+
+        Runs in a transaction of its own under the global board lock, so no
+        game end commits between reading the rows and replacing the boards.
+        Rebuilt totals may be lower than indexed ones, which a merge would
+        keep.
+
+        Returns:
+            Number of boards replaced
+        """
+        try:
+            await self.db.execute(select(func.pg_advisory_xact_lock(GLOBAL_BOARD_LOCK_KEY)))
+            boards = await self.rank_index.rebuild(self.db, global_only=True, replace=True)
+        finally:
+            # Releases the lock
+            await self.db.commit()
+        await get_response_cache().bump_version(leaderboard_version(None))
+        return boards
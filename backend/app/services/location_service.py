@@ -0,0 +1,97 @@
+"""Location service - cached location catalog and nearby lookups"""
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import get_response_cache
+from app.core.config import settings
+from app.models.location import Location
+from app.schemas.location import LocationResponse, LocationListResponse
+from app.services.counter_buffer import get_counter_buffer
+from app.utils.geo import GeoGrid
+
+
+class LocationIndex:
+    """Spatial index over the active locations of one catalog version"""
+
+    def __init__(self, source: bytes):
+        self.source = source
+        self.grid = GeoGrid()
+        self.by_id: dict[int, LocationResponse] = {}
+        self.max_checkin_radius = 0
+
+        catalog = LocationListResponse.model_validate_json(source)
+        for location in catalog.locations:
+            self.grid.add(location.latitude, location.longitude, location)
+            self.by_id[location.id] = location
+            self.max_checkin_radius = max(self.max_checkin_radius, location.checkin_radius_meters)
+
+    def nearby(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_meters: float,
+        limit: int | None = None
+    ) -> list[tuple[int, LocationResponse]]:
+        """Get (distance, location) pairs within radius, closest first"""
+        found = self.grid.within(latitude, longitude, radius_meters)
+        return found[:limit] if limit else found
+
+    def find_checkin_location(self, latitude: float, longitude: float) -> tuple[int, LocationResponse] | None:
+        """Get the closest location whose check-in radius covers the point"""
+        for distance, location in self.nearby(latitude, longitude, self.max_checkin_radius):
+            if distance <= location.checkin_radius_meters:
+                return distance, location
+        return None
+
+
+# Per-process index, rebuilt when the cached catalog changes
+_index: LocationIndex | None = None
+
+
+class LocationService:
+    """Service for location operations"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_catalog(self, version: int | None = None) -> bytes:
+        """
+        Get serialized list of active locations, with flushed check-in counts.
+
+        Cached per version of the check-in counter, the current one by
+        default, so a counter flush moves every worker to a fresh catalog.
+        """
+        if version is None:
+            version = await get_counter_buffer().version("location_checkins")
+
+        async def load() -> bytes:
+            result = await self.db.execute(
+                select(Location)
+                .where(Location.is_active == True)
+                .order_by(Location.id)
+            )
+            locations = [LocationResponse.model_validate(loc) for loc in result.scalars().all()]
+
+            return LocationListResponse(
+                locations=locations,
+                total=len(locations)
+            ).model_dump_json().encode()
+
+        return await get_response_cache().get_or_set(
+            "locations", f"list:{version}", settings.CATALOG_CACHE_TTL_SECONDS, load
+        )
+
+    async def get_catalog_with_counters(self) -> bytes:
+        """Get serialized list of active locations, with pending check-ins counted"""
+        return await get_counter_buffer().overlay_json(
+            "location_checkins", self.get_catalog, LocationListResponse, "locations", "total_checkins"
+        )
+
+    async def get_index(self) -> LocationIndex:
+        """Get spatial index of the current catalog"""
+        global _index
+        catalog = await self.get_catalog()
+        if _index is None or _index.source != catalog:
+            _index = LocationIndex(catalog)
+        return _index
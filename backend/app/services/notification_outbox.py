@@ -0,0 +1,267 @@
+"""Notification outbox - durable Telegram notifications delivered by a worker"""
+
+import uuid
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable, NamedTuple
+
+from sqlalchemy import Boolean, DateTime, cast, column, insert, or_, select, update, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.bot.dispatcher import NotificationDispatcher, OutgoingMessage
+from app.bot.templates import keyboard_data, load_keyboard
+from app.core.config import settings
+from app.models.notification import Notification
+from app.models.user import User
+
+
+class Recipient(NamedTuple):
+    """User receiving a broadcast"""
+    user_id: int
+    telegram_id: int
+    language_code: str
+
+
+class Claimed(NamedTuple):
+    """Leased notification and its attempt number"""
+    message: OutgoingMessage
+    attempts: int
+
+
+def message_fields(message: OutgoingMessage) -> dict:
+    """Notification columns storing a rendered message"""
+    options = {}
+    if message.parse_mode:
+        options["parse_mode"] = message.parse_mode
+    if message.reply_markup:
+        options["reply_markup"] = keyboard_data(message.reply_markup)
+    return {
+        "body": message.text,
+        "action_type": "open_app" if message.reply_markup else None,
+        "action_data": options or None,
+        "channel": "telegram",
+    }
+
+
+def stored_message(notification_id, telegram_id: int, body: str, action_data: dict | None) -> OutgoingMessage:
+    """Rebuild a message stored by message_fields"""
+    options = action_data or {}
+    reply_markup = options.get("reply_markup")
+    return OutgoingMessage(
+        chat_id=telegram_id,
+        text=body,
+        reply_markup=load_keyboard(reply_markup) if reply_markup else None,
+        parse_mode=options.get("parse_mode"),
+        notification_id=notification_id,
+    )
+
+
+class NotificationOutbox:
+    """
+    Service for queueing Telegram notifications and delivering them.
+
+    Rows are written in the caller's transaction, so a notification exists
+    exactly when the business change it announces was committed. Workers
+    lease pending rows (FOR UPDATE SKIP LOCKED, then leased_until), so
+    concurrent claims never pick the same row. A worker that dies while
+    sending leaves its rows to be claimed again once the lease runs out
+    (at-least-once delivery).
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def enqueue(self, user_id: int, notification_type: str, title: str, message: OutgoingMessage) -> Notification:
+        """Queue a message for delivery after the current transaction commits"""
+        notification = Notification(
+            user_id=user_id,
+            type=notification_type,
+            title=title,
+            **message_fields(message)
+        )
+        self.db.add(notification)
+        return notification
+
+    async def enqueue_broadcast(
+        self,
+        notification_type: str,
+        title: str,
+        render: Callable[[Recipient], OutgoingMessage]
+    ) -> int:
+        """
+        Queue a message for every user with notifications enabled.
+
+        Recipients are read in keyset batches and each batch is committed
+        on its own, so workers start sending while the rest is queued.
+
+        Returns:
+            Number of queued notifications
+        """
+        queued = 0
+        async for batch in self._recipients(settings.NOTIFICATION_BATCH_SIZE):
+            await self.db.execute(
+                insert(Notification),
+                [
+                    {
+                        "user_id": recipient.user_id,
+                        "type": notification_type,
+                        "title": title,
+                        **message_fields(render(recipient)),
+                    }
+                    for recipient in batch
+                ]
+            )
+            await self.db.commit()
+            queued += len(batch)
+        return queued
+
+    async def _recipients(self, batch_size: int) -> AsyncIterator[list[Recipient]]:
+        """Yield users with notifications enabled in id order"""
+        last_id = 0
+        while True:
+            result = await self.db.execute(
+                select(User.id, User.telegram_id, User.language_code)
+                .where(User.id > last_id, User.notifications_enabled == True)
+                .order_by(User.id)
+                .limit(batch_size)
+            )
+            batch = [Recipient(*row) for row in result.all()]
+            if not batch:
+                return
+            yield batch
+            last_id = batch[-1].user_id
+
+    async def deliver_batch(self, dispatcher: NotificationDispatcher, limit: int) -> int:
+        """
+        Claim up to limit pending notifications, send them and record the outcome.
+
+        Claiming and recording are two short transactions; no transaction
+        or connection is held while messages are sent. Commits the session.
+
+        Returns:
+            Number of claimed notifications
+        """
+        leased_until, claimed = await self.claim(limit)
+        if not claimed:
+            return 0
+
+        async def queued() -> AsyncIterator[OutgoingMessage]:
+            for item in claimed:
+                yield item.message
+
+        stats = await dispatcher.dispatch(queued())
+        await self.record(leased_until, claimed, stats.delivered)
+        return len(claimed)
+
+    async def claim(self, limit: int) -> tuple[datetime, list[Claimed]]:
+        """
+        Lease up to limit due notifications and commit.
+
+        Rows are picked with FOR UPDATE SKIP LOCKED and leased for
+        NOTIFICATION_LEASE_SECONDS, counting an attempt. Rows whose lease
+        ran out after their last attempt (a worker died while sending) are
+        given up instead.
+
+        Returns:
+            Lease end, which identifies this claim, and the claimed messages
+        """
+        now = datetime.utcnow()
+        leased_until = now + timedelta(seconds=settings.NOTIFICATION_LEASE_SECONDS)
+        result = await self.db.execute(
+            select(
+                Notification.id,
+                User.telegram_id,
+                Notification.body,
+                Notification.action_data,
+                Notification.attempts
+            )
+            .join(User, User.id == Notification.user_id)
+            .where(
+                Notification.channel == "telegram",
+                Notification.sent_at.is_(None),
+                or_(Notification.leased_until.is_(None), Notification.leased_until <= now),
+                or_(Notification.next_attempt_at.is_(None), Notification.next_attempt_at <= now),
+            )
+            .order_by(Notification.created_at)
+            .limit(limit)
+            .with_for_update(of=Notification, skip_locked=True)
+        )
+        rows = result.all()
+        claimed = [
+            Claimed(stored_message(*row[:4]), row.attempts + 1)
+            for row in rows
+            if row.attempts < settings.NOTIFICATION_MAX_ATTEMPTS
+        ]
+        exhausted = [row.id for row in rows if row.attempts >= settings.NOTIFICATION_MAX_ATTEMPTS]
+
+        if claimed:
+            await self.db.execute(
+                update(Notification)
+                .where(Notification.id.in_([item.message.notification_id for item in claimed]))
+                .values(leased_until=leased_until, attempts=Notification.attempts + 1)
+                .execution_options(synchronize_session=False)
+            )
+        if exhausted:
+            await self.db.execute(
+                update(Notification)
+                .where(Notification.id.in_(exhausted))
+                .values(sent_at=now, leased_until=None)
+                .execution_options(synchronize_session=False)
+            )
+        await self.db.commit()
+        return leased_until, claimed
+
+    async def record(
+        self,
+        leased_until: datetime,
+        claimed: list[Claimed],
+        delivered: list[tuple[uuid.UUID, datetime]]
+    ) -> int:
+        """
+        Record the outcome of a claim in one UPDATE and commit.
+
+        Failed notifications are retried after an exponential backoff until
+        NOTIFICATION_MAX_ATTEMPTS; then they are marked sent but not
+        delivered. Rows claimed again after the lease ran out are left to
+        the newer claim.
+
+        Returns:
+            Number of updated notifications
+        """
+        now = datetime.utcnow()
+        sent_at = dict(delivered)
+        outcomes = []
+        for item in claimed:
+            notification_id = item.message.notification_id
+            if notification_id in sent_at:
+                outcomes.append((notification_id, sent_at[notification_id], True, None))
+            elif item.attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+                outcomes.append((notification_id, now, False, None))
+            else:
+                backoff = settings.NOTIFICATION_RETRY_BACKOFF_SECONDS * 2 ** (item.attempts - 1)
+                outcomes.append((notification_id, None, False, now + timedelta(seconds=backoff)))
+
+        outcome = (
+            values(
+                column("id", UUID(as_uuid=True)),
+                column("sent_at", DateTime),
+                column("delivered", Boolean),
+                column("next_attempt_at", DateTime),
+                name="outcome"
+            )
+            .data(outcomes)
+        )
+        result = await self.db.execute(
+            update(Notification)
+            .where(Notification.id == outcome.c.id, Notification.leased_until == leased_until)
+            .values(
+                # All-NULL VALUES columns are text
+                sent_at=cast(outcome.c.sent_at, DateTime),
+                delivered=outcome.c.delivered,
+                next_attempt_at=cast(outcome.c.next_attempt_at, DateTime),
+                leased_until=None
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        return result.rowcount
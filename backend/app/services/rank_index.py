@@ -0,0 +1,434 @@
+"""Rank index - O(log n) leaderboard ranks backed by Redis or a skiplist"""
+
+import random
+from collections import defaultdict
+from datetime import date
+from functools import lru_cache
+
+from redis.asyncio import Redis
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.models.leaderboard import Leaderboard
+
+RankKey = tuple[int | None, str, date]
+
+# Period keys expire after the longest period (monthly) has passed
+PERIOD_KEY_TTL_SECONDS = 35 * 24 * 3600
+
+
+def leaderboard_key(game_id: int | None, period_type: str, period_date: date) -> RankKey:
+    """Build rank index key for a leaderboard board"""
+    return (game_id, period_type, period_date)
+
+
+class RankIndex:
+    """
+    Base class for leaderboard rank indexes.
+
+    Ranks use competition ranking, matching the SQL definition
+    "number of entries with a higher total_score, plus one".
+    """
+
+    # Whether all workers see the same index; a shared index is rebuilt by
+    # one of them, a per-process one by each
+    shared = False
+
+    async def update(self, key: RankKey, user_id: int, score: int) -> None:
+        """Set user's score on a board"""
+        raise NotImplementedError
+
+    async def count_above(self, key: RankKey, score: int) -> int:
+        """Count entries with a strictly higher score"""
+        raise NotImplementedError
+
+    async def count_above_many(self, key: RankKey, scores: set[int]) -> dict[int, int]:
+        """Count entries above each of several scores"""
+        return {score: await self.count_above(key, score) for score in scores}
+
+    async def score(self, key: RankKey, user_id: int) -> int | None:
+        """Get user's score on a board"""
+        raise NotImplementedError
+
+    async def scores_many(self, key: RankKey, user_ids: list[int]) -> dict[int, int]:
+        """Get scores of several users on a board (users without an entry are left out)"""
+        raise NotImplementedError
+
+    async def top(self, key: RankKey, limit: int) -> list[tuple[int, int]]:
+        """Get the top entries as (user_id, score) pairs"""
+        raise NotImplementedError
+
+    async def size(self, key: RankKey) -> int:
+        """Get number of entries on a board"""
+        raise NotImplementedError
+
+    async def merge(self, key: RankKey, scores: dict[int, int]) -> None:
+        """Add entries to a board, keeping the higher score of members already on it"""
+        raise NotImplementedError
+
+    async def replace(self, key: RankKey, scores: dict[int, int]) -> None:
+        """Replace all entries of a board"""
+        raise NotImplementedError
+
+    async def rank(self, key: RankKey, user_id: int) -> int | None:
+        """Get user's rank on a board, or None if the user has no entry"""
+        score = await self.score(key, user_id)
+        if score is None:
+            return None
+        return await self.count_above(key, score) + 1
+
+    async def load(self, db: AsyncSession, key: RankKey) -> int:
+        """
+        Merge one board from the leaderboard table, e.g. after its key was evicted.
+
+        Returns:
+            Number of loaded entries
+        """
+        game_id, period_type, period_date = key
+        result = await db.execute(
+            select(Leaderboard.user_id, Leaderboard.total_score)
+            .where(
+                Leaderboard.period_type == period_type,
+                Leaderboard.period_date == period_date,
+                Leaderboard.game_id.is_(None) if game_id is None else Leaderboard.game_id == game_id,
+            )
+        )
+        scores = dict(result.all())
+        await self.merge(key, scores)
+        return len(scores)
+
+    async def rebuild(
+        self,
+        db: AsyncSession,
+        period_types: tuple[str, ...] | None = None,
+        global_only: bool = False,
+        replace: bool = False
+    ) -> int:
+        """
+        Rebuild boards for the current periods from the leaderboard table.
+
+        Totals only grow within a period, so loaded scores are merged into
+        the boards by default: an update committed while the table is being
+        read is never overwritten by the older total. Pass replace=True to
+        drop entries and scores the table no longer has; the caller must
+        keep game ends from committing meanwhile.
+
+        Returns:
+            Number of boards rebuilt
+        """
+        # Imported here to avoid a circular import with the leaderboard service
+        from app.services.leaderboard_service import PERIOD_TYPES, get_period_date
+
+        periods = [
+            (period_type, get_period_date(period_type))
+            for period_type in (period_types or PERIOD_TYPES)
+        ]
+        result = await db.execute(
+            select(
+                Leaderboard.game_id,
+                Leaderboard.period_type,
+                Leaderboard.period_date,
+                Leaderboard.user_id,
+                Leaderboard.total_score,
+            )
+            .where(tuple_(Leaderboard.period_type, Leaderboard.period_date).in_(periods))
+            .where(Leaderboard.game_id.is_(None) if global_only else True)
+        )
+
+        boards: dict[RankKey, dict[int, int]] = defaultdict(dict)
+        for game_id, period_type, period_date, user_id, total_score in result.all():
+            boards[leaderboard_key(game_id, period_type, period_date)][user_id] = total_score
+
+        for key, scores in boards.items():
+            if replace:
+                await self.replace(key, scores)
+            else:
+                await self.merge(key, scores)
+
+        return len(boards)
+
+
+class _SkipListNode:
+    """Skiplist node with per-level spans"""
+
+    __slots__ = ("score", "member", "forward", "span")
+
+    def __init__(self, score: int, member: int, level: int):
+        self.score = score
+        self.member = member
+        self.forward: list["_SkipListNode | None"] = [None] * level
+        self.span = [0] * level
+
+
+class SkipList:
+    """
+    Indexable skiplist ordered by score descending, then member ascending.
+
+    Same structure as Redis sorted sets: every forward pointer carries the
+    number of nodes it skips, so counting entries above a score is O(log n).
+    """
+
+    MAX_LEVEL = 32
+    P = 0.25
+
+    def __init__(self):
+        self.head = _SkipListNode(0, 0, self.MAX_LEVEL)
+        self.level = 1
+        self.length = 0
+        self.scores: dict[int, int] = {}
+
+    @staticmethod
+    def _precedes(node: _SkipListNode, score: int, member: int) -> bool:
+        return node.score > score or (node.score == score and node.member < member)
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < self.MAX_LEVEL and random.random() < self.P:
+            level += 1
+        return level
+
+    def insert(self, member: int, score: int) -> None:
+        """Insert or update member's score"""
+        if member in self.scores:
+            if self.scores[member] == score:
+                return
+            self.delete(member)
+
+        update: list[_SkipListNode] = [self.head] * self.MAX_LEVEL
+        rank = [0] * self.MAX_LEVEL
+        node = self.head
+        for i in reversed(range(self.level)):
+            rank[i] = 0 if i == self.level - 1 else rank[i + 1]
+            while node.forward[i] and self._precedes(node.forward[i], score, member):
+                rank[i] += node.span[i]
+                node = node.forward[i]
+            update[i] = node
+
+        level = self._random_level()
+        if level > self.level:
+            for i in range(self.level, level):
+                rank[i] = 0
+                update[i] = self.head
+                self.head.span[i] = self.length
+            self.level = level
+
+        new_node = _SkipListNode(score, member, level)
+        for i in range(level):
+            new_node.forward[i] = update[i].forward[i]
+            update[i].forward[i] = new_node
+            new_node.span[i] = update[i].span[i] - (rank[0] - rank[i])
+            update[i].span[i] = (rank[0] - rank[i]) + 1
+        for i in range(level, self.level):
+            update[i].span[i] += 1
+
+        self.length += 1
+        self.scores[member] = score
+
+    def delete(self, member: int) -> None:
+        """Remove member if present"""
+        score = self.scores.pop(member, None)
+        if score is None:
+            return
+
+        update: list[_SkipListNode] = [self.head] * self.MAX_LEVEL
+        node = self.head
+        for i in reversed(range(self.level)):
+            while node.forward[i] and self._precedes(node.forward[i], score, member):
+                node = node.forward[i]
+            update[i] = node
+
+        target = node.forward[0]
+        for i in range(self.level):
+            if update[i].forward[i] is target:
+                update[i].span[i] += target.span[i] - 1
+                update[i].forward[i] = target.forward[i]
+            else:
+                update[i].span[i] -= 1
+
+        while self.level > 1 and self.head.forward[self.level - 1] is None:
+            self.level -= 1
+        self.length -= 1
+
+    def count_above(self, score: int) -> int:
+        """Count members with a strictly higher score"""
+        count = 0
+        node = self.head
+        for i in reversed(range(self.level)):
+            while node.forward[i] and node.forward[i].score > score:
+                count += node.span[i]
+                node = node.forward[i]
+        return count
+
+    def top(self, limit: int) -> list[tuple[int, int]]:
+        """Get the first `limit` (member, score) pairs"""
+        entries = []
+        node = self.head.forward[0]
+        while node and len(entries) < limit:
+            entries.append((node.member, node.score))
+            node = node.forward[0]
+        return entries
+
+
+class MemoryRankIndex(RankIndex):
+    """
+    In-process rank index, used for tests and single-worker setups.
+
+    Boards of past periods are dropped whenever a newer board of the same
+    period type is created, like the Redis keys expiring.
+    """
+
+    def __init__(self):
+        self.boards: dict[RankKey, SkipList] = {}
+
+    def _board(self, key: RankKey) -> SkipList:
+        board = self.boards.get(key)
+        if board is None:
+            board = self.boards[key] = SkipList()
+            self._drop_past_periods(key)
+        return board
+
+    def _drop_past_periods(self, key: RankKey) -> None:
+        _, period_type, period_date = key
+        for other in [k for k in self.boards if k[1] == period_type and k[2] < period_date]:
+            del self.boards[other]
+
+    async def update(self, key: RankKey, user_id: int, score: int) -> None:
+        self._board(key).insert(user_id, score)
+
+    async def count_above(self, key: RankKey, score: int) -> int:
+        board = self.boards.get(key)
+        return board.count_above(score) if board else 0
+
+    async def score(self, key: RankKey, user_id: int) -> int | None:
+        board = self.boards.get(key)
+        return board.scores.get(user_id) if board else None
+
+    async def scores_many(self, key: RankKey, user_ids: list[int]) -> dict[int, int]:
+        board = self.boards.get(key)
+        if not board:
+            return {}
+        return {user_id: board.scores[user_id] for user_id in user_ids if user_id in board.scores}
+
+    async def top(self, key: RankKey, limit: int) -> list[tuple[int, int]]:
+        board = self.boards.get(key)
+        return board.top(limit) if board else []
+
+    async def size(self, key: RankKey) -> int:
+        board = self.boards.get(key)
+        return board.length if board else 0
+
+    async def merge(self, key: RankKey, scores: dict[int, int]) -> None:
+        board = self._board(key)
+        for user_id, score in scores.items():
+            current = board.scores.get(user_id)
+            if current is None or score > current:
+                board.insert(user_id, score)
+
+    async def replace(self, key: RankKey, scores: dict[int, int]) -> None:
+        board = SkipList()
+        for user_id, score in scores.items():
+            board.insert(user_id, score)
+        self.boards[key] = board
+        self._drop_past_periods(key)
+
+
+class RedisRankIndex(RankIndex):
+    """Rank index backed by Redis sorted sets, shared by all workers"""
+
+    shared = True
+
+    # Members sent per ZADD while merging a board
+    MERGE_CHUNK_SIZE = 1000
+
+    def __init__(self, redis: Redis, prefix: str = "lb"):
+        self.redis = redis
+        self.prefix = prefix
+
+    def _key(self, key: RankKey) -> str:
+        game_id, period_type, period_date = key
+        game = "all" if game_id is None else str(game_id)
+        return f"{self.prefix}:{game}:{period_type}:{period_date.isoformat()}"
+
+    @staticmethod
+    def _ttl(key: RankKey) -> int | None:
+        return None if key[1] == "all_time" else PERIOD_KEY_TTL_SECONDS
+
+    async def update(self, key: RankKey, user_id: int, score: int) -> None:
+        redis_key = self._key(key)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zadd(redis_key, {str(user_id): score})
+            ttl = self._ttl(key)
+            if ttl:
+                pipe.expire(redis_key, ttl)
+            await pipe.execute()
+
+    async def count_above(self, key: RankKey, score: int) -> int:
+        return await self.redis.zcount(self._key(key), f"({score}", "+inf")
+
+    async def count_above_many(self, key: RankKey, scores: set[int]) -> dict[int, int]:
+        redis_key = self._key(key)
+        ordered = list(scores)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for score in ordered:
+                pipe.zcount(redis_key, f"({score}", "+inf")
+            counts = await pipe.execute()
+        return dict(zip(ordered, counts))
+
+    async def score(self, key: RankKey, user_id: int) -> int | None:
+        score = await self.redis.zscore(self._key(key), str(user_id))
+        return None if score is None else int(score)
+
+    async def scores_many(self, key: RankKey, user_ids: list[int]) -> dict[int, int]:
+        if not user_ids:
+            return {}
+        scores = await self.redis.zmscore(self._key(key), [str(user_id) for user_id in user_ids])
+        return {user_id: int(score) for user_id, score in zip(user_ids, scores) if score is not None}
+
+    async def top(self, key: RankKey, limit: int) -> list[tuple[int, int]]:
+        entries = await self.redis.zrevrange(self._key(key), 0, limit - 1, withscores=True)
+        return [(int(member), int(score)) for member, score in entries]
+
+    async def size(self, key: RankKey) -> int:
+        return await self.redis.zcard(self._key(key))
+
+    async def merge(self, key: RankKey, scores: dict[int, int]) -> None:
+        # ZADD GT (Redis 6.2+) only ever raises a member's score
+        redis_key = self._key(key)
+        members = [(str(user_id), score) for user_id, score in scores.items()]
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for start in range(0, len(members), self.MERGE_CHUNK_SIZE):
+                pipe.zadd(redis_key, dict(members[start:start + self.MERGE_CHUNK_SIZE]), gt=True)
+            ttl = self._ttl(key)
+            if ttl and members:
+                pipe.expire(redis_key, ttl)
+            await pipe.execute()
+
+    async def replace(self, key: RankKey, scores: dict[int, int]) -> None:
+        # Built under a temporary key and renamed, so readers never see a
+        # half-loaded board
+        redis_key = self._key(key)
+        tmp_key = f"{redis_key}:rebuild"
+        members = [(str(user_id), score) for user_id, score in scores.items()]
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(tmp_key)
+            for start in range(0, len(members), self.MERGE_CHUNK_SIZE):
+                pipe.zadd(tmp_key, dict(members[start:start + self.MERGE_CHUNK_SIZE]))
+            if members:
+                pipe.rename(tmp_key, redis_key)
+                ttl = self._ttl(key)
+                if ttl:
+                    pipe.expire(redis_key, ttl)
+            else:
+                pipe.delete(redis_key)
+            await pipe.execute()
+
+
+@lru_cache()
+def get_rank_index() -> RankIndex:
+    """Get shared rank index instance"""
+    redis = get_redis()
+    if settings.RANK_INDEX_BACKEND == "redis" and redis is not None:
+        return RedisRankIndex(redis)
+    return MemoryRankIndex()
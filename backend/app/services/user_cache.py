@@ -0,0 +1,173 @@
+"""User cache - short-lived identity snapshots for authenticated requests"""
+
+import json
+import time
+from datetime import datetime
+from functools import lru_cache
+
+from sqlalchemy import DateTime, event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.cache import CacheBackend, create_cache_backend
+from app.core.config import settings
+from app.db.session import on_commit
+from app.models.user import User
+
+_COLUMNS = [column.key for column in User.__table__.columns]
+_DATETIME_COLUMNS = {
+    column.key for column in User.__table__.columns
+    if isinstance(column.type, DateTime)
+}
+
+# A Telegram account never moves to another user, so its link is kept long
+TELEGRAM_LINK_TTL = 24 * 3600
+
+# How long a user's generation outlives its last invalidation. Far above
+# the entry TTL, so entries stored under a generation are gone before it
+# expires and readers fall back to the initial one.
+GENERATION_TTL = 24 * 3600
+INITIAL_GENERATION = "0"
+
+
+class UserCache:
+    """
+    Cache of User column values keyed by user_id.
+
+    Entries live in the shared backend only, without a per-process tier,
+    so an invalidation is seen by every worker at once. Cached users are
+    detached snapshots - they must not be changed or added to a session.
+
+    Invalidating a user sets a new generation instead of deleting the
+    entry, and an entry is only served while its generation is current.
+    A reader stores what it loaded under the generation it saw before
+    loading, so a load that raced with a commit never outlives the
+    commit's invalidation - it is stored stale but never read.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"user:{user_id}"
+
+    @staticmethod
+    def _generation_key(user_id: int) -> str:
+        return f"user:generation:{user_id}"
+
+    async def generation(self, user_id: int) -> str:
+        """Get user's current generation, read before loading the user to cache it"""
+        if self.ttl <= 0:
+            return INITIAL_GENERATION
+        raw = await self.backend.get(self._generation_key(user_id))
+        return raw.decode() if raw else INITIAL_GENERATION
+
+    async def get(self, user_id: int) -> tuple[User | None, str]:
+        """
+        Get cached user snapshot.
+
+        Returns:
+            The user, None on a miss, and the current generation to set a
+            reloaded user under
+        """
+        if self.ttl <= 0:
+            return None, INITIAL_GENERATION
+        raw, generation = await self.backend.get_many(
+            [self._key(user_id), self._generation_key(user_id)]
+        )
+        generation = generation.decode() if generation else INITIAL_GENERATION
+        if raw is None:
+            return None, generation
+
+        entry = json.loads(raw)
+        if entry["generation"] != generation:
+            return None, generation
+        values = entry["user"]
+        for key in _DATETIME_COLUMNS:
+            if values.get(key) is not None:
+                values[key] = datetime.fromisoformat(values[key])
+        user = User(**values)
+        make_transient_to_detached(user)
+        return user, generation
+
+    async def set(self, user: User, generation: str) -> None:
+        """Store user's column values under the generation read before loading it"""
+        if self.ttl <= 0:
+            return
+        values = {key: getattr(user, key) for key in _COLUMNS}
+        for key in _DATETIME_COLUMNS:
+            if values[key] is not None:
+                values[key] = values[key].isoformat()
+        entry = {"generation": generation, "user": values}
+        await self.backend.set(self._key(user.id), json.dumps(entry).encode(), self.ttl)
+
+    @staticmethod
+    def _link_key(telegram_id: int) -> str:
+        return f"user:telegram:{telegram_id}"
+
+    async def get_user_id(self, telegram_id: int) -> int | None:
+        """Get cached user_id of a Telegram account, 0 if it has no user"""
+        if self.ttl <= 0:
+            return None
+        raw = await self.backend.get(self._link_key(telegram_id))
+        return None if raw is None else int(raw)
+
+    async def set_user_id(self, telegram_id: int, user_id: int | None) -> None:
+        """Link a Telegram account to its user; a missing user is only remembered for ttl"""
+        if self.ttl <= 0:
+            return
+        ttl = TELEGRAM_LINK_TTL if user_id else self.ttl
+        await self.backend.set(self._link_key(telegram_id), str(user_id or 0).encode(), ttl)
+
+    async def forget_user_id(self, telegram_id: int) -> None:
+        """Drop a cached link, e.g. once the account registers"""
+        await self.backend.delete(self._link_key(telegram_id))
+
+    async def invalidate(self, *user_ids: int) -> None:
+        """Start a new generation of cached users, hiding current entries"""
+        # A timestamp rather than a counter, so a generation is never
+        # reused after its key expires
+        generation = str(time.time_ns()).encode()
+        for user_id in user_ids:
+            await self.backend.set(self._generation_key(user_id), generation, GENERATION_TTL)
+
+
+@lru_cache()
+def get_user_cache() -> UserCache:
+    """Get shared user cache instance"""
+    return UserCache(create_cache_backend(), settings.USER_CACHE_TTL_SECONDS)
+
+
+async def get_user(db: AsyncSession, user_id: int) -> User | None:
+    """Get user from the cache, loading and caching it on a miss"""
+    user_cache = get_user_cache()
+    user, generation = await user_cache.get(user_id)
+    if user is None:
+        user = await db.get(User, user_id)
+        if user is not None:
+            await user_cache.set(user, generation)
+    return user
+
+
+def mark_user_dirty(session: Session | AsyncSession, user_id: int):
+    """
+    Invalidate cached user once the session commits.
+
+    ORM changes are tracked automatically; call this after changing the
+    users table with a Core UPDATE.
+    """
+    dirty = session.info.get("dirty_users")
+    if dirty is None:
+        dirty = session.info["dirty_users"] = set()
+        on_commit(session, lambda: get_user_cache().invalidate(*session.info.pop("dirty_users", ())))
+    dirty.add(user_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_dirty_users(session: Session, flush_context):
+    """Record users changed through the ORM in this session"""
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, User):
+            mark_user_dirty(session, obj.id)
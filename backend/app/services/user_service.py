@@ -1,13 +1,44 @@
 """User service - business logic for user operations"""
 
 from datetime import datetime
-from sqlalchemy import select
+from typing import Any, Mapping
+from sqlalchemy import ColumnElement, Update, case, select, update, func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.bot.notifications import NotificationService
+from app.core.cache import get_response_cache
+from app.core.levels import get_level_table
+from app.db.session import on_commit
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
+from app.services.leaderboard_service import LEADERBOARD_PROFILES_VERSION
+from app.services.notification_outbox import NotificationOutbox
+from app.services.user_cache import get_user_cache, mark_user_dirty
 from app.utils.helpers import generate_referral_code
 
+# Columns returned by stats updates and synced back onto the loaded user
+STATS_COLUMNS = (
+    User.points,
+    User.experience,
+    User.level,
+    User.total_checkins,
+    User.total_games_played,
+    User.best_game_score,
+    User.updated_at,
+)
+
+
+def level_expression(experience: ColumnElement[int]) -> ColumnElement[int]:
+    """SQL counterpart of User.calculate_level"""
+    return case(
+        *[
+            (experience >= threshold, level)
+            for level, threshold in reversed(list(enumerate(get_level_table().thresholds, start=1)))
+        ],
+        else_=0
+    )
+
 
 class UserService:
     """Service for user-related operations"""
@@ -40,6 +71,8 @@ class UserService:
         self.db.add(user)
         await self.db.flush()
         await self.db.refresh(user)
+        # The bot may have cached this account as unregistered
+        on_commit(self.db, lambda: get_user_cache().forget_user_id(user_data.telegram_id))
         return user
 
     async def get_or_create(self, telegram_data: dict) -> tuple[User, bool]:
@@ -52,6 +85,7 @@ class UserService:
         user = await self.get_by_telegram_id(telegram_data.get("id"))
 
         if user:
+            shown_on_boards = (user.username, user.first_name, user.photo_url)
             # Update user data from Telegram
             user.username = telegram_data.get("username")
             user.first_name = telegram_data.get("first_name")
@@ -59,6 +93,8 @@ class UserService:
             user.photo_url = telegram_data.get("photo_url")
             user.last_active_at = datetime.utcnow()
             await self.db.flush()
+            if (user.username, user.first_name, user.photo_url) != shown_on_boards:
+                on_commit(self.db, lambda: get_response_cache().bump_version(LEADERBOARD_PROFILES_VERSION))
             return user, False
 
         # Create new user
@@ -84,34 +120,83 @@ class UserService:
         await self.db.refresh(user)
         return user
 
+    def stats_update(
+        self,
+        user_id: int,
+        points: int = 0,
+        experience: int = 0,
+        checkins: int = 0,
+        games_played: int = 0,
+        game_score: int | None = None
+    ) -> Update:
+        """
+        Build an UPDATE applying stat deltas relative to the stored row.
+
+        Counters are incremented in SQL and the level is derived from the
+        new experience, so concurrent updates of one user are never lost.
+        The statement returns STATS_COLUMNS.
+        """
+        values = {
+            "points": User.points + points,
+            "experience": User.experience + experience,
+            "total_checkins": User.total_checkins + checkins,
+            "total_games_played": User.total_games_played + games_played,
+            "level": func.greatest(User.level, level_expression(User.experience + experience)),
+            "updated_at": datetime.utcnow(),
+        }
+        if game_score is not None:
+            values["best_game_score"] = func.greatest(User.best_game_score, game_score)
+
+        return (
+            update(User)
+            .where(User.id == user_id)
+            .values(**values)
+            .returning(*STATS_COLUMNS)
+            # The returned row is copied onto the user by sync_stats; letting
+            # the ORM synchronize would expire the loaded user's attributes
+            .execution_options(synchronize_session=False)
+        )
+
+    def sync_stats(self, user: User, row: Mapping[str, Any]) -> User:
+        """
+        Copy returned stat columns onto a loaded user without marking it dirty.
+
+        Queues a level up notification when the level increased.
+        """
+        previous_level = user.level
+        for column in STATS_COLUMNS:
+            set_committed_value(user, column.key, row[column.key])
+        mark_user_dirty(self.db, user.id)
+
+        if user.level > previous_level and user.notifications_enabled:
+            level_name = get_level_table().get(user.level).name
+            NotificationOutbox(self.db).enqueue(
+                user.id,
+                "level_up",
+                f"Level {user.level} — {level_name}",
+                NotificationService().level_up_message(
+                    user.telegram_id, user.level, level_name, user.language_code
+                )
+            )
+        return user
+
+    async def apply_stats(self, user: User, **deltas) -> User:
+        """Apply stat deltas (see stats_update) and refresh user from the result"""
+        result = await self.db.execute(self.stats_update(user.id, **deltas))
+        return self.sync_stats(user, result.mappings().one())
+
     async def add_points(self, user: User, points: int, experience: int = 0) -> User:
         """Add points and experience to user"""
         # Apply level bonus
         bonus = user.get_level_bonus()
         actual_points = int(points * (1 + bonus))
 
-        user.points += actual_points
-        user.experience += experience
-
-        # Check for level up
-        new_level = user.calculate_level()
-        if new_level > user.level:
-            user.level = new_level
-
-        user.updated_at = datetime.utcnow()
-        await self.db.flush()
-        return user
+        return await self.apply_stats(user, points=actual_points, experience=experience)
 
     async def increment_checkins(self, user: User) -> User:
         """Increment user's total checkins"""
-        user.total_checkins += 1
-        await self.db.flush()
-        return user
+        return await self.apply_stats(user, checkins=1)
 
     async def increment_games_played(self, user: User, score: int) -> User:
         """Increment user's games played and update best score"""
-        user.total_games_played += 1
-        if score > user.best_game_score:
-            user.best_game_score = score
-        await self.db.flush()
-        return user
+        return await self.apply_stats(user, games_played=1, game_score=score)
@@ -1,6 +1,15 @@
 """Geolocation utilities"""
 
 import math
+from typing import Sequence
+
+try:
+    import numpy as np
+except ImportError:  # optional, batch distances fall back to pure Python
+    np = None
+
+# Below this many points the pure-Python loop beats NumPy's call overhead
+NUMPY_MIN_POINTS = 32
 
 
 def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> int:
@@ -61,3 +70,117 @@ def is_within_radius(
     """
     distance = haversine_distance(user_lat, user_lon, location_lat, location_lon)
     return (distance <= radius_meters, distance)
+
+
+def haversine_distances(
+    lat1: float | Sequence[float],
+    lon1: float | Sequence[float],
+    lat2: float | Sequence[float],
+    lon2: float | Sequence[float]
+) -> Sequence[int]:
+    """
+    Calculate distances between points element-wise.
+
+    Each argument is a scalar or a sequence of the same length, so this
+    covers one point to N locations, N points to one location and N pairs
+    (e.g. consecutive positions of a user). Results round exactly like
+    haversine_distance.
+
+    Returns:
+        Distances in meters, a NumPy int64 array when NumPy is installed
+        and the batch is large enough, a list otherwise
+    """
+    size = max(
+        (len(arg) for arg in (lat1, lon1, lat2, lon2) if not isinstance(arg, (int, float))),
+        default=1
+    )
+
+    if np is None or size < NUMPY_MIN_POINTS:
+        lat1, lon1, lat2, lon2 = (
+            [arg] * size if isinstance(arg, (int, float)) else arg
+            for arg in (lat1, lon1, lat2, lon2)
+        )
+        return [
+            haversine_distance(a_lat, a_lon, b_lat, b_lon)
+            for a_lat, a_lon, b_lat, b_lon in zip(lat1, lon1, lat2, lon2)
+        ]
+
+    lat1, lon1, lat2, lon2 = (
+        np.asarray(arg, dtype=np.float64) for arg in (lat1, lon1, lat2, lon2)
+    )
+    R = 6371000
+
+    # Same operation order as haversine_distance
+    lat1_rad = np.radians(lat1)
+    lat2_rad = np.radians(lat2)
+    delta_lat = np.radians(lat2 - lat1)
+    delta_lon = np.radians(lon2 - lon1)
+
+    a = (
+        np.sin(delta_lat / 2) ** 2 +
+        np.cos(lat1_rad) * np.cos(lat2_rad) *
+        np.sin(delta_lon / 2) ** 2
+    )
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    # np.rint rounds half to even, like round()
+    return np.rint(R * c).astype(np.int64)
+
+
+# Meters per degree of latitude (and of longitude at the equator)
+METERS_PER_DEGREE = 111320
+
+
+class GeoGrid:
+    """
+    Uniform lat/lon grid index of points.
+
+    A radius query only visits the cells overlapping the radius' bounding
+    box, then checks exact distances with the haversine formula, so lookup
+    cost depends on how many points are nearby, not on the total count.
+    """
+
+    def __init__(self, cell_degrees: float = 0.02):
+        self.cell_degrees = cell_degrees
+        self.cells: dict[tuple[int, int], list[tuple[float, float, object]]] = {}
+        self.size = 0
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return (math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees))
+
+    def add(self, lat: float, lon: float, item: object) -> None:
+        """Add an item at a point"""
+        self.cells.setdefault(self._cell(lat, lon), []).append((lat, lon, item))
+        self.size += 1
+
+    def within(self, lat: float, lon: float, radius_meters: float) -> list[tuple[int, object]]:
+        """
+        Find items within radius of a point.
+
+        Returns:
+            List of (distance_in_meters, item), closest first
+        """
+        lat_delta = radius_meters / METERS_PER_DEGREE
+        lon_delta = radius_meters / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+        min_row, min_col = self._cell(lat - lat_delta, lon - lon_delta)
+        max_row, max_col = self._cell(lat + lat_delta, lon + lon_delta)
+
+        candidates = []
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                candidates.extend(self.cells.get((row, col), ()))
+        if not candidates:
+            return []
+
+        distances = haversine_distances(
+            lat, lon,
+            [candidate[0] for candidate in candidates],
+            [candidate[1] for candidate in candidates]
+        )
+        found = [
+            (int(distance), candidate[2])
+            for distance, candidate in zip(distances, candidates)
+            if distance <= radius_meters
+        ]
+        found.sort(key=lambda pair: pair[0])
+        return found
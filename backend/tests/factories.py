@@ -0,0 +1,74 @@
+"""Helpers creating database rows for tests"""
+
+from datetime import datetime, timedelta
+from itertools import count
+
+from app.models.event import Event
+from app.models.game import Game
+from app.models.location import Location
+from app.models.user import User
+from app.schemas.checkin import CheckinCreate
+
+_ids = count(1)
+
+
+async def create_user(db, **values) -> User:
+    """Create and flush a user with a unique telegram_id"""
+    n = next(_ids)
+    user = User(telegram_id=100_000 + n, first_name=f"User {n}", **values)
+    db.add(user)
+    await db.flush()
+    return user
+
+
+async def create_game(db, slug: str = "coffee-jump", **values) -> Game:
+    """Create and flush an active game"""
+    values.setdefault("max_points_per_game", 20)
+    values.setdefault("points_conversion_rate", 0.02)
+    game = Game(name=slug.replace("-", " ").title(), slug=slug, **values)
+    db.add(game)
+    await db.flush()
+    return game
+
+
+async def create_event(db, **values) -> Event:
+    """Create and flush an active event running for a week"""
+    n = next(_ids)
+    now = datetime.utcnow()
+    values.setdefault("status", "active")
+    event = Event(
+        title=f"Event {n}",
+        slug=f"event-{n}",
+        event_type="promo",
+        starts_at=now - timedelta(days=1),
+        ends_at=now + timedelta(days=7),
+        **values
+    )
+    db.add(event)
+    await db.flush()
+    return event
+
+
+async def create_location(db, latitude: float = 50.5113, longitude: float = 30.7907, **values) -> Location:
+    """Create and flush an active location"""
+    n = next(_ids)
+    location = Location(
+        name=f"Location {n}",
+        slug=f"location-{n}",
+        address=f"Street {n}",
+        latitude=latitude,
+        longitude=longitude,
+        **values
+    )
+    db.add(location)
+    await db.flush()
+    return location
+
+
+def checkin_at(location: Location) -> CheckinCreate:
+    """Check-in request from the location's own coordinates"""
+    return CheckinCreate(
+        location_id=location.id,
+        latitude=float(location.latitude),
+        longitude=float(location.longitude),
+    )
@@ -0,0 +1,91 @@
+"""Response cache generations and on_commit callbacks"""
+
+import pytest
+
+from app.core.cache import LRUCache, MemoryCacheBackend, ResponseCache
+from app.db.session import get_db, on_commit
+
+
+@pytest.fixture(params=[False, True], ids=["shared-only", "with-local-tier"])
+def cache(request) -> ResponseCache:
+    local = LRUCache(64, 5) if request.param else None
+    return ResponseCache(MemoryCacheBackend(), local)
+
+
+async def test_invalidate_namespace_hides_every_key(cache):
+    await cache.set("events", "list:a", b"a", 60)
+    await cache.set("events", "list:b", b"b", 60)
+    await cache.set("games", "list", b"g", 60)
+
+    await cache.invalidate("events")
+
+    assert await cache.get("events", "list:a") is None
+    assert await cache.get("events", "list:b") is None
+    assert await cache.get("games", "list") == b"g"
+    await cache.set("events", "list:a", b"new", 60)
+    assert await cache.get("events", "list:a") == b"new"
+
+
+async def test_invalidate_namespace_is_one_counter(cache):
+    for i in range(100):
+        await cache.set("events", f"list:{i}", b"x", 60)
+    keys_before = set(cache.backend.data)
+
+    await cache.invalidate("events")
+
+    # Nothing is scanned or deleted; only the generation counter changes
+    assert set(cache.backend.data) - keys_before == {"version:generation:events"}
+
+
+async def test_load_racing_with_invalidation_is_not_served(cache):
+    async def load() -> bytes:
+        await cache.invalidate("events")
+        return b"stale"
+
+    assert await cache.get_or_set("events", "list", 60, load) == b"stale"
+    assert await cache.get("events", "list") is None
+
+
+async def test_invalidate_single_key(cache):
+    await cache.set("locations", "list", b"l", 60)
+    await cache.set("locations", "other", b"o", 60)
+
+    await cache.invalidate("locations", "list")
+
+    assert await cache.get("locations", "list") is None
+    assert await cache.get("locations", "other") == b"o"
+
+
+async def test_failing_callback_does_not_fail_committed_request():
+    calls = []
+
+    async def unreachable():
+        raise ConnectionError("redis is down")
+
+    async def record():
+        calls.append("ran")
+
+    dependency = get_db()
+    session = await anext(dependency)
+    on_commit(session, unreachable)
+    on_commit(session, record)
+
+    # The dependency finishes normally and later callbacks still run
+    with pytest.raises(StopAsyncIteration):
+        await anext(dependency)
+    assert calls == ["ran"]
+
+
+async def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(maxsize=3)
+    await backend.incr("generation:events")
+    await backend.set("a", b"a", 60)
+    await backend.set("b", b"b", 60)
+    assert await backend.get("a") == b"a"
+
+    # The read kept "a", the counter is never evicted
+    await backend.set("c", b"c", 60)
+    assert list(backend.data) == ["generation:events", "a", "c"]
+    await backend.set("d", b"d", 60)
+    assert list(backend.data) == ["generation:events", "c", "d"]
+    assert await backend.incr("generation:events") == 2
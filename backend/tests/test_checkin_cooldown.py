@@ -0,0 +1,80 @@
+"""Check-in cooldown - the rolling window and its cache"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.checkin import Checkin
+from app.models.user import User
+from app.services.checkin_service import CheckinError, CheckinService, CooldownCache, get_cooldown_cache
+from tests.conftest import commit
+from tests.factories import checkin_at, create_location, create_user
+
+
+async def test_cooldown_blocks_repeat_checkin(db):
+    user = await create_user(db)
+    location = await create_location(db)
+    other = await create_location(db, latitude=50.52, longitude=30.80)
+    await commit(db)
+    location_id, here, there = location.id, checkin_at(location), checkin_at(other)
+    service = CheckinService(db)
+
+    checkin, _, user_update = await service.create_checkin(user, here)
+    await commit(db)
+    assert user_update["total_checkins"] == 1
+
+    with pytest.raises(CheckinError) as error:
+        await service.create_checkin(user, here)
+    assert error.value.code == "cooldown_active"
+    remaining = error.value.details["cooldown_remaining_seconds"]
+    assert settings.CHECKIN_COOLDOWN_HOURS * 3600 - 5 <= remaining <= settings.CHECKIN_COOLDOWN_HOURS * 3600
+    await db.rollback()
+    await db.refresh(user)
+
+    # Other locations are not affected
+    await service.create_checkin(user, there)
+    await commit(db)
+
+    # Once the window has passed the location is open again
+    earlier = datetime.utcnow() - timedelta(days=1, hours=settings.CHECKIN_COOLDOWN_HOURS)
+    await db.execute(
+        update(Checkin)
+        .where(Checkin.id == checkin.id)
+        .values(created_at=earlier, checkin_date=earlier.date())
+    )
+    await commit(db)
+    # As if the cached cooldown had expired
+    get_cooldown_cache.cache_clear()
+
+    assert await service.get_cooldown_remaining(user.id, location_id) == 0
+    _, _, user_update = await service.create_checkin(user, here)
+    assert user_update["total_checkins"] == 3
+
+
+async def test_late_fill_does_not_hide_new_checkin(db, monkeypatch):
+    user = await create_user(db)
+    location = await create_location(db)
+    await commit(db)
+    user_id, location_id = user.id, location.id
+    fill = CooldownCache.fill
+
+    async def late_fill(self, *args):
+        # A check-in commits between the reader's query and its fill
+        async with AsyncSessionLocal() as other:
+            player = await other.get(User, user_id)
+            await CheckinService(other).create_checkin(player, checkin_at(location))
+            await commit(other)
+        await fill(self, *args)
+
+    monkeypatch.setattr(CooldownCache, "fill", late_fill)
+    service = CheckinService(db)
+    # The reader's own answer predates the check-in
+    assert await service.get_cooldown_remaining(user_id, location_id) == 0
+    monkeypatch.undo()
+
+    # The entry the check-in wrote is kept, not the stale fill
+    remaining = await service.get_cooldown_remaining(user_id, location_id)
+    assert remaining > settings.CHECKIN_COOLDOWN_HOURS * 3600 - 5
@@ -0,0 +1,66 @@
+"""Check-in creation - round trips and concurrent duplicates"""
+
+import asyncio
+
+from sqlalchemy import func, select
+
+from app.db.session import AsyncSessionLocal
+from app.models.checkin import Checkin
+from app.models.user import User
+from app.services.checkin_service import CheckinError, CheckinService
+from tests.conftest import auth_headers, commit, request_queries
+from tests.factories import checkin_at, create_location, create_user
+
+CHECKINS = "/api/v1/checkins"
+
+
+async def test_checkin_costs_two_round_trips(db, client):
+    user = await create_user(db)
+    location = await create_location(db)
+    await db.commit()
+    body = checkin_at(location).model_dump()
+    headers = auth_headers(user)
+    # Warm the location catalog
+    await client.get("/api/v1/locations")
+
+    before = request_queries("POST", CHECKINS)
+    response = await client.post(CHECKINS, json=body, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["checkin"]["location_name"] == location.name
+    # The user, then cooldown check, insert and rewards in one statement
+    assert request_queries("POST", CHECKINS) - before == 2
+
+    # A rejected repeat only adds the lookup of the remaining cooldown
+    before = request_queries("POST", CHECKINS)
+    response = await client.post(CHECKINS, json=body, headers=headers)
+    assert response.json()["detail"]["error_code"] == "cooldown_active"
+    assert request_queries("POST", CHECKINS) - before == 3
+
+
+async def test_concurrent_checkins_reward_once(db):
+    user = await create_user(db)
+    location = await create_location(db)
+    await commit(db)
+    user_id = user.id
+
+    async def check_in(delay: float) -> str:
+        await asyncio.sleep(delay)
+        async with AsyncSessionLocal() as session:
+            player = await session.get(User, user_id)
+            try:
+                await CheckinService(session).create_checkin(player, checkin_at(location))
+            except CheckinError as e:
+                return e.code
+            # Keep the row uncommitted while the other request runs
+            await asyncio.sleep(0.2)
+            await commit(session)
+            return "ok"
+
+    results = await asyncio.gather(check_in(0), check_in(0.05))
+
+    assert sorted(results) == ["cooldown_active", "ok"]
+    db.expire_all()
+    assert await db.scalar(select(func.count(Checkin.id))) == 1
+    refreshed = await db.get(User, user_id)
+    assert refreshed.total_checkins == 1
+    assert refreshed.experience == 10
@@ -0,0 +1,57 @@
+"""Check-in history pages"""
+
+from datetime import datetime, timedelta
+
+from app.models.checkin import Checkin
+from app.services.user_cache import get_user_cache
+from tests.conftest import auth_headers, request_queries
+from tests.factories import create_location, create_user
+
+HISTORY = "/api/v1/checkins/history"
+
+
+async def test_history_pages_cost_two_queries(db, client):
+    user = await create_user(db, total_checkins=25)
+    locations = [await create_location(db) for _ in range(3)]
+    start = datetime(2026, 1, 1, 9)
+    for n in range(25):
+        created_at = start + timedelta(days=n)
+        db.add(Checkin(
+            user_id=user.id,
+            location_id=locations[n % 3].id,
+            checkin_date=created_at.date(),
+            created_at=created_at,
+        ))
+    await db.commit()
+    headers = auth_headers(user)
+
+    before = request_queries("GET", HISTORY)
+    first = (await client.get(HISTORY, headers=headers)).json()
+    # The page with its location names, and the running counter
+    assert request_queries("GET", HISTORY) - before == 2
+
+    assert first["total"] == 25
+    assert len(first["checkins"]) == 20
+    assert first["checkins"][0]["location_name"] == locations[24 % 3].name
+
+    before = request_queries("GET", HISTORY)
+    second = (await client.get(HISTORY, headers=headers, params={"cursor": first["next_cursor"]})).json()
+    assert request_queries("GET", HISTORY) - before == 2
+    assert len(second["checkins"]) == 5
+    assert second["next_cursor"] is None
+    created = [item["created_at"] for item in first["checkins"] + second["checkins"]]
+    assert created == sorted(created, reverse=True)
+    assert len(set(created)) == 25
+
+
+async def test_history_total_ignores_cached_user(db, client):
+    user = await create_user(db, total_checkins=0)
+    await db.commit()
+    generation = await get_user_cache().generation(user.id)
+    await get_user_cache().set(user, generation)
+
+    user.total_checkins = 3
+    await db.commit()
+
+    response = await client.get(HISTORY, headers=auth_headers(user))
+    assert response.json()["total"] == 3
@@ -0,0 +1,126 @@
+"""Buffered counters - overlay on cached catalogs and flushing"""
+
+import pytest
+
+from app.core.cache import get_response_cache
+from app.db.session import AsyncSessionLocal
+from app.models.event import Event
+from app.models.location import Location
+from app.services.counter_buffer import CounterService, MemoryCounterBuffer, get_counter_buffer
+from app.services.event_service import EventService
+from tests.conftest import commit
+from tests.factories import create_event, create_location, create_user
+
+LOCATIONS = "/api/v1/locations"
+EVENTS = "/api/v1/events"
+
+
+async def catalog_checkins(client, location_id: int) -> int:
+    locations = (await client.get(LOCATIONS)).json()["locations"]
+    return next(item["total_checkins"] for item in locations if item["id"] == location_id)
+
+
+async def test_cached_catalog_counts_pending_checkins(db, client):
+    location = await create_location(db, total_checkins=4)
+    await db.commit()
+    buffer = get_counter_buffer()
+
+    assert await catalog_checkins(client, location.id) == 4
+
+    # The catalog is cached now, but later check-ins are still counted
+    await buffer.add("location_checkins", str(location.id))
+    assert await catalog_checkins(client, location.id) == 5
+    await buffer.add("location_checkins", str(location.id), 2)
+    assert await catalog_checkins(client, location.id) == 7
+
+    # Flushed deltas are counted once, from the database
+    assert await CounterService(db).flush() == 1
+    assert await get_counter_buffer().pending_all("location_checkins") == {}
+    assert await catalog_checkins(client, location.id) == 7
+    assert (await db.get(Location, location.id, populate_existing=True)).total_checkins == 7
+
+
+async def test_nearby_does_not_mutate_shared_index(db, client):
+    location = await create_location(db, total_checkins=1)
+    await db.commit()
+    await get_counter_buffer().add("location_checkins", str(location.id))
+    params = {"lat": float(location.latitude), "lon": float(location.longitude)}
+
+    for _ in range(3):
+        nearby = (await client.get(f"{LOCATIONS}/nearby", params=params)).json()
+        assert nearby["locations"][0]["location"]["total_checkins"] == 2
+
+
+async def test_catalog_counts_hold_during_flush(db, client, monkeypatch):
+    location = await create_location(db, total_checkins=4)
+    await db.commit()
+    await get_counter_buffer().add("location_checkins", str(location.id), 3)
+    assert await catalog_checkins(client, location.id) == 7
+    seen = []
+
+    async def apply(self, target, deltas):
+        # Drained, not yet in the database
+        seen.append(await catalog_checkins(client, location.id))
+        return await original_apply(self, target, deltas)
+
+    async def settle(self, counter, deltas):
+        # Committed, still cached without the deltas
+        seen.append(await catalog_checkins(client, location.id))
+        await original_settle(self, counter, deltas)
+
+    original_apply, original_settle = CounterService._apply, MemoryCounterBuffer.settle
+    monkeypatch.setattr(CounterService, "_apply", apply)
+    monkeypatch.setattr(MemoryCounterBuffer, "settle", settle)
+    assert await CounterService(db).flush() == 1
+
+    assert seen == [7, 7]
+    assert await catalog_checkins(client, location.id) == 7
+
+
+async def test_failed_flush_keeps_deltas_pending(db, monkeypatch):
+    location = await create_location(db)
+    await db.commit()
+    buffer = get_counter_buffer()
+    await buffer.add("location_checkins", str(location.id), 2)
+
+    async def broken_apply(self, target, deltas):
+        raise ConnectionError("database is down")
+
+    monkeypatch.setattr(CounterService, "_apply", broken_apply)
+    version = await buffer.version("location_checkins")
+    with pytest.raises(ConnectionError):
+        await CounterService(db).flush()
+
+    assert await buffer.snapshot("location_checkins") == (version, {str(location.id): 2})
+    assert await buffer.drain("location_checkins") == {str(location.id): 2}
+
+
+async def event_participants(client, slug: str) -> int:
+    events = (await client.get(EVENTS)).json()["events"]
+    return next(item["current_participants"] for item in events if item["slug"] == slug)
+
+
+async def test_only_unbuffered_joins_invalidate_event_lists(db, client):
+    open_event = await create_event(db)
+    capped_event = await create_event(db, max_participants=10)
+    await db.commit()
+    cache = get_response_cache()
+
+    async def join(event_id) -> None:
+        async with AsyncSessionLocal() as session:
+            user = await create_user(session)
+            await EventService(session).join_event(await session.get(Event, event_id), user)
+            await commit(session)
+
+    assert await event_participants(client, open_event.slug) == 0
+    generation = await cache.get_version("generation:events")
+
+    # Buffered, so the cached list stays and the join is overlaid
+    await join(open_event.id)
+    assert await cache.get_version("generation:events") == generation
+    assert await event_participants(client, open_event.slug) == 1
+
+    # Counted in place, so the cached list is dropped
+    await join(capped_event.id)
+    assert await cache.get_version("generation:events") == generation + 1
+    assert await event_participants(client, capped_event.slug) == 1
@@ -0,0 +1,104 @@
+"""Batch haversine distances and the geo grid"""
+
+import random
+import time
+
+import numpy as np
+import pytest
+
+from app.utils import geo
+from app.utils.geo import GeoGrid, haversine_distance, haversine_distances
+
+CENTER = (50.5113, 30.7907)
+
+
+def random_points(count: int, seed: int = 0, spread: float = 0.5) -> tuple[list[float], list[float]]:
+    rng = random.Random(seed)
+    lats = [CENTER[0] + rng.uniform(-spread, spread) for _ in range(count)]
+    lons = [CENTER[1] + rng.uniform(-spread, spread) for _ in range(count)]
+    return lats, lons
+
+
+@pytest.mark.parametrize("count", [1, geo.NUMPY_MIN_POINTS - 1, geo.NUMPY_MIN_POINTS, 5000])
+def test_batch_matches_scalar(count):
+    lats, lons = random_points(count, seed=count)
+    other_lats, other_lons = random_points(count, seed=count + 1)
+    lat, lon = CENTER
+
+    one_to_many = haversine_distances(lat, lon, lats, lons)
+    many_to_one = haversine_distances(lats, lons, lat, lon)
+    pairs = haversine_distances(lats, lons, other_lats, other_lons)
+
+    assert list(one_to_many) == [haversine_distance(lat, lon, a, b) for a, b in zip(lats, lons)]
+    assert list(many_to_one) == [haversine_distance(a, b, lat, lon) for a, b in zip(lats, lons)]
+    assert list(pairs) == [
+        haversine_distance(*args) for args in zip(lats, lons, other_lats, other_lons)
+    ]
+    if count >= geo.NUMPY_MIN_POINTS:
+        assert isinstance(one_to_many, np.ndarray)
+
+
+def test_pure_python_fallback(monkeypatch):
+    lats, lons = random_points(1000)
+    with_numpy = list(haversine_distances(*CENTER, lats, lons))
+
+    monkeypatch.setattr(geo, "np", None)
+    without_numpy = haversine_distances(*CENTER, lats, lons)
+
+    assert isinstance(without_numpy, list)
+    assert without_numpy == with_numpy
+
+
+def test_rounding_matches_at_half_meters():
+    # Distances around every half meter, where the rounding of both paths is tested
+    lat, lon = CENTER
+    lats = [lat + meters / geo.METERS_PER_DEGREE for meters in np.arange(0.5, 200.5, 0.5)]
+    lons = [lon] * len(lats)
+
+    assert list(haversine_distances(lat, lon, lats, lons)) == [
+        haversine_distance(lat, lon, a, b) for a, b in zip(lats, lons)
+    ]
+
+
+def test_grid_matches_brute_force():
+    lats, lons = random_points(3000, spread=0.2)
+    grid = GeoGrid()
+    for n, (lat, lon) in enumerate(zip(lats, lons)):
+        grid.add(lat, lon, n)
+
+    for radius in (100, 1500, 8000):
+        found = grid.within(*CENTER, radius)
+        expected = sorted(
+            (distance, n)
+            for n, (lat, lon) in enumerate(zip(lats, lons))
+            if (distance := haversine_distance(*CENTER, lat, lon)) <= radius
+        )
+        assert sorted(found) == expected
+        assert [distance for distance, _ in found] == sorted(distance for distance, _ in found)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("count", [10_000, 1_000_000])
+def test_benchmark_batch_against_scalar_loop(count):
+    lats, lons = random_points(count)
+    lat, lon = CENTER
+
+    start = time.perf_counter()
+    scalar = [haversine_distance(lat, lon, a, b) for a, b in zip(lats, lons)]
+    scalar_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    batch = haversine_distances(lat, lon, lats, lons)
+    batch_ms = (time.perf_counter() - start) * 1000
+
+    lat_array, lon_array = np.asarray(lats), np.asarray(lons)
+    start = time.perf_counter()
+    haversine_distances(lat, lon, lat_array, lon_array)
+    array_ms = (time.perf_counter() - start) * 1000
+
+    print(
+        f"\nhaversine {count:,} points: scalar loop {scalar_ms:.1f} ms, "
+        f"batch from lists {batch_ms:.1f} ms ({scalar_ms / batch_ms:.0f}x), "
+        f"batch from arrays {array_ms:.1f} ms ({scalar_ms / array_ms:.0f}x)"
+    )
+    assert list(batch) == scalar
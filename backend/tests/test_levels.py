@@ -0,0 +1,154 @@
+"""Level progression table against the original per-call level math"""
+
+import json
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.levels import DEFAULT_LEVELS, LevelTable, get_level_table, load_level_table
+from app.models.user import User
+from app.schemas.user import UserProfileResponse
+
+
+# What User and UserProfileResponse computed on every call before the table
+def old_calculate_level(experience: int) -> int:
+    level_thresholds = [0, 100, 300, 600, 1000, 1500, 2100, 2800, 3600, 4500]
+    for i, threshold in enumerate(level_thresholds):
+        if experience < threshold:
+            return i
+    return 10
+
+
+def old_level_bonus(level: int) -> float:
+    bonuses = {
+        1: 0, 2: 0.05, 3: 0.10, 4: 0.15, 5: 0.20,
+        6: 0.25, 7: 0.30, 8: 0.35, 9: 0.40, 10: 0.50
+    }
+    return bonuses.get(level, 0)
+
+
+def old_profile(user: User) -> dict:
+    level_names = {
+        1: "Новачок", 2: "Кавоман", 3: "Бариста-учень", 4: "Бариста", 5: "Старший бариста",
+        6: "Майстер", 7: "Експерт", 8: "Гуру кави", 9: "Легенда", 10: "Coffee King",
+    }
+    level_thresholds = [0, 100, 300, 600, 1000, 1500, 2100, 2800, 3600, 4500]
+    next_level_xp = level_thresholds[min(user.level, 9)]
+    return {
+        "level_name": level_names.get(user.level, "Новачок"),
+        "level_bonus": old_level_bonus(user.level),
+        "next_level_xp": next_level_xp,
+        "xp_to_next_level": max(0, next_level_xp - user.experience),
+    }
+
+
+def make_user(experience: int, level: int | None = None) -> User:
+    return User(
+        id=1,
+        telegram_id=100,
+        first_name="Olena",
+        points=10,
+        experience=experience,
+        level=old_calculate_level(experience) if level is None else level,
+        total_checkins=0,
+        total_games_played=0,
+        best_game_score=0,
+        referral_code="REF1",
+        created_at=datetime(2026, 1, 1),
+        notifications_enabled=True,
+        language_code="uk",
+    )
+
+
+BOUNDARIES = sorted({
+    value
+    for threshold in (level["min_experience"] for level in DEFAULT_LEVELS)
+    for value in (threshold - 1, threshold, threshold + 1)
+} | {-1, 10_000, 10**9})
+
+
+@pytest.mark.parametrize("experience", BOUNDARIES)
+def test_level_matches_old_thresholds(experience):
+    assert get_level_table().level_for(experience) == old_calculate_level(experience)
+    assert make_user(experience).calculate_level() == old_calculate_level(experience)
+
+
+@pytest.mark.parametrize("level", range(0, 12))
+def test_profile_fields_match_old_tables(level):
+    user = make_user(experience=1200, level=level)
+    profile = UserProfileResponse.from_user(user)
+
+    expected = old_profile(user)
+    if level > 10:
+        # The old name table fell back to the first level past Coffee King
+        expected["level_name"] = "Coffee King"
+    assert profile.model_dump(include=set(expected)) == expected
+    assert user.get_level_bonus() == old_level_bonus(level)
+
+
+def test_configured_table_extends_past_ten(tmp_path):
+    levels = DEFAULT_LEVELS + [{"min_experience": 6000, "name": "Кавовий магнат", "bonus": 0.6}]
+    path = tmp_path / "levels.json"
+    path.write_text(json.dumps(levels, ensure_ascii=False), encoding="utf-8")
+
+    table = load_level_table(str(path))
+
+    assert table.max_level == 11
+    assert [table.level_for(xp) for xp in (4499, 4500, 5999, 6000, 10**9)] == [9, 10, 10, 11, 11]
+    assert table.next_level_xp(10) == 6000
+    assert table.next_level_xp(11) == 6000
+    assert table.get(11).name == "Кавовий магнат"
+    assert table.bonus(11) == 0.6
+    assert table.bonus(12) == 0
+
+
+@pytest.mark.parametrize("levels", [
+    [],
+    [{"min_experience": 0, "name": "A"}, {"min_experience": 0, "name": "B"}],
+    [{"min_experience": 100, "name": "A"}, {"min_experience": 50, "name": "B"}],
+])
+def test_invalid_tables_are_rejected(levels):
+    with pytest.raises(ValueError):
+        LevelTable(levels)
+
+
+@pytest.mark.benchmark
+def test_benchmark_profile_serialization():
+    # Plain attributes, so the level math is not hidden by ORM attribute access
+    users = [
+        SimpleNamespace(experience=experience, level=old_calculate_level(experience))
+        for experience in range(0, 5000, 5)
+    ]
+    rounds = 20
+
+    def per_profile_us(serialize) -> float:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for user in users:
+                serialize(user)
+        return (time.perf_counter() - start) / (rounds * len(users)) * 1_000_000
+
+    def level_math_before(user) -> dict:
+        old_calculate_level(user.experience)
+        return old_profile(user)
+
+    def level_math_after(user) -> tuple:
+        levels = get_level_table()
+        levels.level_for(user.experience)
+        return levels.get(user.level).name, levels.bonus(user.level), levels.next_level_xp(user.level)
+
+    before_us = per_profile_us(level_math_before)
+    after_us = per_profile_us(level_math_after)
+    profiles = [make_user(experience) for experience in range(0, 5000, 5)]
+    start = time.perf_counter()
+    for user in profiles:
+        UserProfileResponse.from_user(user).model_dump_json()
+    profile_us = (time.perf_counter() - start) / len(profiles) * 1_000_000
+
+    print(
+        f"\nlevel math per profile: rebuilt tables {before_us:.2f} us, precomputed table {after_us:.2f} us; "
+        f"full profile serialization {profile_us:.1f} us"
+    )
+    assert after_us < before_us
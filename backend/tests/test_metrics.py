@@ -0,0 +1,71 @@
+"""Metrics endpoint and per-request database instrumentation"""
+
+import pytest
+
+from app.core.config import settings
+from app.services.game_service import GameService
+from tests.conftest import request_queries
+from tests.factories import create_game, create_user
+
+TOKEN = "scrape-token"
+
+
+@pytest.fixture
+def metrics_token(monkeypatch) -> str:
+    monkeypatch.setattr(settings, "METRICS_TOKEN", TOKEN)
+    return TOKEN
+
+
+async def test_metrics_disabled_without_token(client):
+    response = await client.get("/metrics", headers={"Authorization": "Bearer "})
+    assert response.status_code == 404
+
+
+async def test_metrics_require_token(client, metrics_token):
+    assert (await client.get("/metrics")).status_code == 404
+    wrong = await client.get("/metrics", headers={"Authorization": "Bearer nope"})
+    assert wrong.status_code == 404
+
+    response = await client.get("/metrics", headers={"Authorization": f"Bearer {metrics_token}"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_requests_total{method="GET",route="/metrics",status="404"}' in response.text
+
+
+async def test_catalog_queries_are_recorded_per_route(db, client):
+    await create_game(db)
+    await create_game(db, slug="coffee-match")
+    await db.commit()
+    before = request_queries("GET", "/api/v1/games")
+
+    response = await client.get("/api/v1/games")
+    assert response.status_code == 200
+    assert len(response.json()["games"]) == 2
+    assert request_queries("GET", "/api/v1/games") - before == 1
+
+    # Served from the response cache
+    await client.get("/api/v1/games")
+    assert request_queries("GET", "/api/v1/games") - before == 1
+
+
+async def test_leaderboard_queries_do_not_grow_with_page_size(db, client):
+    game = await create_game(db)
+    service = GameService(db)
+
+    async def add_players(count: int):
+        for _ in range(count):
+            user = await create_user(db)
+            session = await service.start_session(user, game)
+            await service.end_session(session, user, 100, 60)
+        await db.commit()
+
+    async def page_queries(entries: int) -> int:
+        before = request_queries("GET", "/api/v1/leaderboard")
+        response = await client.get("/api/v1/leaderboard", params={"period": "weekly", "limit": 50})
+        assert len(response.json()["entries"]) == entries
+        return request_queries("GET", "/api/v1/leaderboard") - before
+
+    await add_players(2)
+    small = await page_queries(2)
+    await add_players(18)
+    assert await page_queries(20) == small
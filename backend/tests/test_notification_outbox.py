@@ -0,0 +1,160 @@
+"""Notification outbox - leases, retries and concurrent workers"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+from telegram.error import Forbidden
+
+from app.bot.dispatcher import FakeBot, NotificationDispatcher, OutgoingMessage
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.jobs import run_notification_worker
+from app.models.notification import Notification
+from app.services.notification_outbox import NotificationOutbox
+from tests.factories import create_user
+
+
+def unlimited(bot) -> NotificationDispatcher:
+    return NotificationDispatcher(bot, concurrency=4, global_rate=10_000, per_chat_rate=10_000)
+
+
+async def enqueue(db, count: int = 1) -> list[Notification]:
+    outbox = NotificationOutbox(db)
+    notifications = []
+    for _ in range(count):
+        user = await create_user(db)
+        notifications.append(
+            outbox.enqueue(user.id, "test", "Test", OutgoingMessage(chat_id=user.telegram_id, text="Hi"))
+        )
+    await db.commit()
+    return notifications
+
+
+async def stored(db) -> list[Notification]:
+    db.expire_all()
+    return list((await db.scalars(select(Notification).order_by(Notification.created_at))).all())
+
+
+async def test_batch_is_sent_without_holding_rows(db):
+    await enqueue(db, 3)
+    locked_during_send = []
+
+    class CheckingBot(FakeBot):
+        async def send_message(self, chat_id: int, text: str, **kwargs) -> None:
+            async with AsyncSessionLocal() as other:
+                # NOWAIT raises if a claim still holds the row lock
+                rows = await other.execute(
+                    select(Notification.id)
+                    .where(Notification.sent_at.is_(None))
+                    .with_for_update(nowait=True)
+                )
+                locked_during_send.append(len(rows.all()))
+                # Leased rows are not claimed again
+                _, claimed = await NotificationOutbox(other).claim(10)
+                assert claimed == []
+            await super().send_message(chat_id, text, **kwargs)
+
+    bot = CheckingBot()
+    # One sender, so the checks don't lock rows against each other
+    dispatcher = NotificationDispatcher(bot, concurrency=1, global_rate=10_000, per_chat_rate=10_000)
+    assert await NotificationOutbox(db).deliver_batch(dispatcher, 10) == 3
+
+    assert len(bot.sent) == 3
+    assert locked_during_send == [3, 3, 3]
+    for notification in await stored(db):
+        assert notification.delivered and notification.sent_at is not None
+        assert (notification.attempts, notification.leased_until) == (1, None)
+    assert await NotificationOutbox(db).deliver_batch(unlimited(bot), 10) == 0
+
+
+async def test_failed_rows_back_off_until_max_attempts(db, monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFICATION_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(settings, "NOTIFICATION_RETRY_BACKOFF_SECONDS", 60)
+    await enqueue(db)
+
+    class BlockedBot(FakeBot):
+        async def send_message(self, chat_id: int, text: str, **kwargs) -> None:
+            self.calls += 1
+            raise Forbidden("bot was blocked by the user")
+
+    bot = BlockedBot()
+    outbox = NotificationOutbox(db)
+    delays = []
+    for attempt in range(1, 4):
+        before = datetime.utcnow()
+        assert await outbox.deliver_batch(unlimited(bot), 10) == 1
+        # Not due again until its backoff has passed
+        assert await outbox.deliver_batch(unlimited(bot), 10) == 0
+        [notification] = await stored(db)
+        assert notification.attempts == attempt
+        if notification.next_attempt_at:
+            delays.append(round((notification.next_attempt_at - before).total_seconds() / 60))
+            await db.execute(update(Notification).values(next_attempt_at=datetime.utcnow()))
+            await db.commit()
+
+    assert delays == [1, 2]
+    assert bot.calls == 3
+    assert notification.sent_at is not None and not notification.delivered
+    assert await outbox.deliver_batch(unlimited(bot), 10) == 0
+
+
+async def test_expired_lease_is_claimed_again(db, monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFICATION_MAX_ATTEMPTS", 2)
+    await enqueue(db, 2)
+    outbox = NotificationOutbox(db)
+
+    # A worker claims and dies before recording anything
+    stale_lease, stale = await outbox.claim(10)
+    assert len(stale) == 2
+    await db.execute(update(Notification).values(leased_until=datetime.utcnow() - timedelta(seconds=1)))
+    await db.commit()
+
+    bot = FakeBot()
+    assert await outbox.deliver_batch(unlimited(bot), 10) == 2
+    assert len(bot.sent) == 2
+
+    # The late outcome of the dead claim does not overwrite the new one
+    assert await outbox.record(stale_lease, stale, []) == 0
+    assert all(n.delivered and n.attempts == 2 for n in await stored(db))
+
+
+async def test_exhausted_lease_is_given_up(db, monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFICATION_MAX_ATTEMPTS", 1)
+    await enqueue(db)
+    outbox = NotificationOutbox(db)
+
+    await outbox.claim(10)
+    await db.execute(update(Notification).values(leased_until=datetime.utcnow() - timedelta(seconds=1)))
+    await db.commit()
+
+    _, claimed = await outbox.claim(10)
+    assert claimed == []
+    [notification] = await stored(db)
+    assert notification.sent_at is not None and not notification.delivered
+
+
+async def test_workers_share_the_queue(db, monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFICATION_POLL_INTERVAL_SECONDS", 0.02)
+    monkeypatch.setattr(settings, "NOTIFICATION_CLAIM_SIZE", 5)
+    await enqueue(db, 30)
+    bots = [FakeBot(latency=0.005) for _ in range(3)]
+
+    def sent() -> list[int]:
+        return [message["chat_id"] for bot in bots for message in bot.sent]
+
+    workers = [asyncio.create_task(run_notification_worker(bot)) for bot in bots]
+    for _ in range(200):
+        if len(sent()) >= 30:
+            break
+        await asyncio.sleep(0.02)
+    # Give a duplicate send the chance to show up
+    await asyncio.sleep(0.1)
+    for worker in workers:
+        worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+
+    # Every worker sent, and leases kept each notification to one send
+    assert all(bot.sent for bot in bots)
+    assert len(sent()) == len(set(sent())) == 30
+    assert all(n.delivered and n.attempts == 1 for n in await stored(db))
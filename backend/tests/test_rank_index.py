@@ -0,0 +1,208 @@
+"""Rank index - skiplist against a sorted-list oracle, and game-end syncing"""
+
+import random
+from datetime import date
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import select
+
+from app.models.leaderboard import Leaderboard
+from app.services.game_service import GameService
+from app.services.leaderboard_service import LeaderboardService, get_period_date
+from app.services.rank_index import MemoryRankIndex, SkipList, get_rank_index, leaderboard_key
+from tests.conftest import commit
+from tests.factories import create_game, create_user
+
+KEY = leaderboard_key(None, "all_time", date(2000, 1, 1))
+
+
+def oracle_order(scores: dict[int, int]) -> list[tuple[int, int]]:
+    """Members by score descending, then member ascending"""
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+def assert_matches(board: SkipList, scores: dict[int, int]):
+    ordered = oracle_order(scores)
+    assert board.length == len(scores)
+    assert board.scores == scores
+    assert board.top(len(scores) + 5) == ordered
+    assert board.top(3) == ordered[:3]
+    for score in {s for s in scores.values()} | {-1, 0, 10**6}:
+        assert board.count_above(score) == sum(1 for s in scores.values() if s > score)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_skiplist_matches_sorted_list(seed):
+    rng = random.Random(seed)
+    random.seed(seed)
+    board = SkipList()
+    scores: dict[int, int] = {}
+
+    for step in range(3000):
+        member = rng.randrange(300)
+        if rng.random() < 0.2:
+            board.delete(member)
+            scores.pop(member, None)
+        else:
+            # Few distinct scores, so ties are common
+            score = rng.randrange(50)
+            board.insert(member, score)
+            scores[member] = score
+        if step % 250 == 0:
+            assert_matches(board, scores)
+
+    assert_matches(board, scores)
+
+
+def test_skiplist_delete_everything():
+    board = SkipList()
+    for member in range(100):
+        board.insert(member, member % 7)
+    for member in range(100):
+        board.delete(member)
+    assert board.length == 0
+    assert board.level == 1
+    assert board.top(10) == []
+    assert board.count_above(-1) == 0
+
+
+async def test_rank_is_competition_rank():
+    index = MemoryRankIndex()
+    for user_id, score in {1: 50, 2: 50, 3: 40, 4: 10}.items():
+        await index.update(KEY, user_id, score)
+
+    assert [await index.rank(KEY, user_id) for user_id in (1, 2, 3, 4)] == [1, 1, 3, 4]
+    assert await index.rank(KEY, 99) is None
+    assert await index.count_above_many(KEY, {50, 40, 0}) == {50: 0, 40: 2, 0: 4}
+
+
+async def test_merge_keeps_higher_scores():
+    index = MemoryRankIndex()
+    await index.update(KEY, 1, 30)
+    await index.update(KEY, 2, 5)
+
+    # Loaded totals older than a live update must not lower it
+    await index.merge(KEY, {1: 20, 2: 10, 3: 7})
+
+    assert await index.top(KEY, 10) == [(1, 30), (2, 10), (3, 7)]
+
+
+async def test_end_session_syncs_index_on_commit_only(db):
+    user = await create_user(db)
+    other = await create_user(db)
+    game = await create_game(db)
+    await db.commit()
+    rank_index = get_rank_index()
+    weekly = leaderboard_key(game.id, "weekly", get_period_date("weekly"))
+    await rank_index.update(weekly, other.id, 100)
+
+    service = GameService(db)
+    session = await service.start_session(user, game)
+    _, _, positions = await service.end_session(session, user, 150, 60)
+    assert positions == {"daily": 1, "weekly": 1, "all_time": 1}
+
+    # Not committed yet: the index has not seen the new score
+    assert await rank_index.score(weekly, user.id) is None
+    await db.rollback()
+    assert db.info.pop("on_commit", None)
+    await db.refresh(user)
+    await db.refresh(game)
+    assert await rank_index.score(weekly, user.id) is None
+
+    session = await service.start_session(user, game)
+    _, _, positions = await service.end_session(session, user, 50, 60)
+    assert positions["weekly"] == 2
+    await commit(db)
+    assert await rank_index.rank(weekly, user.id) == 2
+
+
+async def test_rebuild_loads_current_periods(db):
+    users = [await create_user(db) for _ in range(3)]
+    game = await create_game(db)
+    service = GameService(db)
+    for user, score in zip(users, (30, 90, 60)):
+        session = await service.start_session(user, game)
+        await service.end_session(session, user, score, 60)
+    await db.commit()
+    db.info.pop("on_commit", None)
+
+    rank_index = MemoryRankIndex()
+    boards = await rank_index.rebuild(db)
+
+    keys = (await db.execute(
+        select(Leaderboard.game_id, Leaderboard.period_type, Leaderboard.period_date).distinct()
+    )).all()
+    assert boards == len(keys) == 8
+    weekly = leaderboard_key(None, "weekly", get_period_date("weekly"))
+    assert await rank_index.top(weekly, 3) == [(users[1].id, 90), (users[2].id, 60), (users[0].id, 30)]
+
+
+async def test_memory_index_drops_past_periods():
+    index = MemoryRankIndex()
+    monday, next_monday = date(2026, 10, 12), date(2026, 10, 19)
+    await index.update(leaderboard_key(None, "weekly", monday), 1, 10)
+    await index.update(leaderboard_key(None, "daily", monday), 1, 10)
+    await index.update(leaderboard_key(None, "all_time", date(2000, 1, 1)), 1, 10)
+
+    await index.merge(leaderboard_key(None, "weekly", next_monday), {1: 5})
+    await index.update(leaderboard_key(3, "weekly", next_monday), 1, 5)
+
+    assert set(index.boards) == {
+        leaderboard_key(None, "daily", monday),
+        leaderboard_key(None, "all_time", date(2000, 1, 1)),
+        leaderboard_key(None, "weekly", next_monday),
+        leaderboard_key(3, "weekly", next_monday),
+    }
+
+
+async def play(db, users_scores, game) -> None:
+    service = GameService(db)
+    for user, score in users_scores:
+        session = await service.start_session(user, game)
+        await service.end_session(session, user, score, 60)
+    await commit(db)
+
+
+async def test_leaderboard_ranks_without_indexed_board(db, client):
+    users = [await create_user(db) for _ in range(4)]
+    game = await create_game(db)
+    await play(db, zip(users, (30, 90, 60, 60)), game)
+    # As before the startup rebuild, or after the board's key was evicted
+    get_rank_index.cache_clear()
+
+    response = await client.get("/api/v1/leaderboard", params={"period": "weekly", "game_id": game.id})
+    ranks = [(entry["user_id"], entry["rank"]) for entry in response.json()["entries"]]
+    assert ranks == [(users[1].id, 1), (users[3].id, 2), (users[2].id, 2), (users[0].id, 4)]
+
+    # Reloaded after the request
+    weekly = leaderboard_key(game.id, "weekly", get_period_date("weekly"))
+    assert await get_rank_index().size(weekly) == 4
+
+
+class UnreachableRankIndex(MemoryRankIndex):
+    """Rank index whose Redis is down"""
+
+    async def _fail(self, *args, **kwargs):
+        raise RedisConnectionError("Connection refused")
+
+    update = count_above = count_above_many = scores_many = _fail
+
+
+async def test_unreachable_index_does_not_block_game_end(db):
+    users = [await create_user(db) for _ in range(2)]
+    game = await create_game(db)
+    await play(db, [(users[0], 100)], game)
+
+    service = GameService(db, rank_index=UnreachableRankIndex())
+    session = await service.start_session(users[1], game)
+    _, _, positions = await service.end_session(session, users[1], 50, 60)
+    # The failing sync runs after commit and is only logged
+    await commit(db)
+
+    assert positions == {"daily": 2, "weekly": 2, "all_time": 2}
+    leaderboard = await LeaderboardService(db, rank_index=UnreachableRankIndex()).get_leaderboard(
+        period_type="all_time", game_id=game.id, user_id=users[1].id
+    )
+    assert [entry.rank for entry in leaderboard.entries] == [1, 2]
+    assert leaderboard.my_position == 2
@@ -0,0 +1,155 @@
+"""Auth - memoized JWT verification and Telegram initData validation"""
+
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+import pytest
+from jose import jwt
+
+from app.core import security
+from app.core.config import settings
+from app.core.security import (
+    create_access_token,
+    decode_access_token,
+    get_telegram_secret_key,
+    validate_telegram_init_data,
+)
+
+BOT_TOKEN = "123456:test-token"
+
+
+@pytest.fixture(autouse=True)
+def empty_token_cache():
+    security._verified_tokens.clear()
+    yield
+    security._verified_tokens.clear()
+
+
+@pytest.fixture
+def decode_calls(monkeypatch) -> list[str]:
+    """Tokens passed to jose's signature verification"""
+    calls = []
+    decode = jwt.decode
+
+    def counting_decode(token, *args, **kwargs):
+        calls.append(token)
+        return decode(token, *args, **kwargs)
+
+    monkeypatch.setattr(security.jwt, "decode", counting_decode)
+    return calls
+
+
+def make_init_data(bot_token: str = BOT_TOKEN, auth_date: int | None = None) -> str:
+    fields = {
+        "auth_date": str(auth_date or int(time.time())),
+        "query_id": "AAF",
+        "user": json.dumps({"id": 42, "first_name": "Olena"}),
+    }
+    data_check_string = "\n".join(f"{key}={value}" for key, value in sorted(fields.items()))
+    secret_key = hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+    fields["hash"] = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return urlencode(fields)
+
+
+def test_verified_token_is_memoized(decode_calls):
+    token = create_access_token(1, 100)
+
+    first = decode_access_token(token)
+    second = decode_access_token(token)
+
+    assert (first.user_id, first.telegram_id) == (1, 100)
+    assert second == first
+    assert len(decode_calls) == 1
+
+
+def test_memoized_token_expires(decode_calls):
+    token = create_access_token(1, 100)
+    decode_access_token(token)
+    digest = hashlib.sha256(token.encode()).digest()
+    security._verified_tokens[digest] = security._verified_tokens[digest].model_copy(
+        update={"exp": datetime.utcnow() - timedelta(seconds=1)}
+    )
+
+    # Verified again rather than served past its exp
+    assert decode_access_token(token) is not None
+    assert len(decode_calls) == 2
+
+
+def test_invalid_token_is_not_memoized(decode_calls):
+    token = create_access_token(1, 100)[:-2] + "xx"
+
+    assert decode_access_token(token) is None
+    assert decode_access_token(token) is None
+    assert len(decode_calls) == 2
+    assert not security._verified_tokens
+
+
+def test_token_cache_is_bounded(monkeypatch, decode_calls):
+    monkeypatch.setattr(settings, "JWT_CACHE_MAXSIZE", 2)
+    tokens = [create_access_token(user_id, 100 + user_id) for user_id in range(3)]
+    for token in tokens:
+        decode_access_token(token)
+
+    assert len(security._verified_tokens) == 2
+    # The least recently used token was evicted and is verified again
+    decode_access_token(tokens[0])
+    assert decode_calls == tokens + [tokens[0]]
+
+
+def test_init_data_secret_is_derived_once(monkeypatch):
+    monkeypatch.setattr(settings, "TELEGRAM_BOT_TOKEN", BOT_TOKEN)
+    get_telegram_secret_key.cache_clear()
+
+    for _ in range(3):
+        assert validate_telegram_init_data(make_init_data()) == {"id": 42, "first_name": "Olena"}
+
+    assert get_telegram_secret_key.cache_info().misses == 1
+
+
+def test_init_data_is_checked(monkeypatch):
+    monkeypatch.setattr(settings, "TELEGRAM_BOT_TOKEN", BOT_TOKEN)
+
+    with pytest.raises(ValueError, match="Invalid hash"):
+        validate_telegram_init_data(make_init_data(bot_token="654321:other-token"))
+    with pytest.raises(ValueError, match="too old"):
+        validate_telegram_init_data(make_init_data(auth_date=int(time.time()) - 2 * 86400))
+
+
+@pytest.mark.benchmark
+def test_benchmark_auth_overhead(monkeypatch):
+    monkeypatch.setattr(settings, "TELEGRAM_BOT_TOKEN", BOT_TOKEN)
+    token = create_access_token(1, 100)
+    init_data = make_init_data()
+    rounds = 20000
+
+    def per_call_us(call) -> float:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            call()
+        return (time.perf_counter() - start) / rounds * 1_000_000
+
+    def verify_token():
+        # What every authenticated request did before
+        jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+
+    def validate_uncached():
+        get_telegram_secret_key.cache_clear()
+        validate_telegram_init_data(init_data)
+
+    decode_access_token(token)
+    validate_telegram_init_data(init_data)
+    verify_us = per_call_us(verify_token)
+    memoized_us = per_call_us(lambda: decode_access_token(token))
+    login_before_us = per_call_us(validate_uncached)
+    validate_telegram_init_data(init_data)
+    login_after_us = per_call_us(lambda: validate_telegram_init_data(init_data))
+
+    print(
+        f"\nrequest auth: jose verify {verify_us:.1f} us, memoized {memoized_us:.1f} us; "
+        f"initData login: derived secret {login_before_us:.1f} us, cached secret {login_after_us:.1f} us"
+    )
+    assert memoized_us < verify_us
@@ -0,0 +1,64 @@
+"""Identity cache - generations keep raced loads from being served"""
+
+from datetime import datetime
+
+import pytest
+
+from app.core.cache import MemoryCacheBackend
+from app.models.user import User
+from app.services.user_cache import UserCache
+
+
+def make_user(**values) -> User:
+    values = {"id": 1, "telegram_id": 100, "first_name": "Olena", "level": 1, **values}
+    return User(**values)
+
+
+@pytest.fixture
+def user_cache() -> UserCache:
+    return UserCache(MemoryCacheBackend(), ttl=30)
+
+
+async def test_round_trip(user_cache):
+    created_at = datetime(2026, 10, 17, 9, 30)
+    _, generation = await user_cache.get(1)
+    await user_cache.set(make_user(created_at=created_at), generation)
+
+    user, _ = await user_cache.get(1)
+
+    assert (user.id, user.first_name, user.created_at) == (1, "Olena", created_at)
+
+
+async def test_invalidate_hides_entry(user_cache):
+    _, generation = await user_cache.get(1)
+    await user_cache.set(make_user(), generation)
+
+    await user_cache.invalidate(1)
+
+    user, _ = await user_cache.get(1)
+    assert user is None
+
+
+async def test_load_racing_with_invalidation_is_not_served(user_cache):
+    # A reader misses and loads the old row...
+    _, generation = await user_cache.get(1)
+    stale = make_user(level=1)
+    # ...while a writer commits and invalidates, before the reader stores it
+    await user_cache.invalidate(1)
+    await user_cache.set(stale, generation)
+
+    user, generation = await user_cache.get(1)
+    assert user is None
+
+    await user_cache.set(make_user(level=2), generation)
+    user, _ = await user_cache.get(1)
+    assert user.level == 2
+
+
+async def test_generation_read_before_loading(user_cache):
+    generation = await user_cache.generation(1)
+    await user_cache.invalidate(1)
+    await user_cache.set(make_user(), generation)
+
+    user, _ = await user_cache.get(1)
+    assert user is None
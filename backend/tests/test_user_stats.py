@@ -0,0 +1,69 @@
+"""User stat deltas - concurrent updates and level ups"""
+
+import asyncio
+
+from sqlalchemy import func, select
+
+from app.core.levels import get_level_table
+from app.db.session import AsyncSessionLocal
+from app.models.notification import Notification
+from app.models.user import User
+from app.services.user_service import UserService
+from tests.factories import create_user
+
+
+async def test_concurrent_stat_updates_are_not_lost(db):
+    user = await create_user(db, notifications_enabled=False)
+    await db.commit()
+    user_id = user.id
+    rounds = 20
+
+    async def end_game(score: int):
+        async with AsyncSessionLocal() as session:
+            # Every request loads the user before any of them commits
+            player = await session.get(User, user_id)
+            await asyncio.sleep(0.05)
+            await UserService(session).apply_stats(
+                player, points=5, experience=60, games_played=1, game_score=score
+            )
+            await asyncio.sleep(0.05)
+            await session.commit()
+
+    await asyncio.gather(*(end_game(score) for score in range(rounds)))
+
+    db.expire_all()
+    stored = await db.get(User, user_id)
+    assert stored.points == 5 * rounds
+    assert stored.experience == 60 * rounds
+    assert stored.total_games_played == rounds
+    assert stored.best_game_score == rounds - 1
+    assert stored.level == get_level_table().level_for(60 * rounds)
+
+
+async def test_apply_stats_refreshes_loaded_user(db):
+    user = await create_user(db, experience=90)
+    service = UserService(db)
+
+    await service.apply_stats(user, points=3, experience=20, checkins=1)
+
+    # Copied from the returned row; unrelated attributes stay loaded
+    assert (user.points, user.experience, user.total_checkins, user.level) == (3, 110, 1, 2)
+    assert user.first_name.startswith("User")
+    assert user not in db.dirty
+
+
+async def test_level_never_drops_and_level_up_is_queued(db):
+    user = await create_user(db, experience=50, level=4)
+    service = UserService(db)
+
+    await service.apply_stats(user, experience=10)
+    assert user.level == 4
+    await db.flush()
+    assert await db.scalar(select(func.count(Notification.id))) == 0
+
+    await service.apply_stats(user, experience=940)
+    assert user.level == get_level_table().level_for(1000) == 5
+    await db.flush()
+    assert await db.scalar(
+        select(func.count(Notification.id)).where(Notification.type == "level_up")
+    ) == 1
@@ -0,0 +1,177 @@
+"""Telegram webhook - secret check, backlog limit and throughput against a fake Bot API"""
+
+import asyncio
+import json
+import time
+from itertools import count
+
+import pytest
+from telegram.request import BaseRequest, RequestData
+
+from app.bot import webhook
+from app.bot.webhook import BOT_UPDATES, WebhookApplication, create_webhook_application
+from app.core.config import settings
+
+WEBHOOK = "/api/v1/webhooks/telegram"
+SECRET = "webhook-secret"
+
+_update_ids = count(1)
+
+
+class FakeBotAPI(BaseRequest):
+    """Bot API answered in process, recording sent messages after a latency"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.sent: list[dict] = []
+
+    @property
+    def read_timeout(self) -> float:
+        return 5.0
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def do_request(self, url: str, method: str, request_data: RequestData | None = None, **timeouts):
+        endpoint = url.rsplit("/", 1)[-1]
+        parameters = request_data.parameters if request_data else {}
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if endpoint == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "PerkUP", "username": "perkup_test_bot"}
+        elif endpoint == "sendMessage":
+            self.sent.append(parameters)
+            result = {
+                "message_id": len(self.sent),
+                "date": int(time.time()),
+                "chat": {"id": parameters["chat_id"], "type": "private"},
+                "text": parameters["text"],
+            }
+        else:
+            result = True
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+
+def command(text: str, chat_id: int = 42) -> dict:
+    """Update carrying a private chat command"""
+    return {
+        "update_id": next(_update_ids),
+        "message": {
+            "message_id": 1,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Olena"},
+            "text": text,
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(text)}],
+        },
+    }
+
+
+async def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+async def start_bot(monkeypatch):
+    """Start a webhook application on a fake Bot API, as the API lifespan does"""
+    monkeypatch.setattr(settings, "TELEGRAM_BOT_TOKEN", "123456:test-token")
+    monkeypatch.setattr(settings, "TELEGRAM_WEBHOOK_SECRET", SECRET)
+
+    async def start(latency: float = 0.0) -> FakeBotAPI:
+        api = FakeBotAPI(latency)
+        application = create_webhook_application(api)
+        await application.initialize()
+        await application.start()
+        webhook._application = application
+        return api
+
+    yield start
+    await webhook.stop_webhook_bot()
+
+
+def post(client, update: dict, secret: str = SECRET):
+    return client.post(WEBHOOK, json=update, headers={"X-Telegram-Bot-Api-Secret-Token": secret})
+
+
+async def test_webhook_disabled(client):
+    response = await post(client, command("/help"))
+    assert response.status_code == 404
+
+
+async def test_wrong_secret_is_rejected(client, start_bot):
+    api = await start_bot()
+    unauthorized = BOT_UPDATES.values.get(("unauthorized",), 0)
+
+    for secret in ("", "wrong"):
+        response = await post(client, command("/help"), secret)
+        assert response.status_code == 401
+        assert response.json()["detail"]["error_code"] == "invalid_secret"
+
+    assert BOT_UPDATES.values[("unauthorized",)] == unauthorized + 2
+    assert WebhookApplication.pending == 0
+    await asyncio.sleep(0.05)
+    assert api.sent == []
+
+
+async def test_update_is_answered_in_background(client, start_bot):
+    api = await start_bot(latency=0.05)
+
+    start = time.monotonic()
+    response = await post(client, command("/help", chat_id=7))
+    # Telegram gets its answer before the handler's reply is sent
+    assert response.status_code == 200 and response.json() == {"ok": True}
+    assert time.monotonic() - start < 0.05
+    assert WebhookApplication.pending == 1
+
+    await wait_for(lambda: WebhookApplication.pending == 0)
+    assert [message["chat_id"] for message in api.sent] == [7]
+
+
+async def test_full_backlog_answers_503(client, start_bot, monkeypatch):
+    monkeypatch.setattr(settings, "TELEGRAM_UPDATE_QUEUE_SIZE", 3)
+    monkeypatch.setattr(settings, "TELEGRAM_CONCURRENT_UPDATES", 1)
+    api = await start_bot(latency=0.1)
+
+    # Updates count as pending until their handler finishes, not only
+    # while queued
+    statuses = [(await post(client, command("/help", chat_id))).status_code for chat_id in range(5)]
+    assert statuses == [200, 200, 200, 503, 503]
+    assert WebhookApplication.pending == 3
+
+    # Telegram redelivers the rejected ones once the backlog drains
+    await wait_for(lambda: WebhookApplication.pending == 0)
+    assert (await post(client, command("/help", 3))).status_code == 200
+    await wait_for(lambda: len(api.sent) == 4)
+
+
+@pytest.mark.benchmark
+async def test_benchmark_webhook_throughput(client, start_bot, monkeypatch):
+    monkeypatch.setattr(settings, "TELEGRAM_UPDATE_QUEUE_SIZE", 10_000)
+    latency = 0.05
+    api = await start_bot(latency=latency)
+    updates = 2000
+
+    # Telegram keeps up to 100 connections open to a webhook
+    start = time.monotonic()
+    for first in range(0, updates, 100):
+        responses = await asyncio.gather(*(
+            post(client, command("/help", chat_id)) for chat_id in range(first, first + 100)
+        ))
+        assert {response.status_code for response in responses} == {200}
+    accepted = time.monotonic() - start
+    await wait_for(lambda: len(api.sent) == updates, timeout=60)
+    processed = time.monotonic() - start
+
+    print(
+        f"\nwebhook {updates:,} updates, {latency * 1000:.0f} ms Bot API latency, "
+        f"{settings.TELEGRAM_CONCURRENT_UPDATES} concurrent: accepted {updates / accepted:,.0f} updates/s, "
+        f"answered {updates / processed:,.0f} updates/s"
+    )
+    assert WebhookApplication.pending == 0
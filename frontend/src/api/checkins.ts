@@ -4,12 +4,13 @@ import type { Checkin, CheckinResult } from '../types';
 interface CheckinHistoryResponse {
   checkins: Checkin[];
   total: number;
-  page: number;
   per_page: number;
+  next_cursor: string | null;
 }
 
 export const checkinsApi = {
-  async create(locationId: number, latitude: number, longitude: number): Promise<CheckinResult> {
+  // Without locationId the server picks the closest location in range
+  async create(locationId: number | null, latitude: number, longitude: number): Promise<CheckinResult> {
     const response = await apiClient.post<CheckinResult>('/checkins', {
       location_id: locationId,
       latitude,
@@ -18,15 +19,35 @@ export const checkinsApi = {
     return response.data;
   },
 
-  async getHistory(page: number = 1, perPage: number = 20): Promise<CheckinHistoryResponse> {
+  async getHistory(cursor?: string, perPage: number = 20): Promise<CheckinHistoryResponse> {
     const response = await apiClient.get<CheckinHistoryResponse>('/checkins/history', {
-      params: { page, per_page: perPage },
+      params: { cursor, per_page: perPage },
     });
     return response.data;
   },
 
-  async canCheckin(locationId: number): Promise<{ can_checkin: boolean; reason: string | null }> {
+  async canCheckin(locationId: number): Promise<{
+    can_checkin: boolean;
+    reason: string | null;
+    cooldown_remaining_seconds: number;
+  }> {
     const response = await apiClient.get(`/checkins/can-checkin/${locationId}`);
     return response.data;
   },
+
+  // Eligibility for many locations in one call, all active ones by default
+  async canCheckinBatch(params: {
+    location_ids?: number[];
+    latitude?: number;
+    longitude?: number;
+  } = {}): Promise<Array<{
+    location_id: number;
+    can_checkin: boolean;
+    reason: string | null;
+    cooldown_remaining_seconds: number;
+    distance_meters: number | null;
+  }>> {
+    const response = await apiClient.post('/checkins/can-checkin:batch', params);
+    return response.data.locations;
+  },
 };
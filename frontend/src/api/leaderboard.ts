@@ -6,6 +6,9 @@ export const leaderboardApi = {
     period?: 'daily' | 'weekly' | 'monthly' | 'all_time';
     game_id?: number;
     limit?: number;
+    cursor?: string;
+    around?: 'me';
+    radius?: number;
   }): Promise<Leaderboard> {
     const response = await apiClient.get<Leaderboard>('/leaderboard', { params });
     return response.data;
@@ -1,5 +1,5 @@
 import apiClient from './client';
-import type { Location } from '../types';
+import type { Location, NearbyLocation } from '../types';
 
 interface LocationsResponse {
   locations: Location[];
@@ -12,6 +12,14 @@ export const locationsApi = {
     return response.data.locations;
   },
 
+  async getNearby(lat: number, lon: number, radius: number = 1000): Promise<NearbyLocation[]> {
+    const response = await apiClient.get<{ locations: NearbyLocation[]; total: number }>(
+      '/locations/nearby',
+      { params: { lat, lon, radius } }
+    );
+    return response.data.locations;
+  },
+
   async getBySlug(slug: string): Promise<Location> {
     const response = await apiClient.get<Location>(`/locations/${slug}`);
     return response.data;
@@ -1,2 +1,2 @@
 export { useTelegram } from './useTelegram';
-export { useGeolocation, calculateDistance } from './useGeolocation';
+export { useGeolocation } from './useGeolocation';
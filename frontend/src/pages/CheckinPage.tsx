@@ -1,19 +1,33 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useCallback } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { useAppStore, useAuthStore } from '../store';
-import { checkinsApi } from '../api';
-import { useGeolocation, calculateDistance, useTelegram } from '../hooks';
+import { checkinsApi, locationsApi } from '../api';
+import { useGeolocation, useTelegram } from '../hooks';
 import { Card, Button, LoadingScreen } from '../components';
-import type { Location } from '../types';
+import type { Location, NearbyLocation } from '../types';
+
+// Locations listed around the user once the position is known
+const NEARBY_RADIUS_METERS = 20000;
+
+type CheckinStatus = Awaited<ReturnType<typeof checkinsApi.canCheckinBatch>>[number];
+
+function formatCooldown(seconds: number): string {
+  const totalMinutes = Math.ceil(seconds / 60);
+  const hours = Math.floor(totalMinutes / 60);
+  const minutes = totalMinutes % 60;
+  return hours > 0 ? `${hours} год ${minutes} хв` : `${minutes} хв`;
+}
 
 export function CheckinPage() {
   const { locations, fetchLocations, isLoadingLocations } = useAppStore();
-  const { user, updateUser } = useAuthStore();
+  const { user, isAuthenticated, updateUser } = useAuthStore();
   const { getCurrentPosition, isLoading: isGeoLoading, error: geoError } = useGeolocation();
   const { hapticFeedback, hapticNotification, showAlert } = useTelegram();
 
   const [selectedLocation, setSelectedLocation] = useState<Location | null>(null);
   const [userPosition, setUserPosition] = useState<{ lat: number; lng: number } | null>(null);
+  const [nearby, setNearby] = useState<NearbyLocation[] | null>(null);
+  const [statuses, setStatuses] = useState<Record<number, CheckinStatus>>({});
   const [isCheckinLoading, setIsCheckinLoading] = useState(false);
   const [checkinSuccess, setCheckinSuccess] = useState(false);
   const [checkinResult, setCheckinResult] = useState<{
@@ -25,16 +39,48 @@ export function CheckinPage() {
     fetchLocations();
   }, [fetchLocations]);
 
+  // Cooldowns (and distances, given a position) for every listed location in one request
+  const loadStatuses = useCallback(
+    async (locationIds: number[], position?: { lat: number; lng: number }) => {
+      if (!isAuthenticated || locationIds.length === 0) return;
+      try {
+        const result = await checkinsApi.canCheckinBatch({
+          location_ids: locationIds,
+          latitude: position?.lat,
+          longitude: position?.lng,
+        });
+        setStatuses(Object.fromEntries(result.map((status) => [status.location_id, status])));
+      } catch {
+        // Only a hint; the check-in itself is validated by the server
+      }
+    },
+    [isAuthenticated]
+  );
+
+  useEffect(() => {
+    if (!nearby) {
+      loadStatuses(locations.map((location) => location.id));
+    }
+  }, [locations, nearby, loadStatuses]);
+
   const handleGetLocation = async () => {
+    const position = await getCurrentPosition().catch(() => null);
+    if (!position) {
+      showAlert('Не вдалося отримати вашу геолокацію');
+      return;
+    }
+    const lat = position.coords.latitude;
+    const lng = position.coords.longitude;
+    setUserPosition({ lat, lng });
+    hapticFeedback('light');
+
+    // Distances and check-in radius come from the server, closest first
     try {
-      const position = await getCurrentPosition();
-      setUserPosition({
-        lat: position.coords.latitude,
-        lng: position.coords.longitude,
-      });
-      hapticFeedback('light');
+      const found = await locationsApi.getNearby(lat, lng, NEARBY_RADIUS_METERS);
+      setNearby(found);
+      loadStatuses(found.map((item) => item.location.id), { lat, lng });
     } catch {
-      showAlert('Не вдалося отримати вашу геолокацію');
+      showAlert('Не вдалося завантажити локації поруч');
     }
   };
 
@@ -75,10 +121,23 @@ export function CheckinPage() {
     }
   };
 
+  const listed = nearby
+    ? nearby.map((item) => ({
+        location: item.location,
+        distance: item.distance_meters as number | null,
+        isNearby: item.can_checkin,
+      }))
+    : locations.map((location) => ({ location, distance: null as number | null, isNearby: false }));
+
   const resetCheckin = () => {
     setCheckinSuccess(false);
     setCheckinResult(null);
     setSelectedLocation(null);
+    // The location just checked in at is now on cooldown
+    loadStatuses(
+      listed.map(({ location }) => location.id),
+      userPosition ?? undefined
+    );
   };
 
   if (isLoadingLocations) {
@@ -149,25 +208,24 @@ export function CheckinPage() {
 
       {/* Location list */}
       <div className="space-y-3">
-        {locations.map((location) => {
-          const distance = userPosition
-            ? calculateDistance(
-                userPosition.lat,
-                userPosition.lng,
-                location.latitude,
-                location.longitude
-              )
-            : null;
-
-          const isNearby = distance !== null && distance <= location.checkin_radius_meters;
+        {nearby && nearby.length === 0 && (
+          <Card>
+            <p className="text-center text-gray-500">
+              У радіусі {NEARBY_RADIUS_METERS / 1000} км локацій немає
+            </p>
+          </Card>
+        )}
+        {listed.map(({ location, distance, isNearby }) => {
           const isSelected = selectedLocation?.id === location.id;
+          const status = statuses[location.id];
+          const onCooldown = status?.reason === 'cooldown_active';
 
           return (
             <Card
               key={location.id}
-              onClick={() => setSelectedLocation(location)}
-              hover
-              className={isSelected ? 'ring-2 ring-primary-500' : ''}
+              onClick={() => !onCooldown && setSelectedLocation(location)}
+              hover={!onCooldown}
+              className={isSelected ? 'ring-2 ring-primary-500' : onCooldown ? 'opacity-60' : ''}
             >
               <div className="flex items-start gap-3">
                 <div className="w-12 h-12 bg-coffee-100 rounded-xl flex items-center justify-center text-xl">
@@ -186,6 +244,11 @@ export function CheckinPage() {
                       {isNearby && ' — Ви поруч!'}
                     </p>
                   )}
+                  {status && onCooldown && (
+                    <p className="text-sm mt-1 text-orange-500">
+                      ⏳ Наступний check-in через {formatCooldown(status.cooldown_remaining_seconds)}
+                    </p>
+                  )}
                 </div>
                 {location.features && (
                   <div className="flex gap-1 flex-wrap">
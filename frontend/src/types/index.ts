@@ -45,6 +45,12 @@ export interface Location {
   created_at: string;
 }
 
+export interface NearbyLocation {
+  location: Location;
+  distance_meters: number;
+  can_checkin: boolean;
+}
+
 // Checkin types
 export interface Checkin {
   id: number;
@@ -154,6 +160,7 @@ export interface Leaderboard {
   total_entries: number;
   my_position: number | null;
   my_entry: LeaderboardEntry | null;
+  next_cursor: string | null;
 }
 
 // API response types